@@ -0,0 +1,490 @@
+""" Wrappers for the message callbacks registered with an application. """
+
+from __future__ import absolute_import
+from functools import partial
+from threading import Condition, Thread
+import logging
+import time
+
+from dxlclient.callbacks import EventCallback, RequestCallback
+from dxlclient.message import ErrorResponse, Response
+from .schema import SchemaValidationError
+from .util import MessageUtils
+
+# Configure local logger
+logger = logging.getLogger(__name__)
+
+# The metric for the number of messages received per callback topic
+MESSAGES_RECEIVED_METRIC = "dxlbootstrap_callback_messages_received_total"
+# The metric for the number of callback errors per callback topic
+CALLBACK_ERRORS_METRIC = "dxlbootstrap_callback_errors_total"
+# The metric for the time (in seconds) messages wait in a callback pool per callback topic
+CALLBACK_QUEUE_WAIT_METRIC = "dxlbootstrap_callback_queue_wait_seconds"
+# The metric for the execution time (in seconds) of callbacks per callback topic
+CALLBACK_EXECUTION_METRIC = "dxlbootstrap_callback_execution_seconds"
+
+# The error code sent for requests rejected due to a full callback pool
+OVERLOADED_ERROR_CODE = 0x80000002
+# The error message sent for requests rejected due to a full callback pool
+OVERLOADED_ERROR_MESSAGE = "service is overloaded, request rejected"
+# The error code sent for requests received while the application is being destroyed
+UNAVAILABLE_ERROR_CODE = 0x80000003
+# The error message sent for requests received while the application is being destroyed
+UNAVAILABLE_ERROR_MESSAGE = "service is shutting down, request rejected"
+# The error code sent for requests whose payload does not conform to the payload schema
+INVALID_REQUEST_ERROR_CODE = 0x80000004
+# The error message sent for requests whose payload does not conform to the payload schema
+INVALID_REQUEST_ERROR_MESSAGE = "invalid request payload"
+
+
+class CallbackMetrics(object):
+    """
+    The metrics recorded for a message callback registered with the application
+    """
+    def __init__(self, registry, topic):
+        """
+        Constructs the callback metrics
+        :param registry: The metrics registry
+        :param topic: The topic the callback is registered with
+        """
+        labels = {"topic": topic}
+        self.received = registry.counter(MESSAGES_RECEIVED_METRIC, labels)
+        self.errors = registry.counter(CALLBACK_ERRORS_METRIC, labels)
+        self.queue_wait = registry.histogram(CALLBACK_QUEUE_WAIT_METRIC, labels)
+        self.execution = registry.histogram(CALLBACK_EXECUTION_METRIC, labels)
+
+    def invoke(self, func, message, queued_time=None):
+        """
+        Invokes the specified callback function, recording its execution time and errors
+        :param func: The callback function
+        :param message: The message (or batch of messages) to pass to the function
+        :param queued_time: The time the invocation was queued (optional)
+        """
+        start_time = time.time()
+        if queued_time is not None:
+            self.queue_wait.observe(start_time - queued_time)
+        try:
+            func(message)
+        except:
+            self.errors.inc()
+            raise
+        finally:
+            self.execution.observe(time.time() - start_time)
+
+    def on_done(self, start_time, future):
+        """
+        Records the execution time and errors of an asynchronous callback invocation
+        :param start_time: The time the invocation was submitted
+        :param future: The future associated with the invocation
+        """
+        self.execution.observe(time.time() - start_time)
+        if future.cancelled() or future.exception() is not None:
+            self.errors.inc()
+
+
+class InstrumentedEventCallback(EventCallback):
+    """
+    Callback wrapper that invokes the wrapped event callback on the incoming message thread
+    """
+    def __init__(self, callback, metrics):
+        """
+        Constructs the callback wrapper
+        :param callback: The callback to invoke
+        :param metrics: The metrics for the callback
+        """
+        super(InstrumentedEventCallback, self).__init__()
+        self._delegate = callback
+        self._metrics = metrics
+
+    def on_event(self, event):
+        """
+        Invoked when a DXL event message is received
+        :param event: The DXL event message
+        """
+        self._metrics.received.inc()
+        self._metrics.invoke(self._delegate.on_event, event)
+
+
+class InstrumentedRequestCallback(RequestCallback):
+    """
+    Callback wrapper that invokes the wrapped request callback on the incoming message thread
+    """
+    def __init__(self, callback, metrics):
+        """
+        Constructs the callback wrapper
+        :param callback: The callback to invoke
+        :param metrics: The metrics for the callback
+        """
+        super(InstrumentedRequestCallback, self).__init__()
+        self._delegate = callback
+        self._metrics = metrics
+
+    def on_request(self, request):
+        """
+        Invoked when a DXL request message is received
+        :param request: The DXL request message
+        """
+        self._metrics.received.inc()
+        self._metrics.invoke(self._delegate.on_request, request)
+
+
+class ThreadedEventCallback(EventCallback):
+    """
+    Callback wrapper that invokes the wrapped event callback via the specified thread pool
+    """
+    def __init__(self, callbacks_pool, callback, metrics):
+        """
+        Constructs the callback wrapper
+        :param callbacks_pool: The thread pool used to invoke the wrappers
+        :param callback: The callback to invoke
+        :param metrics: The metrics for the callback
+        """
+        super(ThreadedEventCallback, self).__init__()
+        self._delegate = callback
+        self._callbacks_pool = callbacks_pool
+        self._metrics = metrics
+
+    def on_event(self, event):
+        """
+        Invoked when a DXL event message is received
+        :param event: The DXL event message
+        """
+        self._metrics.received.inc()
+        self._callbacks_pool.add_task(self._metrics.invoke, self._delegate.on_event, event,
+                                      time.time())
+
+
+class ThreadedRequestCallback(RequestCallback):
+    """
+    Callback wrapper that invokes the wrapped request callback via the specified thread pool
+    """
+    def __init__(self, callbacks_pool, callback, dxl_client, metrics):
+        """
+        Constructs the callback wrapper
+        :param callbacks_pool: The thread pool used to invoke the wrappers
+        :param callback: The callback to invoke
+        :param dxl_client: The DXL client used to send error responses for rejected requests
+        :param metrics: The metrics for the callback
+        """
+        super(ThreadedRequestCallback, self).__init__()
+        self._delegate = callback
+        self._callbacks_pool = callbacks_pool
+        self._dxl_client = dxl_client
+        self._metrics = metrics
+
+    def on_request(self, request):
+        """
+        Invoked when a DXL request message is received
+        :param request: The DXL request message
+        """
+        self._metrics.received.inc()
+        shed = []
+
+        def _on_shed():
+            # The request was shed due to the overflow policy of the pool (either discarded
+            # immediately, or later to make room for another request)
+            shed.append(request)
+            self._dxl_client.send_response(
+                ErrorResponse(request, error_code=OVERLOADED_ERROR_CODE,
+                              error_message=OVERLOADED_ERROR_MESSAGE))
+
+        if not self._callbacks_pool.add_sheddable_task(
+                _on_shed, self._metrics.invoke, self._delegate.on_request, request,
+                time.time()) and not shed:
+            # The pool has been closed
+            self._dxl_client.send_response(
+                ErrorResponse(request, error_code=UNAVAILABLE_ERROR_CODE,
+                              error_message=UNAVAILABLE_ERROR_MESSAGE))
+
+
+class ValidatingRequestCallback(RequestCallback):
+    """
+    Callback wrapper that validates the payload of requests against a payload schema prior to
+    invoking the wrapped request callback. An error response is sent for invalid requests.
+    """
+    def __init__(self, callback, schema, dxl_client, invalid_counter):
+        """
+        Constructs the callback wrapper
+        :param callback: The callback to invoke
+        :param schema: The payload schema (:class:`dxlbootstrap.schema.PayloadSchema`)
+        :param dxl_client: The DXL client used to send error responses for invalid requests
+        :param invalid_counter: The counter for the number of invalid requests
+        """
+        super(ValidatingRequestCallback, self).__init__()
+        self._delegate = callback
+        self._schema = schema
+        self._dxl_client = dxl_client
+        self._invalid_counter = invalid_counter
+
+    def on_request(self, request):
+        """
+        Invoked when a DXL request message is received
+        :param request: The DXL request message
+        """
+        try:
+            request.validated_payload = self._schema.decode(request)
+        except SchemaValidationError as ex:
+            self._invalid_counter.inc()
+            logger.debug("Invalid request received on topic '%s': %s",
+                         request.destination_topic, ex)
+            self._dxl_client.send_response(
+                ErrorResponse(request, error_code=INVALID_REQUEST_ERROR_CODE,
+                              error_message=INVALID_REQUEST_ERROR_MESSAGE +
+                              ": " + str(ex)))
+            return
+        self._delegate.on_request(request)
+
+
+class CoroutineEventCallback(EventCallback):
+    """
+    Callback wrapper that invokes the wrapped coroutine event callback (``async def on_event``)
+    via the specified coroutine loop
+    """
+    def __init__(self, coroutine_loop, callback, metrics):
+        """
+        Constructs the callback wrapper
+        :param coroutine_loop: The coroutine loop used to invoke the wrapped callback
+        :param callback: The callback to invoke
+        :param metrics: The metrics for the callback
+        """
+        super(CoroutineEventCallback, self).__init__()
+        self._delegate = callback
+        self._coroutine_loop = coroutine_loop
+        self._metrics = metrics
+
+    def on_event(self, event):
+        """
+        Invoked when a DXL event message is received
+        :param event: The DXL event message
+        """
+        self._metrics.received.inc()
+        start_time = time.time()
+        future = self._coroutine_loop.submit(self._delegate.on_event, event)
+        if future is not None:
+            future.add_done_callback(partial(self._metrics.on_done, start_time))
+
+
+class CoroutineRequestCallback(RequestCallback):
+    """
+    Callback wrapper that invokes the wrapped coroutine request callback (``async def on_request``)
+    via the specified coroutine loop
+    """
+    def __init__(self, coroutine_loop, callback, dxl_client, metrics):
+        """
+        Constructs the callback wrapper
+        :param coroutine_loop: The coroutine loop used to invoke the wrapped callback
+        :param callback: The callback to invoke
+        :param dxl_client: The DXL client used to send error responses for rejected requests
+        :param metrics: The metrics for the callback
+        """
+        super(CoroutineRequestCallback, self).__init__()
+        self._delegate = callback
+        self._coroutine_loop = coroutine_loop
+        self._dxl_client = dxl_client
+        self._metrics = metrics
+
+    def on_request(self, request):
+        """
+        Invoked when a DXL request message is received
+        :param request: The DXL request message
+        """
+        self._metrics.received.inc()
+        start_time = time.time()
+        future = self._coroutine_loop.submit(self._delegate.on_request, request)
+        if future is None:
+            self._dxl_client.send_response(
+                ErrorResponse(request, error_code=UNAVAILABLE_ERROR_CODE,
+                              error_message=UNAVAILABLE_ERROR_MESSAGE))
+        else:
+            future.add_done_callback(partial(self._metrics.on_done, start_time))
+
+
+class ProcessEventCallback(EventCallback):
+    """
+    Callback wrapper that invokes the wrapped event handler function with the event payload in a
+    worker process of the specified process pool
+    """
+    def __init__(self, process_pool, handler, metrics):
+        """
+        Constructs the callback wrapper
+        :param process_pool: The process pool used to invoke the handler function
+        :param handler: The picklable handler function, ``handler(payload)``
+        :param metrics: The metrics for the callback
+        """
+        super(ProcessEventCallback, self).__init__()
+        self._handler = handler
+        self._process_pool = process_pool
+        self._metrics = metrics
+
+    def on_event(self, event):
+        """
+        Invoked when a DXL event message is received
+        :param event: The DXL event message
+        """
+        def _on_done(future):
+            self._metrics.on_done(start_time, future)
+            if future.exception() is not None:
+                logger.error("Error in process event handler: %s", future.exception())
+
+        self._metrics.received.inc()
+        start_time = time.time()
+        self._process_pool.submit(self._handler, (event.payload,), _on_done)
+
+
+class ProcessRequestCallback(RequestCallback):
+    """
+    Callback wrapper that invokes the wrapped request handler function with the request payload
+    in a worker process of the specified process pool. The value returned by the handler function
+    is sent as the response payload (an error response is sent if the handler raises an exception).
+    """
+    def __init__(self, process_pool, handler, dxl_client, metrics):
+        """
+        Constructs the callback wrapper
+        :param process_pool: The process pool used to invoke the handler function
+        :param handler: The picklable handler function, ``handler(payload)``, which returns
+            the response payload (any value supported by
+            :func:`dxlbootstrap.util.MessageUtils.encode`)
+        :param dxl_client: The DXL client used to send the responses
+        :param metrics: The metrics for the callback
+        """
+        super(ProcessRequestCallback, self).__init__()
+        self._handler = handler
+        self._process_pool = process_pool
+        self._dxl_client = dxl_client
+        self._metrics = metrics
+
+    def on_request(self, request):
+        """
+        Invoked when a DXL request message is received
+        :param request: The DXL request message
+        """
+        def _on_done(future):
+            self._metrics.on_done(start_time, future)
+            exc = future.exception()
+            if exc is None:
+                res = Response(request)
+                try:
+                    MessageUtils.encode_payload(res, future.result())
+                except Exception as ex: # pylint: disable=broad-except
+                    # The value returned by the handler function cannot be encoded
+                    self._metrics.errors.inc()
+                    exc = ex
+            if exc is not None:
+                logger.error("Error in process request handler: %s", exc)
+                res = ErrorResponse(request, error_code=0,
+                                    error_message=MessageUtils.encode(str(exc)))
+            self._dxl_client.send_response(res)
+
+        self._metrics.received.inc()
+        start_time = time.time()
+        if not self._process_pool.submit(self._handler, (request.payload,), _on_done):
+            self._dxl_client.send_response(
+                ErrorResponse(request, error_code=UNAVAILABLE_ERROR_CODE,
+                              error_message=UNAVAILABLE_ERROR_MESSAGE))
+
+
+class BatchingEventCallback(EventCallback):
+    """
+    Callback wrapper that accumulates events per topic and invokes the wrapped batch event
+    callback once a batch is full or its maximum delay has elapsed. Batches are delivered via
+    the specified thread pool (or on the thread that completes the batch if no pool is specified).
+    """
+    def __init__(self, callbacks_pool, callback, thread_name, metrics):
+        """
+        Constructs the callback wrapper
+        :param callbacks_pool: The thread pool used to deliver the batches (optional)
+        :param callback: The batch event callback to invoke
+        :param thread_name: The name of the thread which delivers expired batches
+        :param metrics: The metrics for the callback
+        """
+        super(BatchingEventCallback, self).__init__()
+        self._delegate = callback
+        self._callbacks_pool = callbacks_pool
+        self._metrics = metrics
+        self._condition = Condition()
+        # Topic to list of events, topic to time the first event was received
+        self._batches = {}
+        self._batch_start_times = {}
+        self._closed = False
+        self._thread = Thread(target=self._run, name=thread_name)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _deliver(self, batch):
+        """
+        Delivers the specified batch to the wrapped callback
+        :param batch: The batch of events
+        """
+        if self._callbacks_pool is not None:
+            self._callbacks_pool.add_task(self._metrics.invoke, self._delegate.on_events, batch,
+                                          time.time())
+        else:
+            try:
+                self._metrics.invoke(self._delegate.on_events, batch)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Error in batch event callback")
+
+    def _remove_batch(self, topic):
+        """
+        Removes and returns the batch for the specified topic (the condition must be held)
+        :param topic: The topic
+        :return: The batch of events for the topic
+        """
+        del self._batch_start_times[topic]
+        return self._batches.pop(topic)
+
+    def on_event(self, event):
+        """
+        Invoked when a DXL event message is received
+        :param event: The DXL event message
+        """
+        self._metrics.received.inc()
+        topic = event.destination_topic
+        with self._condition:
+            batch = self._batches.get(topic)
+            if batch is None:
+                batch = []
+                self._batches[topic] = batch
+                self._batch_start_times[topic] = time.time()
+                self._condition.notify()
+            batch.append(event)
+            if len(batch) < self._delegate.max_batch_size:
+                return
+            batch = self._remove_batch(topic)
+        self._deliver(batch)
+
+    def _run(self):
+        """
+        Delivers batches whose maximum delay has elapsed (until the wrapper is closed)
+        """
+        max_delay = self._delegate.max_batch_delay
+        while True:
+            with self._condition:
+                expired = []
+                while not self._closed:
+                    now = time.time()
+                    wait_time = None
+                    for topic, start_time in list(self._batch_start_times.items()):
+                        remaining = start_time + max_delay - now
+                        if remaining <= 0:
+                            expired.append(self._remove_batch(topic))
+                        elif wait_time is None or remaining < wait_time:
+                            wait_time = remaining
+                    if expired:
+                        break
+                    self._condition.wait(wait_time)
+                if self._closed:
+                    expired.extend([self._remove_batch(topic) for topic in list(self._batches)])
+            for batch in expired:
+                self._deliver(batch)
+            if self._closed:
+                return
+
+    def close(self):
+        """
+        Delivers the pending batches and stops the thread which delivers expired batches
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
@@ -0,0 +1,199 @@
+""" Circuit breaker for the requests sent to a DXL topic. """
+
+from __future__ import absolute_import
+from collections import deque
+from threading import Lock
+import logging
+import time
+
+from ._exceptions import CircuitOpenError
+
+# Configure local logger
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker(object):
+    """
+    Circuit breaker for the requests sent to a DXL topic.
+
+    The circuit is initially closed (requests are sent). It opens when the rate of failed
+    requests (among the most recent requests) reaches the error rate threshold, or when the
+    number of consecutive timeouts reaches the timeout threshold. While open, requests fail
+    immediately with a :class:`CircuitOpenError`. After the cool-down period, the circuit is
+    half-open: a single trial request is sent, which closes the circuit if it succeeds, or
+    re-opens it if it fails. While the circuit is not closed, the outcomes of requests other
+    than the trial request (for example, slow requests sent before the circuit opened) are
+    ignored.
+    """
+
+    # The circuit is closed (requests are sent)
+    CLOSED = "closed"
+    # The circuit is open (requests fail immediately)
+    OPEN = "open"
+    # The circuit is half-open (a trial request is sent)
+    HALF_OPEN = "half-open"
+
+    def __init__(self, topic, error_rate_threshold, timeout_threshold, min_requests, # pylint: disable=too-many-arguments
+                 window_size, cool_down):
+        """
+        Constructs the circuit breaker
+
+        :param topic: The topic
+        :param error_rate_threshold: The rate of failed requests (between 0 and 1) at which
+            the circuit opens
+        :param timeout_threshold: The number of consecutive timeouts at which the circuit
+            opens
+        :param min_requests: The minimum number of requests before the error rate threshold
+            applies
+        :param window_size: The number of most recent requests the error rate is computed over
+        :param cool_down: The amount of time (in seconds) the circuit remains open before a
+            trial request is sent
+        """
+        if not 0 < error_rate_threshold <= 1:
+            raise Exception("Error rate threshold must be greater than 0 and at most 1")
+        if timeout_threshold < 1:
+            raise Exception("Timeout threshold must be greater than or equal to 1")
+        if not 1 <= min_requests <= window_size:
+            raise Exception(
+                "Minimum requests must be between 1 and the window size (inclusive)")
+        self._topic = topic
+        self._error_rate_threshold = error_rate_threshold
+        self._timeout_threshold = timeout_threshold
+        self._min_requests = min_requests
+        self._cool_down = cool_down
+        self._lock = Lock()
+        self._state = self.CLOSED
+        # The outcomes of the most recent requests (True if failed)
+        self._outcomes = deque(maxlen=window_size)
+        self._failure_count = 0
+        self._consecutive_timeouts = 0
+        self._opened_time = 0
+        # The token of the trial request in progress (None if no trial request is in progress)
+        self._trial = None
+
+    @property
+    def state(self):
+        """
+        The state of the circuit (:attr:`CLOSED`, :attr:`OPEN`, or :attr:`HALF_OPEN`)
+        """
+        with self._lock:
+            if self._state == self.OPEN and self._cool_down_elapsed():
+                return self.HALF_OPEN
+            return self._state
+
+    def _cool_down_elapsed(self):
+        """
+        Returns whether the cool-down period of the open circuit has elapsed
+
+        :return: Whether the cool-down period has elapsed
+        """
+        return time.time() - self._opened_time >= self._cool_down
+
+    def before_request(self):
+        """
+        Invoked before a request is sent. Raises a :class:`CircuitOpenError` if the request
+        must not be sent.
+
+        :return: A token if the request is the trial request of the half-open circuit (which
+            must be passed to :func:`record_success` or :func:`record_failure`, and to
+            :func:`end_trial` once the request has completed), otherwise ``None``
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return None
+            if self._state == self.OPEN and self._cool_down_elapsed():
+                self._state = self.HALF_OPEN
+            if self._state == self.HALF_OPEN and self._trial is None:
+                self._trial = object()
+                return self._trial
+        raise CircuitOpenError(
+            "Circuit breaker is open for topic: {0}".format(self._topic))
+
+    def end_trial(self, trial):
+        """
+        Invoked once the specified trial request has completed. If its outcome was not
+        recorded (for example, the request was interrupted), another trial request is allowed.
+
+        :param trial: The token of the trial request (see :func:`before_request`)
+        """
+        with self._lock:
+            if self._trial is trial:
+                self._trial = None
+
+    def record_success(self, trial=None):
+        """
+        Records a successful request
+
+        :param trial: The token of the request, if it is the trial request (see
+            :func:`before_request`)
+        """
+        with self._lock:
+            if self._state != self.CLOSED:
+                if not self._is_trial(trial):
+                    return
+                logger.info("Circuit breaker closed for topic: %s", self._topic)
+                self._reset(self.CLOSED)
+                return
+            self._consecutive_timeouts = 0
+            self._add_outcome(False)
+
+    def record_failure(self, timeout=False, trial=None):
+        """
+        Records a failed request
+
+        :param timeout: Whether the request failed because the response timeout was exceeded
+        :param trial: The token of the request, if it is the trial request (see
+            :func:`before_request`)
+        """
+        with self._lock:
+            if self._state != self.CLOSED:
+                if self._is_trial(trial):
+                    self._open()
+                return
+            self._consecutive_timeouts = self._consecutive_timeouts + 1 if timeout else 0
+            self._add_outcome(True)
+            if self._consecutive_timeouts >= self._timeout_threshold or \
+                    (len(self._outcomes) >= self._min_requests and
+                     self._failure_count >= self._error_rate_threshold * len(self._outcomes)):
+                self._open()
+
+    def _is_trial(self, trial):
+        """
+        Returns whether the specified token is that of the trial request in progress
+
+        :param trial: The token of the request (``None`` if it is not a trial request)
+        :return: Whether the token is that of the trial request in progress
+        """
+        return trial is not None and trial is self._trial
+
+    def _add_outcome(self, failed):
+        """
+        Adds the specified request outcome to the window of most recent requests
+
+        :param failed: Whether the request failed
+        """
+        if len(self._outcomes) == self._outcomes.maxlen and self._outcomes[0]:
+            self._failure_count -= 1
+        self._outcomes.append(failed)
+        if failed:
+            self._failure_count += 1
+
+    def _open(self):
+        """
+        Opens the circuit
+        """
+        logger.warning("Circuit breaker opened for topic: %s", self._topic)
+        self._reset(self.OPEN)
+        self._opened_time = time.time()
+
+    def _reset(self, state):
+        """
+        Resets the circuit to the specified state, clearing the recorded outcomes
+
+        :param state: The state
+        """
+        self._state = state
+        self._outcomes.clear()
+        self._failure_count = 0
+        self._consecutive_timeouts = 0
+        self._trial = None
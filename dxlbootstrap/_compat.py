@@ -9,7 +9,32 @@ try:
 except ImportError:
     from ConfigParser import ConfigParser
 
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
 if sys.version_info[0] > 2:
     UnicodeString = str
+    IntegerTypes = (int,) # pylint: disable=invalid-name
 else:
     UnicodeString = unicode # pylint: disable=invalid-name, undefined-variable
+    IntegerTypes = (int, long) # pylint: disable=invalid-name, undefined-variable
+
+try:
+    import asyncio
+except ImportError:
+    asyncio = None # pylint: disable=invalid-name
+
+
+def iscoroutinefunction(func):
+    """
+    Returns whether the specified function is a coroutine function (``async def``). Always
+    ``False`` for Python versions which do not support coroutines.
+
+    :param func: The function
+    :return: Whether the specified function is a coroutine function
+    """
+    return asyncio is not None and asyncio.iscoroutinefunction(func)
@@ -0,0 +1,177 @@
+""" Compression algorithms used for message payloads. """
+
+from __future__ import absolute_import
+from importlib import import_module
+from threading import Lock
+import logging
+import zlib
+
+# Configure local logger
+logger = logging.getLogger(__name__)
+
+
+class ZlibCompressor(object):
+    """
+    Compressor based on the Python standard library ``zlib`` module
+    """
+
+    # The name of the compression algorithm
+    NAME = "zlib"
+    # The module providing the compression algorithm
+    MODULE = "zlib"
+
+    def __init__(self, module=zlib):
+        """
+        Constructs the compressor
+
+        :param module: The module providing the compression algorithm
+        """
+        self._module = module
+
+    def compress(self, data):
+        """
+        Compresses the specified data
+
+        :param data: The data (``bytes``, ``bytearray``, or ``memoryview``)
+        :return: The compressed data (``bytes``)
+        """
+        return self._module.compress(data)
+
+    def decompress(self, data, max_length):
+        """
+        Decompresses the specified data. A ``ValueError`` is raised if the decompressed data
+        would exceed the maximum length (the data is not decompressed beyond it), or if the
+        compressed data is incomplete.
+
+        :param data: The compressed data (``bytes``, ``bytearray``, or ``memoryview``)
+        :param max_length: The maximum length (in bytes) of the decompressed data
+        :return: The decompressed data (``bytes``)
+        """
+        decompressor = self._module.decompressobj()
+        # One byte more than the maximum, to detect decompressed data which exceeds it
+        ret = decompressor.decompress(data, max_length + 1)
+        _check_decompressed_length(len(ret), max_length)
+        # Not available on Python 2.7 (incomplete data then decompresses without an error)
+        if not getattr(decompressor, "eof", True):
+            raise ValueError("Compressed data is incomplete")
+        return ret
+
+
+class Lz4Compressor(ZlibCompressor):
+    """
+    Compressor based on the ``lz4`` module (LZ4 frame format)
+    """
+
+    # The name of the compression algorithm
+    NAME = "lz4"
+    # The module providing the compression algorithm
+    MODULE = "lz4.frame"
+
+    def decompress(self, data, max_length):
+        decompressor = self._module.LZ4FrameDecompressor()
+        ret = decompressor.decompress(data, max_length + 1)
+        _check_decompressed_length(len(ret), max_length)
+        if not decompressor.eof:
+            raise ValueError("Compressed data is incomplete")
+        return ret
+
+
+class ZstdCompressor(ZlibCompressor):
+    """
+    Compressor based on the ``zstandard`` module
+    """
+
+    # The name of the compression algorithm
+    NAME = "zstd"
+    # The module providing the compression algorithm
+    MODULE = "zstandard"
+
+    def __init__(self, module):
+        super(ZstdCompressor, self).__init__(module)
+        # Compressor and decompressor objects are not thread-safe, one of each is created
+        # per call
+        self._compressor_class = module.ZstdCompressor
+        self._decompressor_class = module.ZstdDecompressor
+
+    def compress(self, data):
+        return self._compressor_class().compress(data)
+
+    def decompress(self, data, max_length):
+        chunks = []
+        length = 0
+        with self._decompressor_class().stream_reader(data) as reader:
+            while True:
+                chunk = reader.read(max_length + 1 - length)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                length += len(chunk)
+                _check_decompressed_length(length, max_length)
+        return b"".join(chunks)
+
+
+def _check_decompressed_length(length, max_length):
+    """
+    Raises a ``ValueError`` if the specified length of decompressed data exceeds the maximum
+
+    :param length: The length (in bytes) of the decompressed data
+    :param max_length: The maximum length (in bytes) of the decompressed data
+    """
+    if length > max_length:
+        raise ValueError(
+            "Decompressed data exceeds the maximum length: {0} bytes".format(max_length))
+
+
+# The compressor classes, in order of preference
+COMPRESSOR_CLASSES = (ZstdCompressor, Lz4Compressor, ZlibCompressor)
+
+# The names of the compression algorithms, in order of preference
+COMPRESSION_ALGORITHMS = tuple(compressor_class.NAME for compressor_class in COMPRESSOR_CLASSES)
+
+_lock = Lock()
+# Algorithm name to compressor (None if the module of the compressor is unavailable)
+_compressors = {}
+
+
+def get_compressor(name):
+    """
+    Returns the compressor for the specified compression algorithm
+
+    :param name: The name of the compression algorithm (see ``COMPRESSION_ALGORITHMS``)
+    :return: The compressor
+    """
+    if name not in COMPRESSION_ALGORITHMS:
+        raise Exception("Unknown compression algorithm: {0}. Expected one of: {1}".format(
+            name, ", ".join(COMPRESSION_ALGORITHMS)))
+    compressor = _load_compressor(name)
+    if compressor is None:
+        raise Exception(
+            "Compression algorithm is not available (module not installed): {0}".format(name))
+    return compressor
+
+
+def get_available_compression_algorithms():
+    """
+    Returns the names of the compression algorithms whose modules are installed
+
+    :return: The names of the available compression algorithms (in order of preference)
+    """
+    return [name for name in COMPRESSION_ALGORITHMS if _load_compressor(name) is not None]
+
+
+def _load_compressor(name):
+    """
+    Returns the compressor for the specified compression algorithm, importing the module
+    of the compressor if necessary
+
+    :param name: The name of the compression algorithm
+    :return: The compressor (``None`` if the module of the compressor is unavailable)
+    """
+    with _lock:
+        if name not in _compressors:
+            compressor_class = COMPRESSOR_CLASSES[COMPRESSION_ALGORITHMS.index(name)]
+            try:
+                _compressors[name] = compressor_class(import_module(compressor_class.MODULE))
+            except ImportError:
+                _compressors[name] = None
+        return _compressors[name]
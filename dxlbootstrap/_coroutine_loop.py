@@ -0,0 +1,152 @@
+from __future__ import absolute_import
+from threading import BoundedSemaphore, Condition, Thread
+import logging
+import time
+
+from ._compat import asyncio
+
+# Configure local logger
+logger = logging.getLogger(__name__)
+
+
+class CoroutineLoop(object):
+    """
+    Runs coroutines (``async def`` message callbacks) on a dedicated asyncio event loop thread.
+
+    The number of coroutines in flight is limited by the specified concurrency. Once the limit
+    has been reached, the thread submitting a coroutine waits until a running coroutine completes.
+    """
+
+    def __init__(self, concurrency, thread_name):
+        """
+        Constructs the loop and starts its thread
+
+        :param concurrency: The maximum number of coroutines in flight
+        :param thread_name: The name of the event loop thread
+        """
+        if asyncio is None:
+            raise Exception("Coroutine callbacks require Python 3.4 or later (asyncio)")
+        self._semaphore = BoundedSemaphore(concurrency)
+        self._condition = Condition()
+        # The number of coroutines in flight
+        self._pending_count = 0
+        self._closed = False
+        self._loop = asyncio.new_event_loop()
+        self._thread = Thread(target=self._run, name=thread_name)
+        self._thread.daemon = True
+        self._thread.start()
+
+    @property
+    def loop(self):
+        """
+        The asyncio event loop
+        """
+        return self._loop
+
+    @property
+    def closed(self):
+        """
+        Whether the loop has been closed (no longer accepts new coroutines)
+        """
+        return self._closed
+
+    @property
+    def pending_count(self):
+        """
+        The number of coroutines in flight
+        """
+        with self._condition:
+            return self._pending_count
+
+    def _run(self):
+        """
+        Runs the event loop (until it is stopped)
+        """
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    def submit(self, coroutine_func, *args):
+        """
+        Schedules the specified coroutine function for execution on the event loop
+
+        :param coroutine_func: The coroutine function
+        :param args: The arguments for the coroutine function
+        :return: The future (:class:`concurrent.futures.Future`) associated with the coroutine,
+            ``None`` if the loop has been closed
+        """
+        self._semaphore.acquire()
+        with self._condition:
+            if self._closed:
+                self._semaphore.release()
+                return None
+            self._pending_count += 1
+            try:
+                future = asyncio.run_coroutine_threadsafe(coroutine_func(*args), self._loop)
+            except:
+                self._on_complete()
+                raise
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_complete(self):
+        """
+        Updates the number of coroutines in flight once a coroutine has completed
+        """
+        with self._condition:
+            self._pending_count -= 1
+            self._condition.notify_all()
+        self._semaphore.release()
+
+    def _on_done(self, future):
+        """
+        Invoked when a coroutine has completed
+
+        :param future: The future associated with the coroutine
+        """
+        self._on_complete()
+        if not future.cancelled() and future.exception() is not None:
+            exc = future.exception()
+            logger.error("Error in coroutine callback",
+                         exc_info=(type(exc), exc, exc.__traceback__))
+
+    def wait_idle(self, timeout=None):
+        """
+        Waits until there are no coroutines in flight
+
+        :param timeout: The maximum amount of time (in seconds) to wait (``None`` to wait
+            indefinitely)
+        :return: Whether there are no coroutines in flight
+        """
+        end_time = None if timeout is None else time.time() + timeout
+        with self._condition:
+            while self._pending_count:
+                if end_time is None:
+                    self._condition.wait()
+                else:
+                    remaining = end_time - time.time()
+                    if remaining <= 0:
+                        return False
+                    self._condition.wait(remaining)
+            return True
+
+    def close(self):
+        """
+        Stops accepting new coroutines (coroutines subsequently submitted are rejected). The
+        coroutines in flight continue to run.
+        """
+        with self._condition:
+            self._closed = True
+
+    def shutdown(self, wait_complete=True):
+        """
+        Stops the event loop
+
+        :param wait_complete: Whether to wait for the coroutines in flight to complete
+        """
+        logger.debug("Shutting down coroutine loop...")
+        self.close()
+        if wait_complete:
+            self.wait_idle()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
@@ -1,3 +1,6 @@
+from dxlclient.exceptions import WaitTimeoutException
+
+
 class NoOptionError(Exception):
     """
     Exception raised when an option is not present in a configuration file
@@ -19,3 +22,61 @@ class NoOptionError(Exception):
         return self.message
 
     __str__ = __repr__
+
+
+class SchemaValidationError(ValueError):
+    """
+    Exception raised when a message payload does not conform to a payload schema
+    """
+    pass
+
+
+class RequestError(Exception):
+    """
+    Base class for the exceptions raised when a DXL request fails
+    """
+    pass
+
+
+class RequestTimeoutError(RequestError, WaitTimeoutException):
+    """
+    Exception raised when the response to a DXL request is not received within the response
+    timeout
+    """
+    pass
+
+
+class ServiceError(RequestError):
+    """
+    Exception raised when an error response is received for a DXL request
+    """
+    def __init__(self, error_code, error_message):
+        """
+        Constructor parameters:
+
+        :param error_code: The error code of the error response
+        :param error_message: The error message of the error response
+        """
+        super(ServiceError, self).__init__(error_message, error_code)
+        self.error_code = error_code
+        self.error_message = error_message
+
+    def __str__(self):
+        # The message is only built when it is used
+        return "Error: " + self.error_message + " (" + str(self.error_code) + ")"
+
+
+class ServiceNotFoundError(ServiceError):
+    """
+    Exception raised when no service is registered for the topic of a DXL request
+    """
+    # The error code of the error response when no service is found for a request
+    ERROR_CODE = 0x80000001
+
+
+class CircuitOpenError(RequestError):
+    """
+    Exception raised when a request is not sent because the circuit breaker for its topic is
+    open (the service has recently been failing)
+    """
+    pass
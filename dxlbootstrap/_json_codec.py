@@ -0,0 +1,264 @@
+""" JSON codecs used to convert between Python objects and JSON. """
+
+from __future__ import absolute_import
+from importlib import import_module
+from threading import Lock
+import codecs
+import json
+import logging
+import re
+
+from ._compat import IntegerTypes, UnicodeString
+
+# Configure local logger
+logger = logging.getLogger(__name__)
+
+
+class StdlibJsonCodec(object):
+    """
+    JSON codec based on the Python standard library ``json`` module. The other codecs produce
+    output which is equivalent to (parses to the same value as) the output of this codec.
+    """
+
+    # The name of the codec
+    NAME = "json"
+
+    def __init__(self, module=json):
+        """
+        Constructs the codec
+
+        :param module: The ``json`` module
+        """
+        self._module = module
+
+    def dumps(self, obj):
+        """
+        Converts the specified Python object to a JSON string
+
+        :param obj: The Python object
+        :return: The JSON string
+        """
+        return json.dumps(obj)
+
+    def loads(self, value):
+        """
+        Converts the specified JSON string (or UTF-8 encoded bytes) to a Python object
+
+        :param value: The JSON string
+        :return: The Python object
+        """
+        return json.loads(value)
+
+    def dumps_bytes(self, obj):
+        """
+        Converts the specified Python object to UTF-8 encoded JSON
+
+        :param obj: The Python object
+        :return: The UTF-8 encoded JSON (``bytes``)
+        """
+        return self.dumps(obj).encode("utf-8")
+
+    def loads_bytes(self, data):
+        """
+        Converts the specified UTF-8 encoded JSON to a Python object
+
+        :param data: The UTF-8 encoded JSON (``bytes``, ``bytearray``, or ``memoryview``)
+        :return: The Python object
+        """
+        return self.loads(_utf_8_decode(data))
+
+
+class OrjsonCodec(StdlibJsonCodec):
+    """
+    JSON codec based on the ``orjson`` module. Values which ``orjson`` does not encode the
+    same way as the standard library are converted via the standard library: integers larger
+    than 64 bits, non-string dictionary keys, non-finite floats (``NaN`` and ``Infinity``,
+    which ``orjson`` encodes as ``null``), and types the standard library does not support
+    (``datetime`` and ``UUID`` objects, dataclasses, etc., for which the standard library
+    raises a ``TypeError``).
+
+    Members of enumerations which are not subclasses of a JSON type are encoded as their
+    value (the standard library raises a ``TypeError``).
+    """
+
+    # The name of the codec
+    NAME = "orjson"
+
+    # The pattern of a UUID string (as encoded by orjson)
+    _UUID_PATTERN = re.compile(
+        b'"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"')
+
+    def __init__(self, module):
+        super(OrjsonCodec, self).__init__(module)
+        # Types which orjson would encode, but the standard library does not (or encodes
+        # differently), raise a TypeError
+        self._options = module.OPT_PASSTHROUGH_DATETIME | module.OPT_PASSTHROUGH_DATACLASS | \
+            module.OPT_PASSTHROUGH_SUBCLASS
+
+    def dumps(self, obj):
+        return self.dumps_bytes(obj).decode("utf-8")
+
+    def loads(self, value):
+        try:
+            return self._module.loads(value)
+        except ValueError:
+            return json.loads(value)
+
+    def dumps_bytes(self, obj):
+        try:
+            data = self._module.dumps(obj, option=self._options)
+        except TypeError:
+            return json.dumps(obj).encode("utf-8")
+        # The encoded value may contain a non-finite float (encoded as null) or a UUID object
+        # (encoded as a string), in which case the value is checked
+        if (b"null" in data or self._UUID_PATTERN.search(data)) and \
+                not _is_plain_json_value(obj):
+            return json.dumps(obj).encode("utf-8")
+        return data
+
+    def loads_bytes(self, data):
+        try:
+            return self._module.loads(data)
+        except ValueError:
+            return json.loads(_utf_8_decode(data))
+
+
+class UjsonCodec(StdlibJsonCodec):
+    """
+    JSON codec based on the ``ujson`` module. Values which are not supported by ``ujson``
+    are converted via the standard library.
+    """
+
+    # The name of the codec
+    NAME = "ujson"
+
+    def dumps(self, obj):
+        try:
+            return self._module.dumps(obj, escape_forward_slashes=False)
+        except (TypeError, ValueError, OverflowError):
+            return json.dumps(obj)
+
+    def loads(self, value):
+        try:
+            return self._module.loads(value)
+        except (ValueError, OverflowError):
+            return json.loads(value)
+
+    def loads_bytes(self, data):
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        try:
+            return self._module.loads(data)
+        except (ValueError, OverflowError):
+            return json.loads(_utf_8_decode(data))
+
+
+class SimplejsonCodec(StdlibJsonCodec):
+    """
+    JSON codec based on the ``simplejson`` module
+    """
+
+    # The name of the codec
+    NAME = "simplejson"
+
+    def dumps(self, obj):
+        return self._module.dumps(obj, namedtuple_as_object=False)
+
+    def loads(self, value):
+        return self._module.loads(value)
+
+
+# The types of the JSON values (other than containers and floats) which the codecs encode the
+# same way as the standard library
+_PLAIN_JSON_TYPES = frozenset((UnicodeString, str, bool, type(None)) + IntegerTypes)
+
+
+def _is_plain_json_value(obj):
+    """
+    Returns whether the specified value consists only of JSON values (dictionaries with string
+    keys, lists, tuples, strings, integers, finite floats, booleans, and ``None``)
+
+    :param obj: The value
+    :return: Whether the value consists only of JSON values
+    """
+    values = [obj]
+    while values:
+        value = values.pop()
+        value_type = type(value)
+        if value_type is dict:
+            for key in value:
+                if type(key) not in (UnicodeString, str): # pylint: disable=unidiomatic-typecheck
+                    return False
+            values.extend(value.values())
+        elif value_type is list or value_type is tuple:
+            values.extend(value)
+        elif value_type is float:
+            # False for NaN and Infinity
+            if value - value != 0:
+                return False
+        elif value_type not in _PLAIN_JSON_TYPES:
+            return False
+    return True
+
+
+def _utf_8_decode(data):
+    """
+    Decodes the specified UTF-8 encoded data (directly from its buffer, without first copying
+    it to ``bytes``)
+
+    :param data: The UTF-8 encoded data (``bytes``, ``bytearray``, or ``memoryview``)
+    :return: The decoded string
+    """
+    return codecs.utf_8_decode(data, "strict", True)[0]
+
+
+# The JSON codec classes, in order of preference
+JSON_CODEC_CLASSES = (OrjsonCodec, UjsonCodec, SimplejsonCodec, StdlibJsonCodec)
+
+# The names of the JSON codecs, in order of preference
+JSON_CODEC_NAMES = tuple(codec_class.NAME for codec_class in JSON_CODEC_CLASSES)
+
+_lock = Lock()
+# Codec name to codec (None if the module of the codec is unavailable)
+_codecs = {}
+
+
+def get_json_codec(name=None):
+    """
+    Returns the JSON codec with the specified name
+
+    :param name: The name of the codec (see ``JSON_CODEC_NAMES``). If ``None``, the preferred
+        codec whose module is installed is returned.
+    :return: The JSON codec
+    """
+    if name is None:
+        for codec_name in JSON_CODEC_NAMES:
+            codec = _load_json_codec(codec_name)
+            if codec is not None:
+                return codec
+
+    if name not in JSON_CODEC_NAMES:
+        raise Exception("Unknown JSON codec: {0}. Expected one of: {1}".format(
+            name, ", ".join(JSON_CODEC_NAMES)))
+    codec = _load_json_codec(name)
+    if codec is None:
+        raise Exception("JSON codec is not available (module not installed): {0}".format(name))
+    return codec
+
+
+def _load_json_codec(name):
+    """
+    Returns the JSON codec with the specified name, importing the module of the codec if
+    necessary
+
+    :param name: The name of the codec
+    :return: The JSON codec (``None`` if the module of the codec is unavailable)
+    """
+    with _lock:
+        if name not in _codecs:
+            codec_class = JSON_CODEC_CLASSES[JSON_CODEC_NAMES.index(name)]
+            try:
+                _codecs[name] = codec_class(import_module(name))
+            except ImportError:
+                _codecs[name] = None
+        return _codecs[name]
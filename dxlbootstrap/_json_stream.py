@@ -0,0 +1,162 @@
+""" Incremental decoding of the elements of a JSON array or object. """
+
+from __future__ import absolute_import
+import codecs
+import json
+
+from ._compat import UnicodeString
+
+
+class JsonStreamDecoder(object):
+    """
+    Decodes the elements of the top-level array (or the members of the top-level object) of
+    a UTF-8 encoded JSON document one at a time. The document is decoded in chunks, so that
+    only the element currently being decoded (rather than the whole document) is held as
+    Python objects.
+    """
+
+    # The whitespace characters allowed between JSON tokens (trailing null characters are
+    # also allowed after the document)
+    _WHITESPACE = " \t\n\r"
+    # The characters which may follow a value (other than whitespace)
+    _DELIMITERS = ",:]}"
+
+    def __init__(self, data, chunk_size):
+        """
+        Constructs the decoder
+
+        :param data: The UTF-8 encoded JSON document (``bytes``, ``bytearray``, or
+            ``memoryview``)
+        :param chunk_size: The number of bytes decoded per chunk
+        """
+        self._data = memoryview(data)
+        self._chunk_size = chunk_size
+        self._offset = 0
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer = u""
+        self._pos = 0
+
+    def _at_end(self):
+        """
+        Returns whether all of the data has been decoded to the buffer
+
+        :return: Whether all of the data has been decoded to the buffer
+        """
+        return self._offset >= len(self._data)
+
+    def _fill(self, min_size=0):
+        """
+        Decodes the next chunk of the data to the buffer
+
+        :param min_size: The minimum number of bytes to decode (in addition to the chunk size)
+        :return: Whether more data was decoded (``False`` if all of the data has been decoded)
+        """
+        if self._at_end():
+            return False
+        # Discard the consumed portion of the buffer
+        if self._pos:
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+        end = self._offset + max(self._chunk_size, min_size)
+        # The incremental decoder does not accept memory views on Python 2.7
+        chunk = self._data[self._offset:end].tobytes()
+        self._offset += len(chunk)
+        self._buffer += self._text_decoder.decode(chunk, self._at_end())
+        return True
+
+    def _peek(self):
+        """
+        Skips whitespace and returns the next character (without consuming it)
+
+        :return: The next character (``None`` if the end of the document has been reached)
+        """
+        while True:
+            while self._pos < len(self._buffer) and \
+                    self._buffer[self._pos] in self._WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return None
+
+    def _expect(self, chars):
+        """
+        Consumes the next character, which must be one of the specified characters
+
+        :param chars: The expected characters
+        :return: The character
+        """
+        char = self._peek()
+        if char is None or char not in chars:
+            raise ValueError(
+                "Expecting one of '{0}' at character {1} of JSON payload: {2}".format(
+                    chars, self._pos, "end of data" if char is None else repr(char)))
+        self._pos += 1
+        return char
+
+    def _decode_value(self):
+        """
+        Decodes the next JSON value
+
+        :return: The value
+        """
+        self._peek()
+        while True:
+            try:
+                value, end = self._json_decoder.raw_decode(self._buffer, self._pos)
+            except ValueError:
+                # The value may continue in the data not yet decoded
+                if not self._fill(len(self._buffer) - self._pos):
+                    raise
+                continue
+            # A value (for example, a number split at a chunk boundary, such as "12" of
+            # "12.5") may continue in the data not yet decoded, so it is only accepted once
+            # the delimiter which follows it has been decoded
+            next_pos = end
+            while next_pos < len(self._buffer) and \
+                    self._buffer[next_pos] in self._WHITESPACE:
+                next_pos += 1
+            if (next_pos == len(self._buffer) or
+                    self._buffer[next_pos] not in self._DELIMITERS) and \
+                    self._fill(len(self._buffer) - self._pos):
+                continue
+            self._pos = end
+            return value
+
+    def _check_end(self):
+        """
+        Checks that only whitespace (or null characters) follow the end of the document
+        """
+        while True:
+            remainder = self._buffer[self._pos:].strip(self._WHITESPACE + u"\0")
+            if remainder:
+                raise ValueError("Extra data after JSON payload: {0!r}".format(remainder[:20]))
+            self._pos = len(self._buffer)
+            if not self._fill():
+                return
+
+    def __iter__(self):
+        """
+        Iterates the document
+
+        :return: An iterator over the elements of the top-level array, or the ``(key, value)``
+            members of the top-level object
+        """
+        opening = self._expect(u"[{")
+        closing = u"]" if opening == u"[" else u"}"
+        if self._peek() == closing:
+            self._pos += 1
+        else:
+            while True:
+                if opening == u"[":
+                    yield self._decode_value()
+                else:
+                    key = self._decode_value()
+                    if not isinstance(key, UnicodeString):
+                        raise ValueError("Expecting a string key in JSON payload")
+                    self._expect(u":")
+                    yield key, self._decode_value()
+                if self._expect(u"," + closing) == closing:
+                    break
+        self._check_end()
@@ -0,0 +1,61 @@
+""" Tracking of response latencies. """
+
+from __future__ import absolute_import
+from threading import Lock
+import logging
+
+# Configure local logger
+logger = logging.getLogger(__name__)
+
+
+class LatencyTracker(object):
+    """
+    Tracks the most recent latencies (a sliding window) recorded for a DXL topic, and computes
+    percentiles over them
+    """
+
+    def __init__(self, window_size):
+        """
+        Constructs the tracker
+
+        :param window_size: The number of most recent latencies tracked
+        """
+        self._window_size = window_size
+        self._lock = Lock()
+        # The most recent latencies (a ring buffer)
+        self._latencies = []
+        self._next_index = 0
+
+    @property
+    def count(self):
+        """
+        The number of latencies tracked
+        """
+        return len(self._latencies)
+
+    def record(self, latency):
+        """
+        Records the specified latency
+
+        :param latency: The latency (in seconds)
+        """
+        with self._lock:
+            if len(self._latencies) < self._window_size:
+                self._latencies.append(latency)
+            else:
+                self._latencies[self._next_index] = latency
+                self._next_index = (self._next_index + 1) % self._window_size
+
+    def percentile(self, percentile):
+        """
+        Returns the specified percentile of the tracked latencies (nearest rank)
+
+        :param percentile: The percentile (between 0 and 100)
+        :return: The latency (in seconds), ``None`` if no latencies have been recorded
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if not latencies:
+            return None
+        index = int(round(percentile / 100.0 * len(latencies))) - 1
+        return latencies[min(max(index, 0), len(latencies) - 1)]
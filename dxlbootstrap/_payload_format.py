@@ -0,0 +1,120 @@
+""" Formats used to encode Python objects in message payloads. """
+
+from __future__ import absolute_import
+from importlib import import_module
+from threading import Lock
+import logging
+
+# Configure local logger
+logger = logging.getLogger(__name__)
+
+
+class MsgpackFormat(object):
+    """
+    MessagePack payload format (based on the ``msgpack`` module)
+    """
+
+    # The name of the format
+    NAME = "msgpack"
+    # The content type of the format
+    CONTENT_TYPE = "application/msgpack"
+    # The module providing the format
+    MODULE = "msgpack"
+
+    def __init__(self, module):
+        """
+        Constructs the format
+
+        :param module: The module providing the format
+        """
+        self._module = module
+        self._unpack_options = {"raw": False}
+        # Maps with keys other than strings are rejected by default as of msgpack 1.0 (the
+        # option is not available prior to msgpack 0.6.1, which accepts them)
+        if getattr(module, "version", (0,)) >= (0, 6, 1):
+            self._unpack_options["strict_map_key"] = False
+
+    def dumps(self, obj):
+        """
+        Converts the specified Python object to the format
+
+        :param obj: The Python object
+        :return: The encoded object (``bytes``)
+        """
+        return self._module.packb(obj, use_bin_type=True)
+
+    def loads(self, data):
+        """
+        Converts the specified encoded object to a Python object
+
+        :param data: The encoded object (``bytes``, ``bytearray``, or ``memoryview``)
+        :return: The Python object
+        """
+        return self._module.unpackb(data, **self._unpack_options)
+
+
+class CborFormat(MsgpackFormat):
+    """
+    CBOR payload format (based on the ``cbor2`` module)
+    """
+
+    # The name of the format
+    NAME = "cbor"
+    # The content type of the format
+    CONTENT_TYPE = "application/cbor"
+    # The module providing the format
+    MODULE = "cbor2"
+
+    def dumps(self, obj):
+        return self._module.dumps(obj)
+
+    def loads(self, data):
+        return self._module.loads(data)
+
+
+# The binary payload format classes
+PAYLOAD_FORMAT_CLASSES = (MsgpackFormat, CborFormat)
+
+# The name of the JSON payload format
+JSON_FORMAT = "json"
+# The content type of the JSON payload format
+JSON_CONTENT_TYPE = "application/json"
+
+# The names of the payload formats
+PAYLOAD_FORMATS = (JSON_FORMAT,) + tuple(
+    format_class.NAME for format_class in PAYLOAD_FORMAT_CLASSES)
+
+# Content type to payload format name
+PAYLOAD_FORMAT_BY_CONTENT_TYPE = dict(
+    [(JSON_CONTENT_TYPE, JSON_FORMAT)] +
+    [(format_class.CONTENT_TYPE, format_class.NAME) for format_class in PAYLOAD_FORMAT_CLASSES])
+
+_lock = Lock()
+# Format name to format (None if the module of the format is unavailable)
+_formats = {}
+
+
+def get_payload_format(name):
+    """
+    Returns the binary payload format with the specified name
+
+    :param name: The name of the format (see ``PAYLOAD_FORMAT_CLASSES``)
+    :return: The payload format
+    """
+    format_classes = dict((format_class.NAME, format_class)
+                          for format_class in PAYLOAD_FORMAT_CLASSES)
+    if name not in format_classes:
+        raise Exception("Unknown payload format: {0}. Expected one of: {1}".format(
+            name, ", ".join(PAYLOAD_FORMATS)))
+    with _lock:
+        if name not in _formats:
+            format_class = format_classes[name]
+            try:
+                _formats[name] = format_class(import_module(format_class.MODULE))
+            except ImportError:
+                _formats[name] = None
+        payload_format = _formats[name]
+    if payload_format is None:
+        raise Exception("Payload format is not available (module not installed): {0}".format(
+            name))
+    return payload_format
@@ -0,0 +1,127 @@
+from __future__ import absolute_import
+from concurrent.futures import ProcessPoolExecutor
+from threading import BoundedSemaphore, Condition
+import logging
+import time
+
+# Configure local logger
+logger = logging.getLogger(__name__)
+
+
+class ProcessCallbacksPool(object):
+    """
+    Pool of worker processes used to invoke picklable message handler functions (for CPU-bound
+    handlers that would otherwise be limited by the global interpreter lock).
+
+    The number of pending invocations is limited by the specified queue size. Once the limit has
+    been reached, the thread submitting an invocation waits until a pending invocation completes.
+    """
+
+    def __init__(self, queue_size, process_count):
+        """
+        Constructs the pool
+
+        :param queue_size: The maximum number of pending invocations
+        :param process_count: The number of worker processes (``None`` for the number of processors)
+        """
+        self._semaphore = BoundedSemaphore(queue_size)
+        self._condition = Condition()
+        # The number of pending invocations
+        self._pending_count = 0
+        self._closed = False
+        self._executor = ProcessPoolExecutor(process_count)
+
+    @property
+    def closed(self):
+        """
+        Whether the pool has been closed (no longer accepts new invocations)
+        """
+        return self._closed
+
+    @property
+    def pending_count(self):
+        """
+        The number of pending invocations
+        """
+        with self._condition:
+            return self._pending_count
+
+    def _on_complete(self):
+        """
+        Updates the number of pending invocations once an invocation has completed
+        """
+        with self._condition:
+            self._pending_count -= 1
+            self._condition.notify_all()
+        self._semaphore.release()
+
+    def submit(self, func, args, done_callback):
+        """
+        Submits the specified function for invocation in a worker process
+
+        :param func: The picklable function to invoke
+        :param args: The (picklable) arguments for the function
+        :param done_callback: Invoked in the current process with the future of the invocation
+            once it has completed
+        :return: ``True`` if the invocation was submitted, ``False`` if the pool has been closed
+        """
+        self._semaphore.acquire()
+        with self._condition:
+            if self._closed:
+                self._semaphore.release()
+                return False
+            self._pending_count += 1
+            try:
+                future = self._executor.submit(func, *args)
+            except:
+                self._on_complete()
+                raise
+
+        def _on_done(future):
+            try:
+                done_callback(future)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Error completing process pool invocation")
+            finally:
+                self._on_complete()
+
+        future.add_done_callback(_on_done)
+        return True
+
+    def wait_idle(self, timeout=None):
+        """
+        Waits until there are no pending invocations
+
+        :param timeout: The maximum amount of time (in seconds) to wait (``None`` to wait
+            indefinitely)
+        :return: Whether there are no pending invocations
+        """
+        end_time = None if timeout is None else time.time() + timeout
+        with self._condition:
+            while self._pending_count:
+                if end_time is None:
+                    self._condition.wait()
+                else:
+                    remaining = end_time - time.time()
+                    if remaining <= 0:
+                        return False
+                    self._condition.wait(remaining)
+            return True
+
+    def close(self):
+        """
+        Stops accepting new invocations (invocations subsequently submitted are rejected). The
+        pending invocations continue to run.
+        """
+        with self._condition:
+            self._closed = True
+
+    def shutdown(self, wait_complete=True):
+        """
+        Shuts down the pool
+
+        :param wait_complete: Whether to wait for the pending invocations to complete
+        """
+        logger.debug("Shutting down process pool...")
+        self.close()
+        self._executor.shutdown(wait=wait_complete)
@@ -0,0 +1,130 @@
+""" Cache of the responses to DXL requests. """
+
+from __future__ import absolute_import
+from collections import OrderedDict
+from threading import Lock
+import hashlib
+import logging
+import time
+
+from ._compat import UnicodeString
+
+# Configure local logger
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache(object):
+    """
+    Least recently used (LRU) cache of the responses to the requests sent to a DXL topic,
+    keyed on a hash of the request payload. Entries expire after a time-to-live (TTL), and the
+    least recently used entries are evicted when the maximum number of entries or the maximum
+    total payload size is exceeded.
+    """
+
+    def __init__(self, ttl, max_entries, max_bytes):
+        """
+        Constructs the cache
+
+        :param ttl: The amount of time (in seconds) for which a response is cached
+        :param max_entries: The maximum number of cached responses
+        :param max_bytes: The maximum total size (in bytes) of the cached response payloads
+        """
+        if ttl <= 0:
+            raise Exception("Response cache TTL must be greater than 0")
+        if max_entries < 1:
+            raise Exception("Response cache maximum entries must be greater than or equal to 1")
+        if max_bytes < 1:
+            raise Exception("Response cache maximum bytes must be greater than or equal to 1")
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._lock = Lock()
+        # Key to (expiration time, size, response), in order of use (least recent first)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    @staticmethod
+    def get_key(request):
+        """
+        Returns the cache key for the specified request
+
+        :param request: The DXL request
+        :return: The cache key (a hash of the request payload)
+        """
+        payload = request.payload
+        if payload is None:
+            payload = b""
+        elif isinstance(payload, UnicodeString):
+            payload = payload.encode("utf-8")
+        return hashlib.sha256(payload).digest()
+
+    def get(self, key):
+        """
+        Returns the cached response for the specified key
+
+        :param key: The cache key
+        :return: The cached response (``None`` if no unexpired response is cached)
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                if entry[0] > time.time():
+                    # Mark the entry as the most recently used
+                    self._entries[key] = entry
+                    self._hits += 1
+                    return entry[2]
+                self._bytes -= entry[1]
+                self._expirations += 1
+            self._misses += 1
+            return None
+
+    def put(self, key, response):
+        """
+        Caches the specified response
+
+        :param key: The cache key
+        :param response: The DXL response
+        """
+        size = len(response.payload) if response.payload else 0
+        if size > self._max_bytes:
+            return
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry[1]
+            self._entries[key] = (time.time() + self._ttl, size, response)
+            self._bytes += size
+            while len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+                _, entry = self._entries.popitem(last=False)
+                self._bytes -= entry[1]
+                self._evictions += 1
+
+    def clear(self):
+        """
+        Removes all of the cached responses
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self):
+        """
+        Returns the statistics of the cache
+
+        :return: A dictionary containing the number of ``hits``, ``misses``, ``evictions``
+            (due to the size limits), and ``expirations``, and the current number of
+            ``entries`` and total payload ``bytes``
+        """
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "entries": len(self._entries),
+                "bytes": self._bytes
+            }
@@ -0,0 +1,144 @@
+from __future__ import absolute_import
+from threading import Condition, Thread
+import heapq
+import itertools
+import logging
+import time
+
+# Configure local logger
+logger = logging.getLogger(__name__)
+
+
+class ScheduledCall(object):
+    """
+    A function call scheduled via a :class:`Scheduler`
+    """
+
+    def __init__(self, scheduler, deadline, func, args):
+        """
+        Constructs the scheduled call
+
+        :param scheduler: The scheduler
+        :param deadline: The time at which the function is invoked
+        :param func: The function to invoke
+        :param args: The arguments for the function
+        """
+        self._scheduler = scheduler
+        self.deadline = deadline
+        self.func = func
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        """
+        Cancels the call (has no effect if the function has already been invoked)
+        """
+        self._scheduler._cancel(self) # pylint: disable=protected-access
+
+
+class Scheduler(object):
+    """
+    Invokes functions after a delay on a single (daemon) thread. Used for timeouts and delays
+    which would otherwise require a timer thread per call.
+
+    The scheduled functions must not block, as they delay the functions scheduled after them.
+    """
+
+    # The minimum number of cancelled calls before the queue is compacted
+    _COMPACT_THRESHOLD = 1000
+
+    def __init__(self, thread_name):
+        """
+        Constructs the scheduler
+
+        :param thread_name: The name of the scheduler thread
+        """
+        self._thread_name = thread_name
+        self._condition = Condition()
+        # Heap of (deadline, sequence number, call)
+        self._queue = []
+        self._sequence = itertools.count()
+        self._cancelled_count = 0
+        self._thread = None
+
+    def schedule(self, delay, func, *args):
+        """
+        Schedules the specified function to be invoked after the specified delay
+
+        :param delay: The delay (in seconds)
+        :param func: The function to invoke
+        :param args: The arguments for the function
+        :return: The scheduled call (:class:`ScheduledCall`), which can be cancelled
+        """
+        call = ScheduledCall(self, time.time() + delay, func, args)
+        with self._condition:
+            heapq.heappush(self._queue, (call.deadline, next(self._sequence), call))
+            if self._thread is None:
+                self._thread = Thread(target=self._run, name=self._thread_name)
+                self._thread.daemon = True
+                self._thread.start()
+            elif self._queue[0][2] is call:
+                self._condition.notify()
+        return call
+
+    def _cancel(self, call):
+        """
+        Cancels the specified call
+
+        :param call: The call
+        """
+        with self._condition:
+            if call.cancelled:
+                return
+            call.cancelled = True
+            self._cancelled_count += 1
+            # Remove the cancelled calls once they make up most of the queue
+            if self._cancelled_count >= self._COMPACT_THRESHOLD and \
+                    self._cancelled_count * 2 > len(self._queue):
+                self._queue = [entry for entry in self._queue if not entry[2].cancelled]
+                heapq.heapify(self._queue)
+                self._cancelled_count = 0
+
+    def _run(self):
+        """
+        Runs the scheduler thread
+        """
+        while True:
+            with self._condition:
+                while True:
+                    if not self._queue:
+                        self._condition.wait()
+                        continue
+                    deadline, _, call = self._queue[0]
+                    if call.cancelled:
+                        heapq.heappop(self._queue)
+                        self._cancelled_count -= 1
+                        continue
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        heapq.heappop(self._queue)
+                        # Prevents a later cancellation from being counted
+                        call.cancelled = True
+                        break
+                    self._condition.wait(remaining)
+            try:
+                call.func(*call.args)
+            except Exception: # pylint: disable=broad-except
+                logger.exception("Error in scheduled call")
+
+
+# The scheduler shared by the clients
+_scheduler = Scheduler("ClientScheduler")
+
+
+def schedule(delay, func, *args):
+    """
+    Schedules the specified function to be invoked after the specified delay (on the shared
+    scheduler thread)
+
+    :param delay: The delay (in seconds)
+    :param func: The function to invoke
+    :param args: The arguments for the function
+    :return: The scheduled call (:class:`ScheduledCall`), which can be cancelled
+    """
+    return _scheduler.schedule(delay, func, *args)
@@ -0,0 +1,69 @@
+""" Coalescing of identical concurrent calls. """
+
+from __future__ import absolute_import
+from concurrent.futures import Future
+from threading import Lock
+import logging
+
+# Configure local logger
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight(object):
+    """
+    Coalesces concurrent calls with the same key, so that only one of the calls (the first)
+    is in flight at a time. The calls made while it is in flight wait for it to complete, and
+    receive its result (or exception).
+    """
+
+    def __init__(self):
+        """
+        Constructs the single flight
+        """
+        self._lock = Lock()
+        # Key to the future of the call in flight
+        self._calls = {}
+
+    def call(self, key, func, args=(), timeout=None):
+        """
+        Invokes the specified function, unless a call with the same key is already in flight,
+        in which case the result of that call is returned (or its exception raised)
+
+        :param key: The key of the call (must be hashable)
+        :param func: The function to invoke
+        :param args: The arguments for the function (tuple)
+        :param timeout: The maximum amount of time (in seconds) to wait for the call in flight
+            (``None`` to wait indefinitely). A :class:`concurrent.futures.TimeoutError` is
+            raised if it is exceeded.
+        :return: The result of the function
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                future.set_running_or_notify_cancel()
+                self._calls[key] = future
+        if not leader:
+            return future.result(timeout)
+        try:
+            result = func(*args)
+        except BaseException as ex: # pylint: disable=broad-except
+            # Includes interruptions (KeyboardInterrupt, etc.), so that the waiting calls are
+            # always released
+            future.set_exception(ex)
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            self._complete(key)
+        return result
+
+    def _complete(self, key):
+        """
+        Removes the call with the specified key (subsequent calls with the key are invoked)
+
+        :param key: The key of the call
+        """
+        with self._lock:
+            del self._calls[key]
@@ -0,0 +1,355 @@
+from __future__ import absolute_import
+from collections import deque
+from threading import Condition, Thread, current_thread
+import logging
+import time
+
+from dxlclient._uuid_generator import UuidGenerator
+
+# Configure local logger
+logger = logging.getLogger(__name__)
+
+
+class CallbacksPool(object):
+    """
+    Pool of threads used to invoke application-specific message callbacks.
+
+    Unlike the DXL client thread pool, the behavior when the queue of the pool is full
+    is determined by an "overflow policy":
+
+    * ``block``: The caller waits until space is available in the queue (or the pool is closed)
+    * ``dropOldest``: The oldest queued task is discarded to make room for the new task
+    * ``dropNewest``: The new task is discarded
+    * ``reject``: The new task is discarded (counted separately from ``dropNewest``)
+
+    Tasks added via :func:`add_sheddable_task` are notified when they are discarded (for
+    example, to send an error response for a request).
+    """
+
+    # Overflow policy: block the caller until space is available
+    OVERFLOW_POLICY_BLOCK = "block"
+    # Overflow policy: discard the oldest queued task
+    OVERFLOW_POLICY_DROP_OLDEST = "dropOldest"
+    # Overflow policy: discard the new task
+    OVERFLOW_POLICY_DROP_NEWEST = "dropNewest"
+    # Overflow policy: discard the new task (reported as rejected)
+    OVERFLOW_POLICY_REJECT = "reject"
+
+    # The supported overflow policies
+    OVERFLOW_POLICIES = (OVERFLOW_POLICY_BLOCK, OVERFLOW_POLICY_DROP_OLDEST,
+                         OVERFLOW_POLICY_DROP_NEWEST, OVERFLOW_POLICY_REJECT)
+
+    # The number of shed tasks between log messages
+    SHED_LOG_INTERVAL = 1000
+
+    def __init__(self, queue_size, num_threads, thread_prefix,
+                 overflow_policy=OVERFLOW_POLICY_BLOCK):
+        """
+        Constructs the pool
+
+        :param queue_size: The maximum number of queued tasks (``0`` or less for an unbounded
+            queue)
+        :param num_threads: The number of threads in the pool
+        :param thread_prefix: The prefix for the names of the threads in the pool
+        :param overflow_policy: The policy to apply when the queue is full
+        """
+        self.validate_overflow_policy(overflow_policy)
+
+        self._queue_size = queue_size
+        self._thread_prefix = thread_prefix
+        self._overflow_policy = overflow_policy
+        self._tasks = deque()
+        self._condition = Condition()
+        self._closed = False
+        self._shutdown = False
+        # The number of tasks currently being invoked
+        self._active_count = 0
+        self._dropped_oldest_count = 0
+        self._dropped_newest_count = 0
+        self._rejected_count = 0
+        # The number of worker threads which should exit (the pool has been downsized)
+        self._retiring_count = 0
+        self._threads = []
+        for _ in range(num_threads):
+            self._start_worker()
+
+    @classmethod
+    def validate_overflow_policy(cls, overflow_policy):
+        """
+        Validates the overflow policy. An exception is thrown if the policy is unknown.
+
+        :param overflow_policy: The policy to apply when the queue is full
+        """
+        if overflow_policy not in cls.OVERFLOW_POLICIES:
+            raise Exception(
+                "Unknown overflow policy: {0}. Expected one of: {1}".format(
+                    overflow_policy, ", ".join(cls.OVERFLOW_POLICIES)))
+
+    def _start_worker(self):
+        """
+        Starts a worker thread
+        """
+        thread = Thread(target=self._run_worker)
+        thread.daemon = True
+        thread.name = self._thread_prefix + "-" + UuidGenerator.generate_id_as_string()
+        thread.start()
+        self._threads.append(thread)
+
+    @property
+    def overflow_policy(self):
+        """
+        The policy applied when the queue of the pool is full
+        """
+        return self._overflow_policy
+
+    @property
+    def queue_size(self):
+        """
+        The maximum number of queued tasks (``0`` or less for an unbounded queue)
+        """
+        return self._queue_size
+
+    def _is_full(self):
+        """
+        Returns whether the queue is full (must be invoked while holding the condition)
+
+        :return: Whether the queue is full
+        """
+        return 0 < self._queue_size <= len(self._tasks)
+
+    @property
+    def thread_count(self):
+        """
+        The number of threads in the pool
+        """
+        with self._condition:
+            return len(self._threads) - self._retiring_count
+
+    @property
+    def closed(self):
+        """
+        Whether the pool has been closed (no longer accepts new tasks)
+        """
+        return self._closed
+
+    @property
+    def queue_depth(self):
+        """
+        The number of tasks currently queued
+        """
+        with self._condition:
+            return len(self._tasks)
+
+    @property
+    def pending_count(self):
+        """
+        The number of tasks which have not completed (queued or currently being invoked)
+        """
+        with self._condition:
+            return len(self._tasks) + self._active_count
+
+    @property
+    def shed_counts(self):
+        """
+        A dictionary containing the number of tasks that have been shed by the pool
+        (``droppedOldest``, ``droppedNewest``, and ``rejected``)
+        """
+        with self._condition:
+            return {"droppedOldest": self._dropped_oldest_count,
+                    "droppedNewest": self._dropped_newest_count,
+                    "rejected": self._rejected_count}
+
+    def _log_shed(self, count):
+        """
+        Logs that tasks have been shed (periodically, to avoid flooding the log)
+
+        :param count: The total number of tasks shed for the current reason
+        """
+        if count % self.SHED_LOG_INTERVAL == 1:
+            logger.warning(
+                "Callback pool '%s' is full (policy=%s), tasks shed: %s",
+                self._thread_prefix, self._overflow_policy, self.shed_counts)
+
+    def add_task(self, func, *args, **kwargs):
+        """
+        Adds a task to the pool
+
+        :param func: The function to invoke
+        :param args: The positional arguments for the function
+        :param kwargs: The keyword arguments for the function
+        :return: ``True`` if the task was queued, ``False`` if it was shed due to the
+            overflow policy (``dropNewest`` or ``reject``) or because the pool has been closed
+            (tasks refused by a closed pool are not included in the :attr:`shed_counts`)
+        """
+        return self.add_sheddable_task(None, func, *args, **kwargs)
+
+    def add_sheddable_task(self, on_shed, func, *args, **kwargs):
+        """
+        Adds a task to the pool, which invokes the specified function if the task is shed due
+        to the overflow policy (whether the new task is discarded, or the task is discarded
+        later by the ``dropOldest`` policy to make room for another task)
+
+        :param on_shed: The function to invoke (with no arguments) if the task is shed
+            (optional)
+        :param func: The function to invoke
+        :param args: The positional arguments for the function
+        :param kwargs: The keyword arguments for the function
+        :return: ``True`` if the task was queued, ``False`` if it was shed due to the
+            overflow policy (``dropNewest`` or ``reject``) or because the pool has been closed
+            (tasks refused by a closed pool are not included in the :attr:`shed_counts`, and
+            ``on_shed`` is not invoked for them)
+        """
+        new_task = (func, args, kwargs, on_shed)
+        shed_task = None
+        with self._condition:
+            if self._closed:
+                return False
+            if self._is_full():
+                policy = self._overflow_policy
+                if policy == self.OVERFLOW_POLICY_BLOCK:
+                    while self._is_full() and not self._closed:
+                        self._condition.wait()
+                    # The pool may have been closed (or shut down) while waiting
+                    if self._closed:
+                        return False
+                elif policy == self.OVERFLOW_POLICY_DROP_OLDEST:
+                    shed_task = self._tasks.popleft()
+                    self._dropped_oldest_count += 1
+                    self._log_shed(self._dropped_oldest_count)
+                elif policy == self.OVERFLOW_POLICY_DROP_NEWEST:
+                    shed_task = new_task
+                    self._dropped_newest_count += 1
+                    self._log_shed(self._dropped_newest_count)
+                else:
+                    shed_task = new_task
+                    self._rejected_count += 1
+                    self._log_shed(self._rejected_count)
+            queued = shed_task is not new_task
+            if queued:
+                self._tasks.append(new_task)
+                self._condition.notify_all()
+        if shed_task is not None:
+            self._notify_shed(shed_task)
+        return queued
+
+    @staticmethod
+    def _notify_shed(task):
+        """
+        Invokes the shed function of the specified task (if any)
+
+        :param task: The task which has been shed
+        """
+        on_shed = task[3]
+        if on_shed is not None:
+            try:
+                on_shed()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Error notifying that a callback pool task was shed")
+
+    def _run_worker(self):
+        """
+        Runs a worker thread (invokes tasks until the pool is shut down)
+        """
+        while True:
+            with self._condition:
+                while not self._tasks and not self._shutdown and not self._retiring_count:
+                    self._condition.wait()
+                if self._retiring_count and not self._shutdown:
+                    self._retiring_count -= 1
+                    self._threads.remove(current_thread())
+                    return
+                if not self._tasks:
+                    return
+                func, args, kwargs, _ = self._tasks.popleft()
+                self._active_count += 1
+                self._condition.notify_all()
+            try:
+                func(*args, **kwargs)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Error in callback pool worker thread")
+            finally:
+                with self._condition:
+                    self._active_count -= 1
+                    self._condition.notify_all()
+
+    def resize(self, queue_size, num_threads, overflow_policy=None):
+        """
+        Changes the settings of the pool in place. Queued tasks are retained (even if the new
+        queue size is smaller than the number of queued tasks). When the number of threads is
+        reduced, the surplus threads exit once they have completed their current task.
+
+        :param queue_size: The maximum number of queued tasks (``0`` or less for an unbounded
+            queue)
+        :param num_threads: The number of threads in the pool
+        :param overflow_policy: The policy to apply when the queue is full (``None`` to retain
+            the current policy)
+        """
+        if overflow_policy is None:
+            overflow_policy = self._overflow_policy
+        self.validate_overflow_policy(overflow_policy)
+
+        with self._condition:
+            if self._shutdown:
+                return
+            self._queue_size = queue_size
+            self._overflow_policy = overflow_policy
+            delta = num_threads - (len(self._threads) - self._retiring_count)
+            if delta > 0:
+                # Cancel pending retirements prior to starting new threads
+                cancelled = min(delta, self._retiring_count)
+                self._retiring_count -= cancelled
+                for _ in range(delta - cancelled):
+                    self._start_worker()
+            elif delta < 0:
+                self._retiring_count -= delta
+            self._condition.notify_all()
+
+    def close(self):
+        """
+        Stops accepting new tasks (tasks subsequently added are rejected). The queued tasks
+        continue to be invoked.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def wait_idle(self, timeout=None):
+        """
+        Waits until there are no queued tasks and no tasks being invoked
+
+        :param timeout: The maximum amount of time (in seconds) to wait (``None`` to wait
+            indefinitely)
+        :return: Whether the pool is idle
+        """
+        end_time = None if timeout is None else time.time() + timeout
+        with self._condition:
+            while self._tasks or self._active_count:
+                if end_time is None:
+                    self._condition.wait()
+                else:
+                    remaining = end_time - time.time()
+                    if remaining <= 0:
+                        return False
+                    self._condition.wait(remaining)
+            return True
+
+    def shutdown(self, wait_complete=True):
+        """
+        Shuts down the pool
+
+        :param wait_complete: Whether to wait for the queued tasks to complete. If ``False``, the
+            queued tasks are discarded (tasks currently being invoked are not interrupted).
+        """
+        logger.debug("Shutting down callback pool '%s'...", self._thread_prefix)
+        with self._condition:
+            self._closed = True
+            self._shutdown = True
+            if not wait_complete:
+                self._tasks.clear()
+            self._condition.notify_all()
+
+        if wait_complete:
+            with self._condition:
+                threads = list(self._threads)
+            for thread in threads:
+                thread.join()
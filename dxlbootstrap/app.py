@@ -1,60 +1,39 @@
+# pylint: disable=too-many-lines
 from __future__ import absolute_import
+from functools import partial
 import shutil
 import logging
-from threading import RLock
+from threading import Event, RLock, Thread, current_thread
 import os
+import time
 import pkg_resources
 
 from dxlclient.client import DxlClient
 from dxlclient.client_config import DxlClientConfig
-from dxlclient.callbacks import EventCallback, RequestCallback
-from dxlclient._thread_pool import ThreadPool
-from ._compat import ConfigParser
+from dxlclient.exceptions import DxlException
+from ._compat import ConfigParser, iscoroutinefunction
+from .callbacks import BatchEventCallback
+from .metrics import MetricsHttpServer, MetricsRegistry
+from .schema import PayloadSchema
+from ._callback_wrappers import BatchingEventCallback, CallbackMetrics, \
+    CoroutineEventCallback, CoroutineRequestCallback, InstrumentedEventCallback, \
+    InstrumentedRequestCallback, ProcessEventCallback, ProcessRequestCallback, \
+    ThreadedEventCallback, ThreadedRequestCallback, ValidatingRequestCallback, \
+    CALLBACK_ERRORS_METRIC, CALLBACK_EXECUTION_METRIC, CALLBACK_QUEUE_WAIT_METRIC, \
+    INVALID_REQUEST_ERROR_CODE, INVALID_REQUEST_ERROR_MESSAGE, MESSAGES_RECEIVED_METRIC, \
+    OVERLOADED_ERROR_CODE, OVERLOADED_ERROR_MESSAGE, UNAVAILABLE_ERROR_CODE, \
+    UNAVAILABLE_ERROR_MESSAGE
+from ._coroutine_loop import CoroutineLoop
+from ._json_codec import get_json_codec
+from ._process_pool import ProcessCallbacksPool
+from ._thread_pool import CallbacksPool
+from .util import MessageUtils
 
 
 # Configure local logger
 logger = logging.getLogger(__name__)
 
 
-class _ThreadedEventCallback(EventCallback):
-    """
-    Callback wrapper that invokes the wrapped event callback via the specified thread pool
-    """
-    def __init__(self, callbacks_pool, callback):
-        """
-        Constructs the callback wrapper
-        :param callbacks_pool: The thread pool used to invoke the wrappers
-        :param callback: The callback to invoke
-        """
-        super(_ThreadedEventCallback, self).__init__()
-        self._delegate = callback
-        self._callbacks_pool = callbacks_pool
-
-    def on_event(self, event):
-        """
-        Invoked when a DXL event message is received
-        :param event: The DXL event message
-        """
-        self._callbacks_pool.add_task(self._delegate.on_event, event)
-
-
-class _ThreadedRequestCallback(RequestCallback):
-    """
-    Callback wrapper that invokes the wrapped request callback via the specified thread pool
-    """
-    def __init__(self, callbacks_pool, callback):
-        super(_ThreadedRequestCallback, self).__init__()
-        self._delegate = callback
-        self._callbacks_pool = callbacks_pool
-
-    def on_request(self, request):
-        """
-        Invoked when a DXL request message is received
-        :param request: The DXL request message
-        """
-        self._callbacks_pool.add_task(self._delegate.on_request, request)
-
-
 class Application(object):
     """
     Base class used for DXL applications.
@@ -73,22 +52,135 @@ class Application(object):
     INCOMING_MESSAGE_POOL_CONFIG_SECTION = "IncomingMessagePool"
     # The name of the "MessageCallbackPool" section within the configuration file
     MESSAGE_CALLBACK_POOL_CONFIG_SECTION = "MessageCallbackPool"
+    # The prefix for sections within the configuration file that define named callback pools
+    # (for example, "MessageCallbackPool:bulk")
+    NAMED_MESSAGE_CALLBACK_POOL_CONFIG_SECTION_PREFIX = MESSAGE_CALLBACK_POOL_CONFIG_SECTION + ":"
+
+    # The name of the "CoroutineLoop" section within the configuration file
+    COROUTINE_LOOP_CONFIG_SECTION = "CoroutineLoop"
+    # The name of the "ProcessPool" section within the configuration file
+    PROCESS_POOL_CONFIG_SECTION = "ProcessPool"
+    # The name of the "Metrics" section within the configuration file
+    METRICS_CONFIG_SECTION = "Metrics"
+    # The name of the "ConfigurationReload" section within the configuration file
+    CONFIGURATION_RELOAD_CONFIG_SECTION = "ConfigurationReload"
+    # The name of the "MessagePayload" section within the configuration file
+    MESSAGE_PAYLOAD_CONFIG_SECTION = "MessagePayload"
 
     # The property used to specify a queue size
     QUEUE_SIZE_CONFIG_PROP = "queueSize"
     # The property used to specify a thread count
     THREAD_COUNT_CONFIG_PROP = "threadCount"
+    # The property used to specify the topics associated with a named callback pool
+    TOPICS_CONFIG_PROP = "topics"
+    # The property used to specify the service types associated with a named callback pool
+    SERVICES_CONFIG_PROP = "services"
+    # The property used to specify the policy applied when the queue of a callback pool is full
+    OVERFLOW_POLICY_CONFIG_PROP = "overflowPolicy"
+    # The property used to specify the maximum amount of time (in seconds) to wait for pending
+    # callbacks when the application is destroyed
+    DRAIN_TIMEOUT_CONFIG_PROP = "drainTimeout"
+    # The property used to specify the maximum number of coroutine callbacks in flight
+    CONCURRENCY_CONFIG_PROP = "concurrency"
+    # The property used to specify a process count
+    PROCESS_COUNT_CONFIG_PROP = "processCount"
+    # The property used to specify the interval (in seconds) for logging the metrics
+    LOG_INTERVAL_CONFIG_PROP = "logInterval"
+    # The property used to specify the port of the metrics HTTP endpoint
+    HTTP_PORT_CONFIG_PROP = "httpPort"
+    # The property used to specify the host (interface) of the metrics HTTP endpoint
+    HTTP_HOST_CONFIG_PROP = "httpHost"
+    # The property used to specify the interval (in seconds) for checking whether the
+    # configuration file has been modified
+    CHECK_INTERVAL_CONFIG_PROP = "checkInterval"
+    # The property used to specify the JSON codec used for message payloads
+    JSON_CODEC_CONFIG_PROP = "jsonCodec"
+    # The property used to specify the maximum size (in bytes) of a decompressed payload
+    MAX_DECOMPRESSED_SIZE_CONFIG_PROP = "maxDecompressedSize"
+
+    # The thread name prefix for the callback pools
+    CALLBACKS_POOL_THREAD_PREFIX = "CallbacksPool"
+    # The thread name for the coroutine loop
+    COROUTINE_LOOP_THREAD_NAME = "CoroutineLoop"
+    # The thread name prefix for the batch event callbacks
+    BATCH_EVENT_CALLBACK_THREAD_PREFIX = "BatchEventCallback"
+    # The thread name for logging the metrics
+    METRICS_LOG_THREAD_NAME = "MetricsLog"
+    # The thread name for checking whether the configuration file has been modified
+    CONFIGURATION_RELOAD_THREAD_NAME = "ConfigurationReload"
+
+    # The metric for the number of messages received per callback topic
+    MESSAGES_RECEIVED_METRIC = MESSAGES_RECEIVED_METRIC
+    # The metric for the number of callback errors per callback topic
+    CALLBACK_ERRORS_METRIC = CALLBACK_ERRORS_METRIC
+    # The metric for the time (in seconds) messages wait in a callback pool per callback topic
+    CALLBACK_QUEUE_WAIT_METRIC = CALLBACK_QUEUE_WAIT_METRIC
+    # The metric for the execution time (in seconds) of callbacks per callback topic
+    CALLBACK_EXECUTION_METRIC = CALLBACK_EXECUTION_METRIC
+    # The metric for the number of messages queued in the incoming message pool
+    INCOMING_QUEUE_DEPTH_METRIC = "dxlbootstrap_incoming_queue_depth"
+    # The metric for the number of messages queued per callback pool
+    CALLBACKS_POOL_QUEUE_DEPTH_METRIC = "dxlbootstrap_callbacks_pool_queue_depth"
+    # The metric for the number of requests rejected by payload validation per callback topic
+    INVALID_REQUESTS_METRIC = "dxlbootstrap_callback_invalid_requests_total"
+    # The metric for the number of messages shed per callback pool (and reason)
+    CALLBACKS_POOL_SHED_METRIC = "dxlbootstrap_callbacks_pool_shed_messages_total"
+    # The callback pool label value for the default pool
+    DEFAULT_CALLBACKS_POOL_LABEL = "default"
 
     # The default thread count for the incoming message pool
     DEFAULT_THREAD_COUNT = 10
     # The default queue size for the incoming message pool
     DEFAULT_QUEUE_SIZE = 1000
+    # The default policy applied when the queue of a callback pool is full
+    DEFAULT_OVERFLOW_POLICY = CallbacksPool.OVERFLOW_POLICY_BLOCK
+    # The default maximum amount of time (in seconds) to wait for pending callbacks when the
+    # application is destroyed
+    DEFAULT_DRAIN_TIMEOUT = 30
+    # The interval (in seconds) at which the status is logged while draining callbacks
+    DRAIN_STATUS_INTERVAL = 1
+
+    # The default interval (in seconds) for logging the metrics (0 disables logging)
+    DEFAULT_METRICS_LOG_INTERVAL = 0
+    # The default host (interface) of the metrics HTTP endpoint (local only)
+    DEFAULT_METRICS_HTTP_HOST = "127.0.0.1"
+
+    # The default maximum number of coroutine callbacks in flight
+    DEFAULT_COROUTINE_CONCURRENCY = 1000
+
+    # The default interval (in seconds) for checking whether the configuration file has been
+    # modified (0 disables checking)
+    DEFAULT_CONFIGURATION_RELOAD_CHECK_INTERVAL = 0
+
+    # The error code sent for requests rejected due to a full callback pool
+    OVERLOADED_ERROR_CODE = OVERLOADED_ERROR_CODE
+    # The error message sent for requests rejected due to a full callback pool
+    OVERLOADED_ERROR_MESSAGE = OVERLOADED_ERROR_MESSAGE
+    # The error code sent for requests received while the application is being destroyed
+    UNAVAILABLE_ERROR_CODE = UNAVAILABLE_ERROR_CODE
+    # The error message sent for requests received while the application is being destroyed
+    UNAVAILABLE_ERROR_MESSAGE = UNAVAILABLE_ERROR_MESSAGE
+    # The error code sent for requests whose payload does not conform to the payload schema
+    INVALID_REQUEST_ERROR_CODE = INVALID_REQUEST_ERROR_CODE
+    # The error message sent for requests whose payload does not conform to the payload schema
+    INVALID_REQUEST_ERROR_MESSAGE = INVALID_REQUEST_ERROR_MESSAGE
 
     # The directory containing the configuration files (in the Python library)
     LIB_CONFIG_DIR = "_config"
     # The directory containing the application configuration files (in the Python library)
     LIB_APP_CONFIG_DIR = LIB_CONFIG_DIR + "/app"
 
+    # The attributes which are set when the application-specific configuration file is read
+    # (restored if a reloaded configuration is invalid)
+    _CONFIGURATION_ATTRIBUTES = (
+        "_config", "_incoming_queue_size", "_incoming_thread_count", "_callbacks_queue_size",
+        "_callbacks_thread_count", "_callbacks_overflow_policy", "_drain_timeout",
+        "_named_callbacks_pool_settings", "_callbacks_pool_name_by_topic",
+        "_callbacks_pool_name_by_service_type", "_coroutine_concurrency",
+        "_process_pool_queue_size", "_process_pool_process_count",
+        "_config_reload_check_interval", "_metrics_log_interval", "_metrics_http_port",
+        "_metrics_http_host")
+
     def __init__(self, config_dir, app_config_file_name):
         """
         Constructs the application
@@ -104,6 +196,8 @@ class Application(object):
         self._running = False
         self._destroyed = False
         self._services = []
+        # Services whose registration is deferred (None if registrations are not deferred)
+        self._deferred_services = None
 
         self._incoming_thread_count = self.DEFAULT_THREAD_COUNT
         self._incoming_queue_size = self.DEFAULT_QUEUE_SIZE
@@ -111,8 +205,46 @@ class Application(object):
         self._callbacks_pool = None
         self._callbacks_thread_count = self.DEFAULT_THREAD_COUNT
         self._callbacks_queue_size = self.DEFAULT_QUEUE_SIZE
+        self._callbacks_overflow_policy = self.DEFAULT_OVERFLOW_POLICY
+        self._drain_timeout = self.DEFAULT_DRAIN_TIMEOUT
+
+        # Named callback pools (pool name to pool, pool name to
+        # (queueSize, threadCount, overflowPolicy))
+        self._named_callbacks_pools = {}
+        self._named_callbacks_pool_settings = {}
+        # Named callback pool assignments (topic to pool name, service type to pool name)
+        self._callbacks_pool_name_by_topic = {}
+        self._callbacks_pool_name_by_service_type = {}
+
+        self._coroutine_loop = None
+        self._coroutine_concurrency = self.DEFAULT_COROUTINE_CONCURRENCY
+
+        self._batching_callbacks = []
+        # (Topic, callback) to the callback wrapper registered with the DXL client
+        self._callback_wrappers = {}
+
+        self._process_pool = None
+        self._process_pool_queue_size = self.DEFAULT_QUEUE_SIZE
+        # The default (None) is the number of processors on the machine
+        self._process_pool_process_count = None
 
         self._config = None
+        # The modification time of the configuration file when it was last loaded
+        self._config_mtime = None
+        self._config_reload_check_interval = self.DEFAULT_CONFIGURATION_RELOAD_CHECK_INTERVAL
+        self._config_reload_thread = None
+        self._config_reload_stop = Event()
+
+        self._metrics = MetricsRegistry()
+        self._metrics.gauge(self.INCOMING_QUEUE_DEPTH_METRIC,
+                            func=self._get_incoming_queue_depth)
+        self._metrics_log_interval = self.DEFAULT_METRICS_LOG_INTERVAL
+        self._metrics_log_thread = None
+        self._metrics_log_stop = Event()
+        # The port of the metrics HTTP endpoint (None if disabled)
+        self._metrics_http_port = None
+        self._metrics_http_host = self.DEFAULT_METRICS_HTTP_HOST
+        self._metrics_http_server = None
 
         self._lock = RLock()
 
@@ -184,13 +316,23 @@ class Application(object):
         """
         Loads the configuration settings from the application-specific configuration file
         """
+        self.on_load_configuration(self._read_configuration())
+
+    def _read_configuration(self):
+        """
+        Reads the configuration settings from the application-specific configuration file
+
+        :return: The application-specific configuration
+        """
+        config_mtime = os.path.getmtime(self._app_config_path)
         config = ConfigParser()
-        self._config = config
         read_files = config.read(self._app_config_path)
         if len(read_files) is not 1:
             raise Exception(
                 "Error attempting to read application configuration file: {0}".format(
                     self._app_config_path))
+        self._config = config
+        self._config_mtime = config_mtime
 
         #
         # Load incoming pool settings
@@ -225,7 +367,173 @@ class Application(object):
         except:
             pass
 
-        self.on_load_configuration(config)
+        try:
+            self._callbacks_overflow_policy = config.get(self.MESSAGE_CALLBACK_POOL_CONFIG_SECTION,
+                                                         self.OVERFLOW_POLICY_CONFIG_PROP)
+        except:
+            pass
+
+        try:
+            self._drain_timeout = config.getfloat(self.MESSAGE_CALLBACK_POOL_CONFIG_SECTION,
+                                                  self.DRAIN_TIMEOUT_CONFIG_PROP)
+        except:
+            pass
+
+        self._load_named_callbacks_pools_configuration(config)
+        self._load_coroutine_loop_and_process_pool_configuration(config)
+
+        #
+        # Load configuration reload settings
+        #
+
+        try:
+            self._config_reload_check_interval = config.getfloat(
+                self.CONFIGURATION_RELOAD_CONFIG_SECTION, self.CHECK_INTERVAL_CONFIG_PROP)
+        except:
+            pass
+
+        self._load_metrics_configuration(config)
+        self._validate_callbacks_pools_configuration()
+        # Loaded last, as the message payload settings are applied when they are loaded
+        self._load_message_payload_configuration(config)
+
+        return config
+
+    def _validate_callbacks_pools_configuration(self):
+        """
+        Validates the loaded callback pool settings. An exception is thrown if a setting is
+        invalid.
+        """
+        CallbacksPool.validate_overflow_policy(self._callbacks_overflow_policy)
+        for pool_name, (_, _, overflow_policy) in \
+                sorted(self._named_callbacks_pool_settings.items()):
+            try:
+                CallbacksPool.validate_overflow_policy(overflow_policy)
+            except Exception as ex:
+                raise Exception("Invalid callback pool settings ({0}): {1}".format(
+                    pool_name, ex))
+
+    def _load_coroutine_loop_and_process_pool_configuration(self, config):
+        """
+        Loads the settings for the coroutine loop and the process pool from the
+        application-specific configuration file
+
+        :param config: The application-specific configuration
+        """
+        # pylint: disable=bare-except
+        try:
+            self._coroutine_concurrency = config.getint(self.COROUTINE_LOOP_CONFIG_SECTION,
+                                                        self.CONCURRENCY_CONFIG_PROP)
+        except:
+            pass
+
+        try:
+            self._process_pool_queue_size = config.getint(self.PROCESS_POOL_CONFIG_SECTION,
+                                                          self.QUEUE_SIZE_CONFIG_PROP)
+        except:
+            pass
+
+        try:
+            self._process_pool_process_count = config.getint(self.PROCESS_POOL_CONFIG_SECTION,
+                                                             self.PROCESS_COUNT_CONFIG_PROP)
+        except:
+            pass
+
+    def _load_metrics_configuration(self, config):
+        """
+        Loads the metrics settings from the application-specific configuration file
+
+        :param config: The application-specific configuration
+        """
+        # pylint: disable=bare-except
+        try:
+            self._metrics_log_interval = config.getfloat(self.METRICS_CONFIG_SECTION,
+                                                         self.LOG_INTERVAL_CONFIG_PROP)
+        except:
+            pass
+
+        try:
+            self._metrics_http_port = config.getint(self.METRICS_CONFIG_SECTION,
+                                                    self.HTTP_PORT_CONFIG_PROP)
+        except:
+            pass
+
+        try:
+            self._metrics_http_host = config.get(self.METRICS_CONFIG_SECTION,
+                                                 self.HTTP_HOST_CONFIG_PROP)
+        except:
+            pass
+
+    def _load_message_payload_configuration(self, config):
+        """
+        Loads the message payload settings from the application-specific configuration file
+
+        :param config: The application-specific configuration
+        """
+        # The settings are validated before any of them are applied
+        json_codec = None
+        if config.has_option(self.MESSAGE_PAYLOAD_CONFIG_SECTION, self.JSON_CODEC_CONFIG_PROP):
+            json_codec = config.get(self.MESSAGE_PAYLOAD_CONFIG_SECTION,
+                                    self.JSON_CODEC_CONFIG_PROP).strip()
+            get_json_codec(json_codec)
+        max_decompressed_size = None
+        if config.has_option(self.MESSAGE_PAYLOAD_CONFIG_SECTION,
+                             self.MAX_DECOMPRESSED_SIZE_CONFIG_PROP):
+            max_decompressed_size = config.getint(self.MESSAGE_PAYLOAD_CONFIG_SECTION,
+                                                  self.MAX_DECOMPRESSED_SIZE_CONFIG_PROP)
+
+        if max_decompressed_size is not None:
+            MessageUtils.set_max_decompressed_size(max_decompressed_size)
+        if json_codec is not None:
+            MessageUtils.set_json_codec(json_codec)
+        logger.info("JSON codec: %s", MessageUtils.get_json_codec())
+
+    def _load_named_callbacks_pools_configuration(self, config):
+        """
+        Loads the settings for the named callback pools (sections named
+        "MessageCallbackPool:<name>") from the application-specific configuration file
+
+        :param config: The application-specific configuration
+        """
+        prefix = self.NAMED_MESSAGE_CALLBACK_POOL_CONFIG_SECTION_PREFIX
+        for section in config.sections():
+            if not section.startswith(prefix):
+                continue
+            pool_name = section[len(prefix):].strip()
+            if not pool_name:
+                raise Exception(
+                    "Callback pool name not specified for section: {0}".format(section))
+
+            queue_size = self._callbacks_queue_size
+            thread_count = self._callbacks_thread_count
+            overflow_policy = self._callbacks_overflow_policy
+            # pylint: disable=bare-except
+            try:
+                queue_size = config.getint(section, self.QUEUE_SIZE_CONFIG_PROP)
+            except:
+                pass
+
+            try:
+                thread_count = config.getint(section, self.THREAD_COUNT_CONFIG_PROP)
+            except:
+                pass
+
+            try:
+                overflow_policy = config.get(section, self.OVERFLOW_POLICY_CONFIG_PROP)
+            except:
+                pass
+
+            self._named_callbacks_pool_settings[pool_name] = \
+                (queue_size, thread_count, overflow_policy)
+
+            for prop, pool_name_by_key in \
+                    ((self.TOPICS_CONFIG_PROP, self._callbacks_pool_name_by_topic),
+                     (self.SERVICES_CONFIG_PROP, self._callbacks_pool_name_by_service_type)):
+                if config.has_option(section, prop):
+                    for key in config.get(section, prop).split(","):
+                        key = key.strip()
+                        if key:
+                            pool_name_by_key[key] = pool_name
 
     def _dxl_connect(self):
         """
@@ -238,8 +546,14 @@ class Application(object):
         logger.info("Incoming message configuration: queueSize=%d, threadCount=%d",
                     config.incoming_message_queue_size,
                     config.incoming_message_thread_pool_size)
-        logger.info("Message callback configuration: queueSize=%d, threadCount=%d",
-                    self._callbacks_queue_size, self._callbacks_thread_count)
+        logger.info("Message callback configuration: queueSize=%d, threadCount=%d, "
+                    "overflowPolicy=%s", self._callbacks_queue_size,
+                    self._callbacks_thread_count, self._callbacks_overflow_policy)
+        for pool_name, (queue_size, thread_count, overflow_policy) in \
+                sorted(self._named_callbacks_pool_settings.items()):
+            logger.info("Message callback configuration (%s): queueSize=%d, threadCount=%d, "
+                        "overflowPolicy=%s", pool_name, queue_size, thread_count,
+                        overflow_policy)
 
         self._dxl_client = DxlClient(config)
         logger.info("Attempting to connect to DXL fabric ...")
@@ -247,7 +561,18 @@ class Application(object):
         logger.info("Connected to DXL fabric.")
 
         self.on_register_event_handlers()
-        self.on_register_services()
+
+        # Services registered by the application while registering its services are registered
+        # with the fabric concurrently (once all of them have been registered)
+        with self._lock:
+            self._deferred_services = []
+        try:
+            self.on_register_services()
+        finally:
+            with self._lock:
+                deferred_services = self._deferred_services
+                self._deferred_services = None
+        self._register_services(deferred_services)
 
         self.on_dxl_connect()
 
@@ -266,22 +591,318 @@ class Application(object):
             self._validate_config_files()
             self._load_configuration()
             self._dxl_connect()
+            self._start_metrics_log()
+            self._start_metrics_http_server()
+            self._start_configuration_reload_check()
+
+    def reload_configuration(self):
+        """
+        Reloads the application-specific configuration file while the application is running
+        (without disconnecting from the DXL fabric).
+
+        The callback pools are resized in place (queue size, thread count, and overflow policy),
+        the drain timeout and the metrics log interval are updated, and
+        :func:`on_reload_configuration` is invoked. The assignments of topics and service types
+        to named callback pools only apply to callbacks registered after the reload. The settings
+        of the incoming message pool, the coroutine loop, the process pool, and the metrics HTTP
+        endpoint require a restart of the application to take effect.
+
+        The whole configuration is validated before it is applied. If it is invalid, an
+        exception is thrown and the current configuration is retained.
+        """
+        with self._lock:
+            if not self._running or self._destroyed:
+                raise Exception("The application is not running")
+
+            logger.info("Reloading application configuration ...")
+            restart_settings = self._get_restart_settings()
+            metrics_log_interval = self._metrics_log_interval
+            config_reload_check_interval = self._config_reload_check_interval
+            previous_settings = dict((name, getattr(self, name))
+                                     for name in self._CONFIGURATION_ATTRIBUTES)
+
+            try:
+                # Settings which are not specified in the configuration file revert to their
+                # defaults
+                self._callbacks_queue_size = self.DEFAULT_QUEUE_SIZE
+                self._callbacks_thread_count = self.DEFAULT_THREAD_COUNT
+                self._callbacks_overflow_policy = self.DEFAULT_OVERFLOW_POLICY
+                self._drain_timeout = self.DEFAULT_DRAIN_TIMEOUT
+                self._metrics_log_interval = self.DEFAULT_METRICS_LOG_INTERVAL
+                self._config_reload_check_interval = \
+                    self.DEFAULT_CONFIGURATION_RELOAD_CHECK_INTERVAL
+                self._named_callbacks_pool_settings = {}
+                self._callbacks_pool_name_by_topic = {}
+                self._callbacks_pool_name_by_service_type = {}
+                config = self._read_configuration()
+            except Exception as ex:
+                # The modification time of the invalid configuration file is retained, so that
+                # it is not reloaded again until it is modified
+                for name, value in previous_settings.items():
+                    setattr(self, name, value)
+                logger.error("Invalid application configuration, retaining the current "
+                             "configuration: %s", ex)
+                raise
+
+            self._resize_callbacks_pools()
+            if self._get_restart_settings() != restart_settings:
+                logger.warning("Changes to the incoming message pool, coroutine loop, process "
+                               "pool, or metrics endpoint settings require a restart")
+            if self._metrics_log_interval != metrics_log_interval:
+                self._stop_metrics_log()
+                self._start_metrics_log()
+            if self._config_reload_check_interval != config_reload_check_interval:
+                self._stop_configuration_reload_check()
+                self._start_configuration_reload_check()
+
+            self.on_reload_configuration(config)
+
+    def reload_configuration_if_modified(self):
+        """
+        Reloads the application-specific configuration file (see :func:`reload_configuration`)
+        if it has been modified since it was last loaded
+
+        :return: Whether the configuration was reloaded
+        """
+        with self._lock:
+            if os.path.getmtime(self._app_config_path) == self._config_mtime:
+                return False
+            self.reload_configuration()
+            return True
+
+    def _get_restart_settings(self):
+        """
+        Returns the settings which require a restart of the application to take effect
+
+        :return: The settings which require a restart of the application to take effect (tuple)
+        """
+        return (self._incoming_queue_size, self._incoming_thread_count,
+                self._coroutine_concurrency, self._process_pool_queue_size,
+                self._process_pool_process_count, self._metrics_http_port,
+                self._metrics_http_host)
+
+    def _resize_callbacks_pools(self):
+        """
+        Applies the current callback pool settings to the existing callback pools
+        """
+        if self._callbacks_pool is not None:
+            self._callbacks_pool.resize(self._callbacks_queue_size,
+                                        self._callbacks_thread_count,
+                                        self._callbacks_overflow_policy)
+            logger.info("Message callback configuration: queueSize=%d, threadCount=%d, "
+                        "overflowPolicy=%s", self._callbacks_queue_size,
+                        self._callbacks_thread_count, self._callbacks_overflow_policy)
+        for pool_name, pool in sorted(self._named_callbacks_pools.items()):
+            queue_size, thread_count, overflow_policy = \
+                self._named_callbacks_pool_settings.get(
+                    pool_name, (self._callbacks_queue_size, self._callbacks_thread_count,
+                                self._callbacks_overflow_policy))
+            pool.resize(queue_size, thread_count, overflow_policy)
+            logger.info("Message callback configuration (%s): queueSize=%d, threadCount=%d, "
+                        "overflowPolicy=%s", pool_name, queue_size, thread_count,
+                        overflow_policy)
+
+    def _start_configuration_reload_check(self):
+        """
+        Starts the thread which periodically reloads the configuration file if it has been
+        modified (if enabled in the configuration)
+        """
+        if self._config_reload_check_interval > 0:
+            stop = self._config_reload_stop = Event()
+            interval = self._config_reload_check_interval
+
+            def _run():
+                while not stop.wait(interval):
+                    try:
+                        self.reload_configuration_if_modified()
+                    except Exception: # pylint: disable=broad-except
+                        logger.exception("Error reloading application configuration")
+
+            self._config_reload_thread = Thread(target=_run,
+                                                name=self.CONFIGURATION_RELOAD_THREAD_NAME)
+            self._config_reload_thread.daemon = True
+            self._config_reload_thread.start()
+
+    def _stop_configuration_reload_check(self):
+        """
+        Stops the thread which periodically checks whether the configuration file has been
+        modified
+        """
+        if self._config_reload_thread is not None:
+            self._config_reload_stop.set()
+            if self._config_reload_thread is not current_thread():
+                self._config_reload_thread.join()
+            self._config_reload_thread = None
 
     def destroy(self):
         """
         Destroys the application (disconnects from fabric, frees resources, etc.)
+
+        The application is drained prior to disconnecting from the fabric: its services are
+        unregistered, new messages are no longer accepted by the callback pools (requests
+        receive an error response), and the messages already accepted are given up to the
+        configured drain timeout to be processed.
         """
+        # Stopped prior to acquiring the lock (a reload in progress holds the lock)
+        self._stop_configuration_reload_check()
         with self._lock:
             if self._running and not self._destroyed:
                 logger.info("Destroying application ...")
-                if self._callbacks_pool is not None:
-                    self._callbacks_pool.shutdown()
                 if self._dxl_client is not None:
                     self._unregister_services()
+                drained = self._drain_callbacks()
+                if self._callbacks_pool is not None:
+                    self._callbacks_pool.shutdown(drained)
+                for pool in self._named_callbacks_pools.values():
+                    pool.shutdown(drained)
+                if self._coroutine_loop is not None:
+                    self._coroutine_loop.shutdown(drained)
+                if self._process_pool is not None:
+                    self._process_pool.shutdown(drained)
+                if self._dxl_client is not None:
                     self._dxl_client.destroy()
                     self._dxl_client = None
+                self._stop_metrics_log()
+                self._stop_metrics_http_server()
                 self._destroyed = True
 
+    def _drain_callbacks(self):
+        """
+        Stops accepting new messages for the callbacks invoked on separate threads (or processes)
+        and waits up to the drain timeout for the accepted messages to be processed
+
+        :return: Whether all of the accepted messages were processed
+        """
+        for callback in self._batching_callbacks:
+            callback.close()
+
+        pools = list(self._named_callbacks_pools.values())
+        if self._callbacks_pool is not None:
+            pools.append(self._callbacks_pool)
+        drainables = pools + [drainable for drainable in (self._coroutine_loop, self._process_pool)
+                              if drainable is not None]
+        for drainable in drainables:
+            drainable.close()
+        end_time = time.time() + self._drain_timeout
+        while True:
+            pending_count = sum(drainable.pending_count for drainable in drainables)
+            if not pending_count:
+                return True
+            remaining = end_time - time.time()
+            if remaining <= 0:
+                logger.warning("Drain timeout exceeded, %d message(s) not processed",
+                               pending_count)
+                return False
+            logger.info("Draining callbacks: %d message(s) pending, %.1f seconds remaining",
+                        pending_count, remaining)
+            for drainable in drainables:
+                wait_time = min(end_time - time.time(), self.DRAIN_STATUS_INTERVAL)
+                if wait_time > 0 and not drainable.wait_idle(wait_time):
+                    break
+
+    @property
+    def metrics(self):
+        """
+        The registry containing the metrics recorded by the application
+        (:class:`dxlbootstrap.metrics.MetricsRegistry`). This includes, per callback topic, the
+        number of messages received, the number of callback errors, the time messages wait in a
+        callback pool, and the execution time of the callbacks. It also includes the depths of
+        the incoming message and callback pool queues.
+
+        A snapshot of the metrics can be obtained via the ``snapshot`` method of the registry.
+        """
+        return self._metrics
+
+    def _get_incoming_queue_depth(self):
+        """
+        Returns the number of messages queued in the incoming message pool of the DXL client
+
+        The DXL client does not expose the queue of its incoming message pool, so its private
+        attributes are read when available. If they are not (for example, a different version
+        of the DXL client), ``0`` is returned.
+
+        :return: The number of messages queued in the incoming message pool
+        """
+        tasks = getattr(getattr(self._dxl_client, "_thread_pool", None), "_tasks", None)
+        if tasks is None or not hasattr(tasks, "qsize"):
+            return 0
+        return tasks.qsize()
+
+    def _register_callbacks_pool_metrics(self, pool_name, pool):
+        """
+        Registers the metrics associated with the specified callback pool (the queue depth
+        gauge, and the shed messages counters)
+
+        :param pool_name: The name of the callback pool (``None`` for the default pool)
+        :param pool: The callback pool
+        """
+        pool_label = self.DEFAULT_CALLBACKS_POOL_LABEL if pool_name is None else pool_name
+        self._metrics.gauge(self.CALLBACKS_POOL_QUEUE_DEPTH_METRIC, {"pool": pool_label},
+                            func=lambda: pool.queue_depth)
+        for reason in ("droppedOldest", "droppedNewest", "rejected"):
+            self._metrics.counter(self.CALLBACKS_POOL_SHED_METRIC,
+                                  {"pool": pool_label, "reason": reason},
+                                  func=partial(lambda reason: pool.shed_counts[reason], reason))
+
+    def _log_metrics(self):
+        """
+        Logs a snapshot of the metrics recorded by the application
+        """
+        lines = []
+        for name, metrics in sorted(self._metrics.snapshot().items()):
+            for metric in metrics:
+                value = metric["value"]
+                if isinstance(value, dict):
+                    value = "count={0}, sum={1:.6f}".format(value["count"], value["sum"])
+                labels = ", ".join("{0}={1}".format(key, label_value)
+                                   for key, label_value in sorted(metric["labels"].items()))
+                lines.append("  {0}{{{1}}}: {2}".format(name, labels, value))
+        logger.info("Application metrics:\n%s", "\n".join(lines))
+
+    def _start_metrics_log(self):
+        """
+        Starts the thread which periodically logs the metrics (if enabled in the configuration)
+        """
+        if self._metrics_log_interval > 0:
+            stop = self._metrics_log_stop = Event()
+
+            def _run():
+                while not stop.wait(self._metrics_log_interval):
+                    self._log_metrics()
+
+            self._metrics_log_thread = Thread(target=_run, name=self.METRICS_LOG_THREAD_NAME)
+            self._metrics_log_thread.daemon = True
+            self._metrics_log_thread.start()
+
+    def _stop_metrics_log(self):
+        """
+        Stops the thread which periodically logs the metrics
+        """
+        if self._metrics_log_thread is not None:
+            self._metrics_log_stop.set()
+            self._metrics_log_thread.join()
+            self._metrics_log_thread = None
+
+    def _start_metrics_http_server(self):
+        """
+        Starts the HTTP endpoint which serves the metrics in the Prometheus text exposition format
+        (if enabled in the configuration)
+        """
+        if self._metrics_http_port is not None:
+            self._metrics_http_server = MetricsHttpServer(
+                self._metrics, self._metrics_http_port, self._metrics_http_host)
+            self._metrics_http_server.start()
+            logger.info("Serving metrics at http://%s:%d/metrics",
+                        self._metrics_http_host, self._metrics_http_server.port)
+
+    def _stop_metrics_http_server(self):
+        """
+        Stops the HTTP endpoint which serves the metrics
+        """
+        if self._metrics_http_server is not None:
+            self._metrics_http_server.stop()
+            self._metrics_http_server = None
+
     def _get_path(self, in_path):
         """
         Returns an absolute path for a file specified in the configuration file (supports
@@ -296,61 +917,346 @@ class Application(object):
                 in_path = config_rel_path
         return in_path
 
+    def _invoke_service_operation(self, operation, wait, services, description):
+        """
+        Sends the specified service registration operation for each of the specified services
+        (without waiting), then waits for all of the operations to complete against a single
+        deadline (the service registration timeout). The overall time is bounded by the slowest
+        service rather than the sum of the times of the operations.
+
+        :param operation: The operation (``register_service_async`` or
+            ``unregister_service_async`` of the DXL client)
+        :param wait: The name of the method of the service which waits for the operation to
+            complete (``_wait_for_registration`` or ``_wait_for_unregistration``)
+        :param services: The services
+        :param description: The description of the operation (for logging)
+        :return: A list of ``(service, exception)`` tuples, the exception is ``None`` if the
+            operation succeeded for the service
+        """
+        if not services:
+            return []
+        if not self._dxl_client.connected:
+            return [(service, DxlException("Client is not currently connected"))
+                    for service in services]
+
+        start_time = time.time()
+        end_time = start_time + self.DXL_SERVICE_REGISTRATION_TIMEOUT
+        results = []
+        for service in services:
+            try:
+                operation(service)
+                results.append((service, None))
+            except Exception as ex: # pylint: disable=broad-except
+                results.append((service, ex))
+        for index, (service, ex) in enumerate(results):
+            if ex is None:
+                try:
+                    getattr(service, wait)(max(end_time - time.time(), 0))
+                except Exception as wait_ex: # pylint: disable=broad-except
+                    ex = wait_ex
+                    results[index] = (service, ex)
+            if ex is None:
+                logger.info("Service %s completed: %s", description, service.service_type)
+            else:
+                logger.error("Service %s failed after %.3f seconds: %s (%s)", description,
+                             time.time() - start_time, service.service_type, ex)
+        logger.info("Service %s of %d service(s) completed in %.3f seconds", description,
+                    len(services), time.time() - start_time)
+        return results
+
+    def _register_services(self, services):
+        """
+        Registers the specified services with the fabric (concurrently). An exception is raised
+        if the registration of any of the services fails.
+
+        :param services: The services to register with the fabric
+        """
+        errors = []
+        for service, ex in self._invoke_service_operation(
+                self._dxl_client.register_service_async, "_wait_for_registration", services,
+                "registration"):
+            if ex is None:
+                self._services.append(service)
+            else:
+                errors.append(ex)
+        if errors:
+            raise errors[0]
+
     def _unregister_services(self):
         """
-        Unregisters the services associated with the Application from the fabric
+        Unregisters the services associated with the Application from the fabric (concurrently)
         """
-        for service in self._services:
-            self._dxl_client.unregister_service_sync(service, self.DXL_SERVICE_REGISTRATION_TIMEOUT)
+        self._invoke_service_operation(self._dxl_client.unregister_service_async,
+                                       "_wait_for_unregistration", self._services,
+                                       "unregistration")
 
-    def _get_callbacks_pool(self):
+    def _get_callbacks_pool(self, pool_name=None):
         """
         Returns the thread pool used to invoke application-specific message callbacks
 
+        :param pool_name: The name of the callback pool (``None`` for the default pool). Named
+            pools which are not defined in the configuration file are created with the settings
+            of the default pool.
         :return: The thread pool used to invoke application-specific message callbacks
         """
         with self._lock:
-            if self._callbacks_pool is None:
-                self._callbacks_pool = ThreadPool(self._callbacks_queue_size,
-                                                  self._callbacks_thread_count,
-                                                  "CallbacksPool")
-            return self._callbacks_pool
+            if pool_name is None:
+                if self._callbacks_pool is None:
+                    self._callbacks_pool = CallbacksPool(self._callbacks_queue_size,
+                                                         self._callbacks_thread_count,
+                                                         self.CALLBACKS_POOL_THREAD_PREFIX,
+                                                         self._callbacks_overflow_policy)
+                    self._register_callbacks_pool_metrics(None, self._callbacks_pool)
+                return self._callbacks_pool
+
+            pool = self._named_callbacks_pools.get(pool_name)
+            if pool is None:
+                if pool_name not in self._named_callbacks_pool_settings:
+                    logger.info(
+                        "Callback pool '%s' not found in configuration, using default settings",
+                        pool_name)
+                queue_size, thread_count, overflow_policy = \
+                    self._named_callbacks_pool_settings.get(
+                        pool_name, (self._callbacks_queue_size, self._callbacks_thread_count,
+                                    self._callbacks_overflow_policy))
+                pool = CallbacksPool(queue_size, thread_count,
+                                     self.CALLBACKS_POOL_THREAD_PREFIX + "-" + pool_name,
+                                     overflow_policy)
+                self._named_callbacks_pools[pool_name] = pool
+                self._register_callbacks_pool_metrics(pool_name, pool)
+            return pool
+
+    def _get_coroutine_loop(self):
+        """
+        Returns the loop used to invoke application-specific coroutine message callbacks
+
+        :return: The loop used to invoke application-specific coroutine message callbacks
+        """
+        with self._lock:
+            if self._coroutine_loop is None:
+                logger.info("Coroutine loop configuration: concurrency=%d",
+                            self._coroutine_concurrency)
+                self._coroutine_loop = CoroutineLoop(self._coroutine_concurrency,
+                                                     self.COROUTINE_LOOP_THREAD_NAME)
+            return self._coroutine_loop
+
+    def _get_process_pool(self):
+        """
+        Returns the process pool used to invoke application-specific message handler functions
+
+        :return: The process pool used to invoke application-specific message handler functions
+        """
+        with self._lock:
+            if self._process_pool is None:
+                logger.info("Process pool configuration: queueSize=%d, processCount=%s",
+                            self._process_pool_queue_size,
+                            self._process_pool_process_count or "<processor count>")
+                self._process_pool = ProcessCallbacksPool(self._process_pool_queue_size,
+                                                          self._process_pool_process_count)
+            return self._process_pool
+
+    def _get_callbacks_pool_name(self, topic, service=None):
+        """
+        Returns the name of the callback pool that is assigned to the specified topic (or service)
+        in the configuration file. Topic assignments take precedence over service assignments.
+
+        :param topic: The topic
+        :param service: The service (optional)
+        :return: The name of the assigned callback pool (``None`` for the default pool)
+        """
+        pool_name = self._callbacks_pool_name_by_topic.get(topic)
+        if pool_name is None and service is not None:
+            pool_name = self._callbacks_pool_name_by_service_type.get(service.service_type)
+        return pool_name
 
-    def add_event_callback(self, topic, callback, separate_thread):
+    def get_callbacks_pool_shed_counts(self):
+        """
+        Returns the number of messages shed by the callback pools (due to their overflow policies)
+
+        :return: A dictionary containing the shed counts (``droppedOldest``, ``droppedNewest``, and
+            ``rejected``) by pool name (``None`` for the default pool)
+        """
+        with self._lock:
+            pools = dict(self._named_callbacks_pools)
+            if self._callbacks_pool is not None:
+                pools[None] = self._callbacks_pool
+        return dict((pool_name, pool.shed_counts) for pool_name, pool in pools.items())
+
+    def add_event_callback(self, topic, callback, separate_thread, pool_name=None,
+                           separate_process=False):
         """
         Adds a DXL event message callback to the application.
 
+        If the ``on_event`` method of the callback is a coroutine function (``async def``), it is
+        invoked on the event loop thread owned by the application (``separate_thread`` and
+        ``pool_name`` are ignored).
+
+        If the callback is a :class:`dxlbootstrap.callbacks.BatchEventCallback`, events are
+        accumulated per topic and delivered in batches to its ``on_events`` method.
+
+        The callback registered with the DXL client wraps the specified callback. It must be
+        removed via :func:`remove_event_callback`.
+
         :param topic: The topic to associate with the callback
         :param callback: The event callback
         :param separate_thread: Whether to invoke the callback on a thread other than the incoming message
             thread (this is necessary if synchronous requests are made via DXL in this callback).
+        :param pool_name: The name of the callback pool to invoke the callback on (only applicable if
+            ``separate_thread`` is ``True``). If not specified, the pool assigned to the topic in the
+            configuration file is used, otherwise the default pool.
+        :param separate_process: Whether to invoke the callback in a worker process of the process
+            pool owned by the application (for CPU-bound callbacks). If ``True``, ``callback`` must be
+            a picklable function (defined at the top level of a module) which is invoked with the
+            event payload, ``callback(payload)``.
+        """
+        metrics = CallbackMetrics(self._metrics, topic)
+        if separate_process:
+            wrapper = ProcessEventCallback(self._get_process_pool(), callback, metrics)
+        elif isinstance(callback, BatchEventCallback):
+            callbacks_pool = None
+            if separate_thread:
+                if pool_name is None:
+                    pool_name = self._get_callbacks_pool_name(topic)
+                callbacks_pool = self._get_callbacks_pool(pool_name)
+            wrapper = BatchingEventCallback(
+                callbacks_pool, callback,
+                self.BATCH_EVENT_CALLBACK_THREAD_PREFIX + "-" + topic, metrics)
+            with self._lock:
+                self._batching_callbacks.append(wrapper)
+        elif iscoroutinefunction(callback.on_event):
+            wrapper = CoroutineEventCallback(self._get_coroutine_loop(), callback, metrics)
+        elif separate_thread:
+            if pool_name is None:
+                pool_name = self._get_callbacks_pool_name(topic)
+            wrapper = ThreadedEventCallback(self._get_callbacks_pool(pool_name), callback,
+                                             metrics)
+        else:
+            wrapper = InstrumentedEventCallback(callback, metrics)
+        with self._lock:
+            self._callback_wrappers[(topic, callback)] = wrapper
+        self._dxl_client.add_event_callback(topic, wrapper)
+
+    def remove_event_callback(self, topic, callback):
         """
-        if separate_thread:
-            callback = _ThreadedEventCallback(self._get_callbacks_pool(), callback)
-        self._dxl_client.add_event_callback(topic, callback)
+        Removes a DXL event message callback previously added to the application (see
+        :func:`add_event_callback`)
 
-    def add_request_callback(self, service, topic, callback, separate_thread):
+        :param topic: The topic the callback is associated with
+        :param callback: The event callback
+        """
+        with self._lock:
+            wrapper = self._callback_wrappers.pop((topic, callback), callback)
+            if wrapper in self._batching_callbacks:
+                self._batching_callbacks.remove(wrapper)
+        self._dxl_client.remove_event_callback(topic, wrapper)
+        if isinstance(wrapper, BatchingEventCallback):
+            # Delivers the pending batches
+            wrapper.close()
+
+    def add_request_callback(self, service, topic, callback, separate_thread, pool_name=None, # pylint: disable=too-many-arguments
+                             separate_process=False, schema=None):
         """
         Adds a DXL request message callback to the application.
 
+        If the ``on_request`` method of the callback is a coroutine function (``async def``), it is
+        invoked on the event loop thread owned by the application (``separate_thread`` and
+        ``pool_name`` are ignored).
+
+        The callback registered with the DXL client wraps the specified callback. It must be
+        removed via :func:`remove_request_callback`.
+
         :param service: The service to associate the request callback with
         :param topic: The topic to associate with the callback
         :param callback: The request callback
         :param separate_thread: Whether to invoke the callback on a thread other than the incoming message
             thread (this is necessary if synchronous requests are made via DXL in this callback).
+        :param pool_name: The name of the callback pool to invoke the callback on (only applicable if
+            ``separate_thread`` is ``True``). If not specified, the pool assigned to the topic (or the
+            service type) in the configuration file is used, otherwise the default pool.
+        :param separate_process: Whether to invoke the callback in a worker process of the process
+            pool owned by the application (for CPU-bound callbacks). If ``True``, ``callback`` must be
+            a picklable function (defined at the top level of a module) which is invoked with the
+            request payload, ``callback(payload)``, and returns the response payload (any value
+            supported by :func:`dxlbootstrap.util.MessageUtils.encode`). If the function raises an
+            exception, an error response is sent.
+        :param schema: The schema the request payloads must conform to (optional). Either a
+            :class:`dxlbootstrap.schema.PayloadSchema` or its declaration (for example,
+            ``"host:str, port:int?"``). Requests are validated prior to being dispatched to
+            the callback (on the callback pool thread if ``separate_thread`` is ``True``): an
+            error response is sent for invalid requests, and the decoded payload of valid
+            requests is available to the callback via the ``validated_payload`` attribute of
+            the request.
+        """
+        metrics = CallbackMetrics(self._metrics, topic)
+        if schema is not None and not isinstance(schema, PayloadSchema):
+            schema = PayloadSchema(schema)
+        if separate_process:
+            wrapper = ProcessRequestCallback(self._get_process_pool(), callback,
+                                              self._dxl_client, metrics)
+        elif iscoroutinefunction(callback.on_request):
+            wrapper = CoroutineRequestCallback(self._get_coroutine_loop(), callback,
+                                                self._dxl_client, metrics)
+        else:
+            wrapper = callback
+            if schema is not None:
+                # Validated on the thread which invokes the callback (rather than on the
+                # incoming message thread if the callback is invoked via a callback pool)
+                wrapper = self._create_validating_request_callback(topic, wrapper, schema)
+                schema = None
+            if separate_thread:
+                if pool_name is None:
+                    pool_name = self._get_callbacks_pool_name(topic, service)
+                wrapper = ThreadedRequestCallback(self._get_callbacks_pool(pool_name),
+                                                   wrapper, self._dxl_client, metrics)
+            else:
+                wrapper = InstrumentedRequestCallback(wrapper, metrics)
+        if schema is not None:
+            wrapper = self._create_validating_request_callback(topic, wrapper, schema)
+        with self._lock:
+            self._callback_wrappers[(topic, callback)] = wrapper
+        service.add_topic(topic, wrapper)
+
+    def remove_request_callback(self, topic, callback):
+        """
+        Removes a DXL request message callback previously added to the application (see
+        :func:`add_request_callback`)
+
+        :param topic: The topic the callback is associated with
+        :param callback: The request callback
+        """
+        with self._lock:
+            wrapper = self._callback_wrappers.pop((topic, callback), callback)
+        self._dxl_client.remove_request_callback(topic, wrapper)
+
+    def _create_validating_request_callback(self, topic, callback, schema):
+        """
+        Returns a callback wrapper that validates the payload of requests against the
+        specified schema prior to invoking the specified request callback
+
+        :param topic: The topic associated with the callback
+        :param callback: The request callback
+        :param schema: The payload schema (:class:`dxlbootstrap.schema.PayloadSchema`)
+        :return: The callback wrapper
         """
-        if separate_thread:
-            callback = _ThreadedRequestCallback(self._get_callbacks_pool(), callback)
-        service.add_topic(topic, callback)
+        return ValidatingRequestCallback(
+            callback, schema, self._dxl_client,
+            self._metrics.counter(self.INVALID_REQUESTS_METRIC, {"topic": topic}))
 
     def register_service(self, service):
         """
         Registers the specified service with the fabric
 
+        Services registered from :func:`on_register_services` are registered concurrently once
+        that method returns (startup time is bounded by the slowest service rather than the sum
+        of the registration times). Otherwise, this method waits for the registration to complete.
+
         :param service: The service to register with the fabric
         """
-        self._dxl_client.register_service_sync(service, self.DXL_SERVICE_REGISTRATION_TIMEOUT)
-        self._services.append(service)
+        with self._lock:
+            if self._deferred_services is not None:
+                self._deferred_services.append(service)
+                return
+        self._register_services([service])
 
     def on_run(self):
         """
@@ -366,6 +1272,15 @@ class Application(object):
         """
         pass
 
+    def on_reload_configuration(self, config):
+        """
+        Invoked after the application-specific configuration has been reloaded while the
+        application is running (see :func:`reload_configuration`)
+
+        :param config: The application-specific configuration
+        """
+        pass
+
     def on_dxl_connect(self):
         """
         Invoked after the client associated with the application has connected
@@ -0,0 +1,61 @@
+from __future__ import absolute_import
+import logging
+
+# Configure local logger
+logger = logging.getLogger(__name__)
+
+
+class BatchEventCallback(object):
+    """
+    Base class for event callbacks which receive DXL event messages in batches.
+
+    When registered via :func:`dxlbootstrap.app.Application.add_event_callback`, the events
+    received are accumulated per topic and :func:`on_events` is invoked once the batch contains
+    ``max_batch_size`` events or ``max_batch_delay`` seconds have elapsed since the first event
+    of the batch was received (whichever occurs first).
+    """
+
+    # The default maximum number of events in a batch
+    DEFAULT_MAX_BATCH_SIZE = 100
+    # The default maximum amount of time (in seconds) an event waits in a batch
+    DEFAULT_MAX_BATCH_DELAY = 0.1
+
+    def __init__(self, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 max_batch_delay=DEFAULT_MAX_BATCH_DELAY):
+        """
+        Constructor parameters:
+
+        :param max_batch_size: The maximum number of events in a batch
+        :param max_batch_delay: The maximum amount of time (in seconds) an event waits in a batch
+            before the batch is delivered
+        """
+        if max_batch_size < 1:
+            raise Exception("Maximum batch size must be greater than or equal to 1")
+        if max_batch_delay <= 0:
+            raise Exception("Maximum batch delay must be greater than 0")
+        self._max_batch_size = max_batch_size
+        self._max_batch_delay = max_batch_delay
+
+    @property
+    def max_batch_size(self):
+        """
+        The maximum number of events in a batch
+        """
+        return self._max_batch_size
+
+    @property
+    def max_batch_delay(self):
+        """
+        The maximum amount of time (in seconds) an event waits in a batch before the batch
+        is delivered
+        """
+        return self._max_batch_delay
+
+    def on_events(self, events):
+        """
+        Invoked when a batch of DXL event messages is available. All of the events in the batch
+        were received on the same topic.
+
+        :param events: The list of DXL event messages (in the order they were received)
+        """
+        pass
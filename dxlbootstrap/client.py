@@ -1,12 +1,221 @@
 from __future__ import absolute_import
+from concurrent.futures import FIRST_COMPLETED, Future, TimeoutError as FutureTimeoutError, \
+    wait
+from functools import partial
+from threading import BoundedSemaphore, Lock
 import logging
+import threading
+import random
+import time
 
-from dxlclient.message import Message
+from dxlclient.callbacks import ResponseCallback
+from dxlclient.exceptions import DxlException, WaitTimeoutException
+from dxlclient.message import Message, Request
+from ._circuit_breaker import CircuitBreaker
+from ._compat import asyncio
+# pylint: disable=unused-import
+from ._exceptions import CircuitOpenError, RequestError, RequestTimeoutError, ServiceError, \
+    ServiceNotFoundError
+from ._latency import LatencyTracker
+from ._response_cache import ResponseCache
+from ._scheduler import schedule
+from ._single_flight import SingleFlight
+from .util import MessageUtils
 
 # Configure local logger
 logger = logging.getLogger(__name__)
 
 
+class _FutureResponseCallback(ResponseCallback):
+    """
+    Response callback which completes a future with the response to an asynchronous request
+    (or with an exception if an error response is received or the response timeout is exceeded)
+    """
+    def __init__(self, client, request, future):
+        """
+        Constructs the response callback
+
+        :param client: The client wrapper which sent the request
+        :param request: The request
+        :param future: The future to complete
+        """
+        super(_FutureResponseCallback, self).__init__()
+        self._client = client
+        self._request = request
+        self._future = future
+        self._lock = Lock()
+        self._done = False
+        self._timeout_call = None
+
+    def start_timeout(self, timeout):
+        """
+        Starts the response timeout
+
+        :param timeout: The maximum amount of time (in seconds) to wait for the response
+        """
+        self._timeout_call = schedule(timeout, self._on_timeout)
+
+    def _complete(self):
+        """
+        Marks the callback as complete
+
+        :return: Whether the callback was not already complete
+        """
+        with self._lock:
+            if self._done:
+                return False
+            self._done = True
+        if self._timeout_call is not None:
+            self._timeout_call.cancel()
+        return True
+
+    def on_response(self, response):
+        """
+        Invoked when the response to the request is received
+
+        :param response: The response
+        """
+        if self._complete():
+            error = self._client._get_response_error(response) # pylint: disable=protected-access
+            if error is None:
+                self._future.set_result(response)
+            else:
+                self._future.set_exception(error)
+
+    def on_error(self, error):
+        """
+        Invoked when the request fails without a response (for example, if it could not be sent)
+
+        :param error: The exception
+        """
+        if self._complete():
+            self._future.set_exception(error)
+
+    def cancel(self):
+        """
+        Stops waiting for the response (the future is completed with a :class:`RequestError`)
+        """
+        if self._complete():
+            self._client._unregister_async_request(self._request) # pylint: disable=protected-access
+            self._future.set_exception(RequestError(
+                "Request cancelled: " + self._request.message_id))
+
+    def _on_timeout(self):
+        """
+        Invoked when the response timeout is exceeded
+        """
+        if self._complete():
+            self._client._unregister_async_request(self._request) # pylint: disable=protected-access
+            self._future.set_exception(RequestTimeoutError(
+                "Timeout waiting for response to message: " + self._request.message_id))
+
+
+class _PipelineResponseCallback(ResponseCallback):
+    """
+    Response callback shared by the requests sent in pipelined mode (see
+    :attr:`Client.pipeline_requests`). It receives every response received by the DXL client,
+    and completes the future of the corresponding request via a map of the identifiers of the
+    requests awaiting a response (correlation identifiers) to their futures.
+    """
+    def __init__(self, client):
+        """
+        Constructs the response callback
+
+        :param client: The client wrapper which sends the requests
+        """
+        super(_PipelineResponseCallback, self).__init__()
+        self._client = client
+        self._lock = Lock()
+        # Request message identifier to (future, timeout call)
+        self._pending = {}
+
+    def send(self, request, future, timeout):
+        """
+        Sends the specified request
+
+        :param request: The request to send
+        :param future: The future to complete with the response
+        :param timeout: The maximum amount of time (in seconds) to wait for the response
+        """
+        message_id = request.message_id
+        with self._lock:
+            self._pending[message_id] = (
+                future, schedule(timeout, self._on_timeout, request))
+        try:
+            self._client._dxl_client.async_request(request) # pylint: disable=protected-access
+        except Exception as ex: # pylint: disable=broad-except
+            if self._pop(message_id) is not None:
+                future.set_exception(ex)
+
+    def _pop(self, message_id):
+        """
+        Removes the request with the specified message identifier from the requests awaiting
+        a response
+
+        :param message_id: The request message identifier
+        :return: The future of the request (``None`` if the request is not awaiting a
+            response)
+        """
+        with self._lock:
+            entry = self._pending.pop(message_id, None)
+        if entry is None:
+            return None
+        entry[1].cancel()
+        return entry[0]
+
+    def on_response(self, response):
+        """
+        Invoked when a response is received
+
+        :param response: The response
+        """
+        future = self._pop(response.request_message_id)
+        if future is not None:
+            error = self._client._get_response_error(response) # pylint: disable=protected-access
+            if error is None:
+                future.set_result(response)
+            else:
+                future.set_exception(error)
+
+    def _on_timeout(self, request):
+        """
+        Invoked when the response timeout of the specified request is exceeded
+
+        :param request: The request
+        """
+        future = self._pop(request.message_id)
+        if future is not None:
+            self._client._unregister_async_request(request) # pylint: disable=protected-access
+            future.set_exception(RequestTimeoutError(
+                "Timeout waiting for response to message: " + request.message_id))
+
+    def cancel(self, request):
+        """
+        Stops waiting for the response to the specified request (its future is completed
+        with a :class:`RequestError`)
+
+        :param request: The request
+        """
+        future = self._pop(request.message_id)
+        if future is not None:
+            self._client._unregister_async_request(request) # pylint: disable=protected-access
+            future.set_exception(RequestError("Request cancelled: " + request.message_id))
+
+    def fail_pending(self, error):
+        """
+        Completes the futures of all of the requests awaiting a response with the specified
+        exception
+
+        :param error: The exception
+        """
+        with self._lock:
+            message_ids = list(self._pending)
+        for message_id in message_ids:
+            future = self._pop(message_id)
+            if future is not None:
+                future.set_exception(error)
+
+
 class Client(object):
     """
     Base class used for DXL client wrappers.
@@ -16,6 +225,41 @@ class Client(object):
     _DEFAULT_RESPONSE_TIMEOUT = 30
     # The minimum amount of time (in seconds) to wait for a response from a DXL service
     _MIN_RESPONSE_TIMEOUT = 30
+    # The default maximum number of batch requests awaiting a response at the same time
+    _DEFAULT_BATCH_MAX_IN_FLIGHT = 100
+    # The default maximum number of cached responses per topic
+    _DEFAULT_RESPONSE_CACHE_MAX_ENTRIES = 1000
+    # The default maximum total size (in bytes) of the cached response payloads per topic
+    _DEFAULT_RESPONSE_CACHE_MAX_BYTES = 16 * 1024 * 1024
+    # The percentile of the response latencies of a topic after which a hedged request is sent
+    _HEDGE_LATENCY_PERCENTILE = 95
+    # The number of most recent response latencies tracked per topic
+    _LATENCY_WINDOW_SIZE = 100
+    # The minimum number of response latencies tracked for a topic before requests are hedged
+    _MIN_HEDGE_LATENCY_SAMPLES = 20
+    # The default rate of failed requests (between 0 and 1) at which a circuit breaker opens
+    _DEFAULT_CIRCUIT_BREAKER_ERROR_RATE_THRESHOLD = 0.5
+    # The default number of consecutive timeouts at which a circuit breaker opens
+    _DEFAULT_CIRCUIT_BREAKER_TIMEOUT_THRESHOLD = 3
+    # The default minimum number of requests before the error rate threshold of a circuit
+    # breaker applies
+    _DEFAULT_CIRCUIT_BREAKER_MIN_REQUESTS = 10
+    # The default number of most recent requests the error rate of a circuit breaker is
+    # computed over
+    _DEFAULT_CIRCUIT_BREAKER_WINDOW_SIZE = 50
+    # The default amount of time (in seconds) a circuit breaker remains open
+    _DEFAULT_CIRCUIT_BREAKER_COOL_DOWN = 30
+    # The error codes of transient error responses (the service is overloaded or shutting
+    # down, see :attr:`dxlbootstrap.app.Application.OVERLOADED_ERROR_CODE` and
+    # :attr:`dxlbootstrap.app.Application.UNAVAILABLE_ERROR_CODE`)
+    _TRANSIENT_ERROR_CODES = (0x80000002, 0x80000003)
+    # The default maximum number of attempts to perform a request (see
+    # :func:`_dxl_sync_request_with_retry`)
+    _DEFAULT_RETRY_MAX_ATTEMPTS = 3
+    # The default delay (in seconds) before the first retry of a request
+    _DEFAULT_RETRY_BASE_DELAY = 0.1
+    # The default maximum delay (in seconds) between retries of a request
+    _DEFAULT_RETRY_MAX_DELAY = 5
 
     def __init__(self, dxl_client):
         """
@@ -25,6 +269,19 @@ class Client(object):
         """
         self._dxl_client = dxl_client
         self._response_timeout = self._DEFAULT_RESPONSE_TIMEOUT
+        self._accept_compression = False
+        # Topic to response cache
+        self._response_caches = {}
+        self._coalesce_requests = False
+        self._single_flight = SingleFlight()
+        self._hedge_requests = False
+        self._latency_lock = Lock()
+        # Topic to latency tracker
+        self._latency_trackers = {}
+        # Topic to circuit breaker
+        self._circuit_breakers = {}
+        # The shared response callback (if pipelined mode is enabled)
+        self._pipeline_callback = None
 
     @property
     def response_timeout(self):
@@ -39,17 +296,560 @@ class Client(object):
             raise Exception("Response timeout must be greater than or equal to " + str(self._MIN_RESPONSE_TIMEOUT))
         self._response_timeout = response_timeout
 
-    def _dxl_sync_request(self, request):
+    @property
+    def accept_compression(self):
+        """
+        Whether requests indicate that compressed response payloads are accepted (see
+        :func:`dxlbootstrap.util.MessageUtils.set_accept_encoding`). Compressed response
+        payloads are decompressed automatically by
+        :func:`dxlbootstrap.util.MessageUtils.decode_payload` and
+        :func:`dxlbootstrap.util.MessageUtils.json_payload_to_dict`.
+        """
+        return self._accept_compression
+
+    @accept_compression.setter
+    def accept_compression(self, accept_compression):
+        self._accept_compression = accept_compression
+
+    @property
+    def coalesce_requests(self):
+        """
+        Whether identical concurrent synchronous requests (see :func:`_dxl_sync_request`) are
+        coalesced. Requests are identical if they have the same topic and payload. While a
+        request is awaiting a response, identical requests are not sent, but wait for (and
+        return) the same response. This should only be enabled for clients whose requests
+        are idempotent.
+        """
+        return self._coalesce_requests
+
+    @coalesce_requests.setter
+    def coalesce_requests(self, coalesce_requests):
+        self._coalesce_requests = coalesce_requests
+
+    @property
+    def pipeline_requests(self):
+        """
+        Whether requests are pipelined. In pipelined mode, synchronous requests (see
+        :func:`_dxl_sync_request`) are sent asynchronously, and all responses are received
+        through a single response callback shared by the requests, which completes the request
+        awaiting each response via a map of the identifiers of the requests awaiting a response.
+        This allows a client wrapper to sustain high request rates with few threads (for
+        example, using :func:`_dxl_async_request` or :func:`_dxl_batch_request`).
+
+        When pipelined mode is disabled, the requests awaiting a response fail with a
+        :class:`RequestError`.
+        """
+        return self._pipeline_callback is not None
+
+    @pipeline_requests.setter
+    def pipeline_requests(self, pipeline_requests):
+        if pipeline_requests == self.pipeline_requests:
+            return
+        if pipeline_requests:
+            self._pipeline_callback = _PipelineResponseCallback(self)
+            self._dxl_client.add_response_callback(None, self._pipeline_callback)
+        else:
+            callback = self._pipeline_callback
+            self._pipeline_callback = None
+            self._dxl_client.remove_response_callback(None, callback)
+            callback.fail_pending(RequestError("Pipelined mode was disabled"))
+
+    @property
+    def hedge_requests(self):
+        """
+        Whether synchronous requests (see :func:`_dxl_sync_request`) are hedged. The response
+        latencies of each topic are tracked, and if no response is received within the 95th
+        percentile of the latencies of the topic, a duplicate (hedged) request is sent. The
+        first response received (to either request) is returned. Requests are only hedged once
+        sufficient latencies have been tracked for the topic.
+
+        Hedging reduces the tail latency when one of several instances of a service is slow.
+        It should only be enabled for clients whose requests are idempotent.
+        """
+        return self._hedge_requests
+
+    @hedge_requests.setter
+    def hedge_requests(self, hedge_requests):
+        self._hedge_requests = hedge_requests
+
+    def get_latency_percentile(self, topic, percentile):
+        """
+        Returns the specified percentile of the response latencies tracked for the specified
+        topic (latencies are tracked while :attr:`hedge_requests` is enabled)
+
+        :param topic: The topic
+        :param percentile: The percentile (between 0 and 100)
+        :return: The latency (in seconds), ``None`` if no latencies have been tracked
+        """
+        tracker = self._latency_trackers.get(topic)
+        return None if tracker is None else tracker.percentile(percentile)
+
+    def enable_response_cache(self, topic, ttl,
+                              max_entries=_DEFAULT_RESPONSE_CACHE_MAX_ENTRIES,
+                              max_bytes=_DEFAULT_RESPONSE_CACHE_MAX_BYTES):
+        """
+        Enables caching of the responses to the synchronous requests (see
+        :func:`_dxl_sync_request`) sent to the specified topic. Responses are cached by request
+        payload, and only successful responses are cached. The cache should only be enabled for
+        topics whose requests are idempotent.
+
+        The least recently used responses are evicted when the maximum number of entries or the
+        maximum total payload size is exceeded. Enabling the cache for a topic which already has
+        a cache replaces the existing cache.
+
+        :param topic: The topic
+        :param ttl: The amount of time (in seconds) for which a response is cached
+        :param max_entries: The maximum number of cached responses
+        :param max_bytes: The maximum total size (in bytes) of the cached response payloads
+        """
+        self._response_caches[topic] = ResponseCache(ttl, max_entries, max_bytes)
+
+    def disable_response_cache(self, topic):
+        """
+        Disables caching of the responses to the requests sent to the specified topic (see
+        :func:`enable_response_cache`)
+
+        :param topic: The topic
+        """
+        self._response_caches.pop(topic, None)
+
+    def clear_response_cache(self, topic=None):
+        """
+        Removes the cached responses (see :func:`enable_response_cache`)
+
+        :param topic: The topic whose cached responses are removed (defaults to all topics)
+        """
+        topics = list(self._response_caches) if topic is None else [topic]
+        for cache_topic in topics:
+            cache = self._response_caches.get(cache_topic)
+            if cache is not None:
+                cache.clear()
+
+    def get_response_cache_stats(self, topic):
+        """
+        Returns the statistics of the response cache for the specified topic (see
+        :func:`enable_response_cache`)
+
+        :param topic: The topic
+        :return: A dictionary containing the number of ``hits``, ``misses``, ``evictions``
+            (due to the size limits), and ``expirations``, and the current number of
+            ``entries`` and total payload ``bytes`` (``None`` if the cache is not enabled for
+            the topic)
+        """
+        cache = self._response_caches.get(topic)
+        return None if cache is None else cache.get_stats()
+
+    def enable_circuit_breaker( # pylint: disable=too-many-arguments
+            self, topic,
+            error_rate_threshold=_DEFAULT_CIRCUIT_BREAKER_ERROR_RATE_THRESHOLD,
+            timeout_threshold=_DEFAULT_CIRCUIT_BREAKER_TIMEOUT_THRESHOLD,
+            min_requests=_DEFAULT_CIRCUIT_BREAKER_MIN_REQUESTS,
+            window_size=_DEFAULT_CIRCUIT_BREAKER_WINDOW_SIZE,
+            cool_down=_DEFAULT_CIRCUIT_BREAKER_COOL_DOWN):
+        """
+        Enables a circuit breaker for the synchronous requests (see :func:`_dxl_sync_request`)
+        sent to the specified topic. Requests which receive an error response or time out are
+        failures.
+
+        The circuit opens when the rate of failures among the most recent requests reaches the
+        error rate threshold, or when the number of consecutive timeouts reaches the timeout
+        threshold. While the circuit is open, requests fail immediately with a
+        :class:`CircuitOpenError`. Once the cool-down period has elapsed, a single trial request
+        is sent, which closes the circuit if it succeeds, or re-opens it if it fails.
+
+        :param topic: The topic
+        :param error_rate_threshold: The rate of failed requests (between 0 and 1) at which
+            the circuit opens
+        :param timeout_threshold: The number of consecutive timeouts at which the circuit
+            opens
+        :param min_requests: The minimum number of requests before the error rate threshold
+            applies
+        :param window_size: The number of most recent requests the error rate is computed over
+        :param cool_down: The amount of time (in seconds) the circuit remains open before a
+            trial request is sent
+        """
+        self._circuit_breakers[topic] = CircuitBreaker(
+            topic, error_rate_threshold, timeout_threshold, min_requests, window_size,
+            cool_down)
+
+    def disable_circuit_breaker(self, topic):
+        """
+        Disables the circuit breaker for the specified topic (see
+        :func:`enable_circuit_breaker`)
+
+        :param topic: The topic
+        """
+        self._circuit_breakers.pop(topic, None)
+
+    def get_circuit_breaker_state(self, topic):
+        """
+        Returns the state of the circuit breaker for the specified topic (see
+        :func:`enable_circuit_breaker`)
+
+        :param topic: The topic
+        :return: The state (``closed``, ``open``, or ``half-open``), ``None`` if the circuit
+            breaker is not enabled for the topic
+        """
+        breaker = self._circuit_breakers.get(topic)
+        return None if breaker is None else breaker.state
+
+    def _prepare_request(self, request):
+        """
+        Prepares the specified request prior to it being sent
+
+        :param request: The request to send
+        """
+        if self._accept_compression:
+            MessageUtils.set_accept_encoding(request)
+
+    @staticmethod
+    def _get_response_error(res):
+        """
+        Returns the exception corresponding to the specified response
+
+        :param res: The DXL response
+        :return: The exception (:class:`ServiceError`) if the response is an error response,
+            otherwise ``None``
+        """
+        if res.message_type != Message.MESSAGE_TYPE_ERROR:
+            return None
+        if res.error_code == ServiceNotFoundError.ERROR_CODE:
+            return ServiceNotFoundError(res.error_code, res.error_message)
+        return ServiceError(res.error_code, res.error_message)
+
+    @classmethod
+    def _is_transient_error(cls, error):
+        """
+        Returns whether the specified request error is transient (a retry may succeed)
+
+        :param error: The exception
+        :return: Whether the error is transient
+        """
+        return isinstance(error, RequestTimeoutError) or \
+            (isinstance(error, ServiceError) and
+             error.error_code in cls._TRANSIENT_ERROR_CODES)
+
+    def _dxl_sync_request(self, request, timeout=None):
         """
-        Performs a synchronous DXL request. Raises an exception if an error occurs.
+        Performs a synchronous DXL request. Raises an exception if an error occurs: a
+        :class:`RequestTimeoutError` if the response timeout is exceeded, or a
+        :class:`ServiceError` if an error response is received.
+
+        If the response cache is enabled for the topic of the request (see
+        :func:`enable_response_cache`), a cached response may be returned.
+
+        If :attr:`coalesce_requests` is enabled, the response to an identical request which is
+        already awaiting a response may be returned.
+
+        If the circuit breaker is enabled for the topic of the request (see
+        :func:`enable_circuit_breaker`) and is open, a :class:`CircuitOpenError` is raised.
 
         :param request: The request to send
+        :param timeout: The maximum amount of time (in seconds) to wait for the response
+            (defaults to :attr:`response_timeout`). Unlike :attr:`response_timeout`, this
+            deadline may be less than the minimum response timeout.
         :return: The DXL response
         """
-        # Send the request and wait for a response (synchronous)
-        res = self._dxl_client.sync_request(request, timeout=self._response_timeout)
+        cache = self._response_caches.get(request.destination_topic)
+        payload_hash = None
+        if cache is not None:
+            payload_hash = ResponseCache.get_key(request)
+            res = cache.get(payload_hash)
+            if res is not None:
+                return res
+
+        if self._coalesce_requests:
+            if payload_hash is None:
+                payload_hash = ResponseCache.get_key(request)
+            # The response to an identical request is awaited for (at most) the timeout of
+            # this request
+            try:
+                res = self._single_flight.call(
+                    (request.destination_topic, payload_hash), self._send_guarded_sync_request,
+                    (request, timeout),
+                    self._response_timeout if timeout is None else timeout)
+            except FutureTimeoutError:
+                raise RequestTimeoutError(
+                    "Timeout waiting for response to message: " + request.message_id)
+        else:
+            res = self._send_guarded_sync_request(request, timeout)
 
         # Return a dictionary corresponding to the response payload
-        if res.message_type != Message.MESSAGE_TYPE_ERROR:
+        error = self._get_response_error(res)
+        if error is None:
+            if cache is not None:
+                cache.put(payload_hash, res)
             return res
-        raise Exception("Error: " + res.error_message + " (" + str(res.error_code) + ")")
+        raise error
+
+    def _dxl_sync_request_with_retry(self, request, timeout=None, # pylint: disable=too-many-arguments
+                                     max_attempts=_DEFAULT_RETRY_MAX_ATTEMPTS,
+                                     base_delay=_DEFAULT_RETRY_BASE_DELAY,
+                                     max_delay=_DEFAULT_RETRY_MAX_DELAY, retry_on=None):
+        """
+        Performs a synchronous DXL request (see :func:`_dxl_sync_request`), retrying it if a
+        transient error occurs. The delay before each retry grows exponentially (from the base
+        delay, up to the maximum delay), with full jitter. Each retry sends a copy of the
+        request (with a new message identifier).
+
+        :param request: The request to send
+        :param timeout: The maximum amount of time (in seconds) to wait for the response to
+            each attempt (defaults to :attr:`response_timeout`)
+        :param max_attempts: The maximum number of attempts
+        :param base_delay: The delay (in seconds) before the first retry
+        :param max_delay: The maximum delay (in seconds) between retries
+        :param retry_on: The exception types which are retried (tuple). By default, timeouts
+            (:class:`RequestTimeoutError`) and error responses indicating that the service is
+            overloaded or shutting down are retried.
+        :return: The DXL response
+        """
+        if max_attempts < 1:
+            raise Exception("Maximum attempts must be greater than or equal to 1")
+        attempt = 0
+        while True:
+            try:
+                return self._dxl_sync_request(request, timeout)
+            except RequestError as ex:
+                attempt += 1
+                retry = isinstance(ex, retry_on) if retry_on is not None \
+                    else self._is_transient_error(ex)
+                if not retry or attempt >= max_attempts:
+                    raise
+                delay = random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1)))
+                logger.debug("Retrying request to topic %s in %.3f seconds: %s",
+                             request.destination_topic, delay, ex)
+                time.sleep(delay)
+                request = self._copy_request(request)
+
+    def _send_guarded_sync_request(self, request, timeout=None):
+        """
+        Sends the specified request and waits for the response (synchronous), via the circuit
+        breaker for the topic of the request (if enabled)
+
+        :param request: The request to send
+        :param timeout: The maximum amount of time (in seconds) to wait for the response
+            (defaults to :attr:`response_timeout`)
+        :return: The DXL response (which may be an error response)
+        """
+        breaker = self._circuit_breakers.get(request.destination_topic)
+        if breaker is None:
+            return self._send_sync_request(request, timeout)
+        trial = breaker.before_request()
+        try:
+            try:
+                res = self._send_sync_request(request, timeout)
+            except RequestTimeoutError:
+                breaker.record_failure(timeout=True, trial=trial)
+                raise
+            except Exception: # pylint: disable=broad-except
+                breaker.record_failure(trial=trial)
+                raise
+            if res.message_type == Message.MESSAGE_TYPE_ERROR:
+                breaker.record_failure(trial=trial)
+            else:
+                breaker.record_success(trial=trial)
+            return res
+        finally:
+            # Allows another trial request if the outcome of this one was not recorded (for
+            # example, a KeyboardInterrupt was raised)
+            if trial is not None:
+                breaker.end_trial(trial)
+
+    def _send_sync_request(self, request, timeout=None):
+        """
+        Sends the specified request and waits for the response (synchronous)
+
+        :param request: The request to send
+        :param timeout: The maximum amount of time (in seconds) to wait for the response
+            (defaults to :attr:`response_timeout`)
+        :return: The DXL response (which may be an error response)
+        """
+        if timeout is None:
+            timeout = self._response_timeout
+        if self._pipeline_callback is not None and not self._hedge_requests:
+            self._check_not_incoming_message_thread()
+            # Raises the exception corresponding to an error response (or timeout)
+            return self._dxl_async_request(request, timeout).result()
+        if not self._hedge_requests:
+            self._prepare_request(request)
+            try:
+                return self._dxl_client.sync_request(request, timeout=timeout)
+            except RequestTimeoutError:
+                raise
+            except WaitTimeoutException as ex:
+                raise RequestTimeoutError(str(ex))
+
+        self._check_not_incoming_message_thread()
+        tracker = self._get_latency_tracker(request.destination_topic)
+        start_time = time.time()
+        future, cancel = self._send_async_request(request, timeout)
+        if tracker.count >= self._MIN_HEDGE_LATENCY_SAMPLES:
+            hedge_delay = tracker.percentile(self._HEDGE_LATENCY_PERCENTILE)
+            if hedge_delay < timeout and not wait([future], hedge_delay).done:
+                hedged_future, hedged_cancel = self._send_async_request(
+                    self._copy_request(request), timeout - (time.time() - start_time))
+                done = wait([future, hedged_future], return_when=FIRST_COMPLETED).done
+                # Stop waiting for the response to the losing request
+                if future not in done:
+                    cancel()
+                    future = hedged_future
+                else:
+                    hedged_cancel()
+        # Raises the exception corresponding to an error response (or timeout)
+        res = future.result()
+        tracker.record(time.time() - start_time)
+        return res
+
+    def _check_not_incoming_message_thread(self):
+        """
+        Raises an exception if invoked on a thread of the DXL client's incoming message pool
+        (the same check as the DXL client's ``sync_request``). Waiting for a response on such a
+        thread could prevent the response from being delivered.
+        """
+        # The thread name prefix of the incoming message pool is private to the DXL client,
+        # the check is skipped if it is not available
+        prefix = getattr(self._dxl_client, "_message_pool_prefix", None)
+        if prefix and threading.current_thread().name.startswith(prefix):
+            raise DxlException(
+                "Synchronous requests may not be invoked while handling an incoming message. "
+                "The synchronous request must be made on a different thread.")
+
+    def _get_latency_tracker(self, topic):
+        """
+        Returns the response latency tracker for the specified topic
+
+        :param topic: The topic
+        :return: The latency tracker
+        """
+        tracker = self._latency_trackers.get(topic)
+        if tracker is None:
+            with self._latency_lock:
+                tracker = self._latency_trackers.get(topic)
+                if tracker is None:
+                    tracker = LatencyTracker(self._LATENCY_WINDOW_SIZE)
+                    self._latency_trackers[topic] = tracker
+        return tracker
+
+    @staticmethod
+    def _copy_request(request):
+        """
+        Returns a copy of the specified request (with a new message identifier)
+
+        :param request: The request
+        :return: The copy of the request
+        """
+        copy = Request(request.destination_topic)
+        copy.payload = request.payload
+        copy.other_fields = dict(request.other_fields)
+        copy.service_id = request.service_id
+        copy.broker_ids = request.broker_ids
+        copy.client_ids = request.client_ids
+        copy.destination_tenant_guids = request.destination_tenant_guids
+        return copy
+
+    def _dxl_async_request(self, request, timeout=None):
+        """
+        Performs an asynchronous DXL request. The request is sent immediately, and the returned
+        future is completed when the response is received.
+
+        The future is completed with the DXL response, or with the exception that
+        :func:`_dxl_sync_request` would raise if an error response is received or the response
+        timeout is exceeded. Callbacks added to the future may be invoked on the incoming
+        message thread of the DXL client, and must not block.
+
+        :param request: The request to send
+        :param timeout: The maximum amount of time (in seconds) to wait for the response
+            (defaults to :attr:`response_timeout`)
+        :return: The future (:class:`concurrent.futures.Future`) for the DXL response
+        """
+        return self._send_async_request(request, timeout)[0]
+
+    def _send_async_request(self, request, timeout=None):
+        """
+        Sends the specified request asynchronously (see :func:`_dxl_async_request`)
+
+        :param request: The request to send
+        :param timeout: The maximum amount of time (in seconds) to wait for the response
+            (defaults to :attr:`response_timeout`)
+        :return: A tuple containing the future for the DXL response, and a function which stops
+            waiting for the response (cancelling the response timeout)
+        """
+        self._prepare_request(request)
+        future = Future()
+        future.set_running_or_notify_cancel()
+        if timeout is None:
+            timeout = self._response_timeout
+        pipeline_callback = self._pipeline_callback
+        if pipeline_callback is not None:
+            pipeline_callback.send(request, future, timeout)
+            return future, partial(pipeline_callback.cancel, request)
+        callback = _FutureResponseCallback(self, request, future)
+        callback.start_timeout(timeout)
+        try:
+            self._dxl_client.async_request(request, callback)
+        except Exception as ex: # pylint: disable=broad-except
+            callback.on_error(ex)
+        return future, callback.cancel
+
+    def _dxl_batch_request(self, requests, max_in_flight=_DEFAULT_BATCH_MAX_IN_FLIGHT,
+                           timeout=None):
+        """
+        Performs a batch of DXL requests concurrently (see :func:`_dxl_async_request`), and
+        waits for their responses. At most ``max_in_flight`` requests await a response at the
+        same time (further requests are sent as responses are received).
+
+        :param requests: The requests to send (iterable)
+        :param max_in_flight: The maximum number of requests awaiting a response at the
+            same time
+        :param timeout: The maximum amount of time (in seconds) to wait for the response to
+            each request (defaults to :attr:`response_timeout`)
+        :return: A list containing, for each request (in the order of the requests), a
+            ``(response, exception)`` tuple. The exception (the exception
+            :func:`_dxl_sync_request` would raise for the request) is ``None`` if the request
+            succeeded, and the response is ``None`` if it failed.
+        """
+        if max_in_flight < 1:
+            raise Exception("Maximum requests in flight must be greater than or equal to 1")
+        window = BoundedSemaphore(max_in_flight)
+        futures = []
+        for request in requests:
+            window.acquire()
+            future = self._dxl_async_request(request, timeout)
+            future.add_done_callback(lambda future: window.release())
+            futures.append(future)
+        wait(futures)
+        return [(None, future.exception()) if future.exception() is not None
+                else (future.result(), None) for future in futures]
+
+    def _dxl_async_request_awaitable(self, request, timeout=None):
+        """
+        Performs an asynchronous DXL request, returning an asyncio future (which can be awaited
+        from a coroutine) for the DXL response. See :func:`_dxl_async_request`.
+
+        This method must be invoked from a thread running an asyncio event loop (for example,
+        from a coroutine). Requires Python 3.4 or later.
+
+        :param request: The request to send
+        :param timeout: The maximum amount of time (in seconds) to wait for the response
+            (defaults to :attr:`response_timeout`)
+        :return: The asyncio future (:class:`asyncio.Future`) for the DXL response
+        """
+        if asyncio is None:
+            raise Exception("Awaitable requests require Python 3.4 or later (asyncio)")
+        return asyncio.wrap_future(self._dxl_async_request(request, timeout))
+
+    def _unregister_async_request(self, request):
+        """
+        Stops waiting for the response to the specified asynchronous request (the response
+        timeout has been exceeded)
+
+        :param request: The request
+        """
+        request_manager = getattr(self._dxl_client, "_request_manager", None)
+        if request_manager is not None:
+            try:
+                request_manager.unregister_async_callback(request.message_id)
+                request_manager.remove_current_request(request.message_id)
+            except KeyError:
+                # The response was received concurrently
+                pass
@@ -274,6 +274,56 @@ class TemplateConfig(object):
         return self._config
 
 
+class CompiledTemplate(object):
+    """
+    A static resource parsed into lines of literal text and ``${key}`` placeholder segments,
+    which can be rendered (populated) in a single pass
+    """
+
+    # The pattern for placeholders (the group is the key)
+    _PLACEHOLDER_PATTERN = re.compile(r"\$\{([^}]+)\}")
+
+    def __init__(self, text):
+        """
+        Constructs the compiled template
+
+        :param text: The text of the resource
+        """
+        # For each line, the list of segments (literal text at even indices, placeholder keys
+        # at odd indices)
+        self._lines = [self._PLACEHOLDER_PATTERN.split(line) for line in text.splitlines()]
+
+    def render(self, replace_dict):
+        """
+        Renders the template, replacing each placeholder with the value for its key (callable
+        values are invoked to obtain the value). Placeholders without a value are left as is.
+
+        :param replace_dict: The dictionary for performing replacements
+        :return: The rendered lines
+        """
+        values = {}
+        ret_lines = []
+        for segments in self._lines:
+            if len(segments) == 1:
+                ret_lines.append(segments[0])
+                continue
+            parts = []
+            for index, segment in enumerate(segments):
+                if not index % 2:
+                    parts.append(segment)
+                elif segment in values:
+                    parts.append(values[segment])
+                elif segment in replace_dict:
+                    value = replace_dict[segment]
+                    value = value() if callable(value) else str(value)
+                    values[segment] = value
+                    parts.append(value)
+                else:
+                    parts.append("${" + segment + "}")
+            ret_lines.append("".join(parts))
+        return ret_lines
+
+
 class Template(ABCMeta('ABC', (object,), {'__slots__': ()})): # compatible metaclass with Python 2 *and* 3
     """
     A template type that is used to determine what will be generated (application template vs.
@@ -288,10 +338,13 @@ class Template(ABCMeta('ABC', (object,), {'__slots__': ()})): # compatible metac
         """
         self._package = package
         self._template_config = None
+        # (package, resource path) to compiled template
+        self._compiled_resources = {}
 
     def get_static_resource(self, resource_name, replace_dict=None, package=None):
         """
-        Returns a populated static resource (reads resource, performs replacements, returns)
+        Returns a populated static resource (reads resource, performs replacements, returns).
+        Each resource is read and parsed (see :class:`CompiledTemplate`) once per template.
 
         :param resource_name: The name of the resource
         :param replace_dict: The dictionary for performing replacements
@@ -305,20 +358,14 @@ class Template(ABCMeta('ABC', (object,), {'__slots__': ()})): # compatible metac
             replace_dict = {}
 
         resource_path = '/'.join(("static", resource_name))
-        resource = pkg_resources.resource_string(package, resource_path).decode("utf8")
-
-        ret_lines = []
-        for line in resource.splitlines():
-            for key, value in replace_dict.items():
-                key = r"\$\{" + key + r"\}"
-                if callable(value):
-                    value = value()
-                else:
-                    value = str(value)
-                line = re.sub(key, value, line)
-            ret_lines.append(line)
-
-        return ret_lines
+        cache_key = (package, resource_path)
+        compiled = self._compiled_resources.get(cache_key)
+        if compiled is None:
+            compiled = CompiledTemplate(
+                pkg_resources.resource_string(package, resource_path).decode("utf8"))
+            self._compiled_resources[cache_key] = compiled
+
+        return compiled.render(replace_dict)
 
     @staticmethod
     def create_underline(length, char):
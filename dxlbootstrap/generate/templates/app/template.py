@@ -4,6 +4,7 @@ from dxlbootstrap.generate.core.template \
     import Template, TemplateConfig, TemplateConfigSection, PythonPackageConfigSection
 from dxlbootstrap.generate.core.component \
     import DirTemplateComponent, FileTemplateComponent, CodeTemplateComponent
+from dxlbootstrap.schema import PayloadSchema
 
 
 class AppTemplateConfig(TemplateConfig):
@@ -157,6 +158,16 @@ class AppTemplateConfig(TemplateConfig):
                 """
                 return self._get_boolean_property("separateThread", required=False, default_value=True)
 
+            @property
+            def schema(self):
+                """
+                Returns the schema the request payloads must conform to (see
+                :class:`dxlbootstrap.schema.PayloadSchema`)
+
+                :return: The schema the request payloads must conform to (``None`` if not specified)
+                """
+                return self._get_property("schema", required=False)
+
         return RequestHandlerConfigSection(self)
 
     def get_event_handler_section(self, name):
@@ -587,11 +598,23 @@ class AppTemplate(Template):
                                                        "topic": handler_section.topic})
                     requests_file_comp.add_child(code_comp)
 
-                    code_comp = CodeTemplateComponent("app/code/service_add_topic.code.tmpl",
-                                                      {"topic": handler_section.topic,
-                                                       "className": handler_section.class_name,
-                                                       "separateThread": handler_section.separate_thread,
-                                                       "callbackName": handler_name})
+                    schema = handler_section.schema
+                    if schema:
+                        # Validate the schema prior to generating the application
+                        PayloadSchema(schema)
+                        code_comp = CodeTemplateComponent("app/code/service_add_topic_schema.code.tmpl",
+                                                          {"topic": handler_section.topic,
+                                                           "className": handler_section.class_name,
+                                                           "separateThread": handler_section.separate_thread,
+                                                           "callbackName": handler_name,
+                                                           "schema": schema.replace("\\", "\\\\")
+                                                                           .replace('"', '\\"')})
+                    else:
+                        code_comp = CodeTemplateComponent("app/code/service_add_topic.code.tmpl",
+                                                          {"topic": handler_section.topic,
+                                                           "className": handler_section.class_name,
+                                                           "separateThread": handler_section.separate_thread,
+                                                           "callbackName": handler_name})
                     code_comp.indent_level = 1
                     register_services_def_comp.add_child(code_comp)
 
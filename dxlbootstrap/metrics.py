@@ -0,0 +1,444 @@
+from __future__ import absolute_import
+from bisect import bisect_left
+from threading import Lock, Thread
+import logging
+
+from ._compat import BaseHTTPRequestHandler, HTTPServer, ThreadingMixIn
+
+# Configure local logger
+logger = logging.getLogger(__name__)
+
+
+class Counter(object):
+    """
+    A metric whose value only increases (for example, the number of messages received).
+
+    The value of a counter is either incremented explicitly or sampled from a function (which
+    must return a value that only increases) each time it is read.
+    """
+
+    def __init__(self, func=None):
+        """
+        Constructs the counter
+
+        :param func: A function which returns the current value of the counter (optional)
+        """
+        self._lock = Lock()
+        self._func = func
+        self._value = 0
+
+    def inc(self, amount=1):
+        """
+        Increments the counter
+
+        :param amount: The amount to increment the counter by
+        """
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self):
+        """
+        The current value of the counter
+        """
+        if self._func is not None:
+            return self._func()
+        return self._value
+
+    def snapshot(self):
+        """
+        Returns a snapshot of the counter
+
+        :return: The current value of the counter
+        """
+        return self.value
+
+
+class Gauge(object):
+    """
+    A metric whose value can increase and decrease (for example, the depth of a queue).
+
+    The value of a gauge is either set explicitly or sampled from a function each time it is read.
+    """
+
+    def __init__(self, func=None):
+        """
+        Constructs the gauge
+
+        :param func: A function which returns the current value of the gauge (optional)
+        """
+        self._func = func
+        self._value = 0
+
+    def set(self, value):
+        """
+        Sets the value of the gauge
+
+        :param value: The value
+        """
+        self._value = value
+
+    @property
+    def value(self):
+        """
+        The current value of the gauge
+        """
+        if self._func is not None:
+            return self._func()
+        return self._value
+
+    def snapshot(self):
+        """
+        Returns a snapshot of the gauge
+
+        :return: The current value of the gauge
+        """
+        return self.value
+
+
+class Histogram(object):
+    """
+    A metric which tracks the distribution of observed values (for example, latencies) in a
+    fixed set of buckets. The memory used by a histogram does not grow with the number of
+    observations.
+    """
+
+    # The default bucket upper bounds (in seconds), suitable for latencies
+    DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                       0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+        Constructs the histogram
+
+        :param buckets: The (sorted) upper bounds of the buckets. Values greater than the last
+            upper bound are counted in an additional, unbounded bucket.
+        """
+        self._lock = Lock()
+        self._buckets = tuple(buckets)
+        self._counts = [0] * (len(self._buckets) + 1)
+        self._count = 0
+        self._sum = 0.0
+
+    @property
+    def buckets(self):
+        """
+        The upper bounds of the buckets
+        """
+        return self._buckets
+
+    @property
+    def count(self):
+        """
+        The number of observed values
+        """
+        return self._count
+
+    @property
+    def sum(self):
+        """
+        The sum of the observed values
+        """
+        return self._sum
+
+    def observe(self, value):
+        """
+        Records an observed value
+
+        :param value: The value
+        """
+        index = bisect_left(self._buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum += value
+
+    def percentile(self, percent):
+        """
+        Returns an estimate of the specified percentile of the observed values (the upper bound
+        of the bucket containing the percentile)
+
+        :param percent: The percentile (0 - 100)
+        :return: The estimated percentile, ``None`` if no values have been observed, or
+            ``float("inf")`` if the percentile falls in the unbounded bucket
+        """
+        with self._lock:
+            counts = list(self._counts)
+            count = self._count
+        if not count:
+            return None
+        rank = max(1, int(round(count * percent / 100.0)))
+        total = 0
+        for index, bucket_count in enumerate(counts):
+            total += bucket_count
+            if total >= rank:
+                return self._buckets[index] if index < len(self._buckets) else float("inf")
+        return float("inf")
+
+    def snapshot(self):
+        """
+        Returns a snapshot of the histogram
+
+        :return: A dictionary containing the ``count`` and ``sum`` of the observed values, and
+            the cumulative ``buckets`` as a list of ``(upper bound, count)`` tuples
+        """
+        with self._lock:
+            counts = list(self._counts)
+            count = self._count
+            total_sum = self._sum
+        cumulative = []
+        total = 0
+        for bound, bucket_count in zip(self._buckets + (float("inf"),), counts):
+            total += bucket_count
+            cumulative.append((bound, total))
+        return {"count": count, "sum": total_sum, "buckets": cumulative}
+
+
+class MetricsRegistry(object):
+    """
+    Registry of named metrics. Each metric is identified by its name and an optional set of
+    labels (for example, the topic associated with a callback).
+    """
+
+    def __init__(self):
+        """
+        Constructs the registry
+        """
+        self._lock = Lock()
+        # Metric name to (metric class, dictionary of label tuple to metric)
+        self._metrics = {}
+
+    def _get_metric(self, metric_class, name, labels, factory):
+        """
+        Returns the metric with the specified name and labels (creating it if necessary)
+
+        :param metric_class: The class of the metric
+        :param name: The name of the metric
+        :param labels: The labels of the metric (dictionary)
+        :param factory: Function used to create the metric
+        :return: The metric
+        """
+        label_key = tuple(sorted((labels or {}).items()))
+        with self._lock:
+            registered_class, metrics = self._metrics.setdefault(name, (metric_class, {}))
+            if registered_class is not metric_class:
+                raise Exception(
+                    "Metric '{0}' is already registered as a {1}".format(
+                        name, registered_class.__name__))
+            metric = metrics.get(label_key)
+            if metric is None:
+                metric = factory()
+                metrics[label_key] = metric
+            return metric
+
+    def counter(self, name, labels=None, func=None):
+        """
+        Returns the counter with the specified name and labels (creating it if necessary)
+
+        :param name: The name of the counter
+        :param labels: The labels of the counter (dictionary, optional)
+        :param func: A function which returns the current value of the counter (optional, only
+            used when the counter is created)
+        :return: The counter
+        """
+        return self._get_metric(Counter, name, labels, lambda: Counter(func))
+
+    def gauge(self, name, labels=None, func=None):
+        """
+        Returns the gauge with the specified name and labels (creating it if necessary)
+
+        :param name: The name of the gauge
+        :param labels: The labels of the gauge (dictionary, optional)
+        :param func: A function which returns the current value of the gauge (optional, only
+            used when the gauge is created)
+        :return: The gauge
+        """
+        return self._get_metric(Gauge, name, labels, lambda: Gauge(func))
+
+    def histogram(self, name, labels=None, buckets=Histogram.DEFAULT_BUCKETS):
+        """
+        Returns the histogram with the specified name and labels (creating it if necessary)
+
+        :param name: The name of the histogram
+        :param labels: The labels of the histogram (dictionary, optional)
+        :param buckets: The upper bounds of the buckets (only used when the histogram is created)
+        :return: The histogram
+        """
+        return self._get_metric(Histogram, name, labels, lambda: Histogram(buckets))
+
+    def collect(self):
+        """
+        Returns the registered metrics
+
+        :return: A list of ``(name, metric class, list of (labels dictionary, metric))`` tuples,
+            sorted by name
+        """
+        with self._lock:
+            items = [(name, metric_class, list(metrics.items()))
+                     for name, (metric_class, metrics) in self._metrics.items()]
+        return [(name, metric_class,
+                 [(dict(label_key), metric) for label_key, metric in sorted(metrics)])
+                for name, metric_class, metrics in sorted(items, key=lambda item: item[0])]
+
+    def snapshot(self):
+        """
+        Returns a snapshot of the registered metrics
+
+        :return: A dictionary containing, for each metric name, a list of dictionaries with the
+            ``labels`` and ``value`` (see the ``snapshot`` method of the metric type) of each metric
+        """
+        return dict((name, [{"labels": labels, "value": metric.snapshot()}
+                            for labels, metric in metrics])
+                    for name, _, metrics in self.collect())
+
+
+def _format_value(value):
+    """
+    Formats a metric value for the text exposition format
+
+    :param value: The value
+    :return: The formatted value
+    """
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+def _format_labels(labels):
+    """
+    Formats metric labels for the text exposition format
+
+    :param labels: The labels (list of name/value tuples)
+    :return: The formatted labels
+    """
+    if not labels:
+        return ""
+    return "{" + ",".join(
+        '{0}="{1}"'.format(name, str(value).replace("\\", "\\\\")
+                           .replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels) + "}"
+
+
+def format_text(registry):
+    """
+    Formats the metrics of the specified registry in the Prometheus text exposition format
+
+    :param registry: The metrics registry
+    :return: The formatted metrics
+    """
+    types = {Counter: "counter", Gauge: "gauge", Histogram: "histogram"}
+    lines = []
+    for name, metric_class, metrics in registry.collect():
+        lines.append("# TYPE {0} {1}".format(name, types[metric_class]))
+        for labels, metric in metrics:
+            labels = sorted(labels.items())
+            if metric_class is Histogram:
+                snapshot = metric.snapshot()
+                for bound, count in snapshot["buckets"]:
+                    lines.append("{0}_bucket{1} {2}".format(
+                        name, _format_labels(labels + [("le", _format_value(float(bound)))]),
+                        count))
+                lines.append("{0}_sum{1} {2}".format(name, _format_labels(labels),
+                                                     _format_value(snapshot["sum"])))
+                lines.append("{0}_count{1} {2}".format(name, _format_labels(labels),
+                                                       snapshot["count"]))
+            else:
+                lines.append("{0}{1} {2}".format(name, _format_labels(labels),
+                                                 _format_value(metric.snapshot())))
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP request handler which serves the metrics of the registry associated with the server
+    """
+
+    # The paths the metrics are served on
+    METRICS_PATHS = ("/", "/metrics")
+
+    def do_GET(self): # pylint: disable=invalid-name
+        """
+        Handles an HTTP GET request
+        """
+        if self.path.split("?", 1)[0] not in self.METRICS_PATHS:
+            self.send_error(404)
+            return
+        try:
+            body = format_text(self.server.registry).encode("utf-8")
+        except Exception: # pylint: disable=broad-except
+            logger.exception("Error formatting metrics")
+            self.send_error(500)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args): # pylint: disable=redefined-builtin
+        """
+        Logs an HTTP request (at the debug level)
+        """
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class _MetricsHTTPServer(ThreadingMixIn, HTTPServer):
+    """
+    Threaded HTTP server associated with a metrics registry
+    """
+    daemon_threads = True
+
+    def __init__(self, server_address, registry):
+        """
+        Constructs the server
+
+        :param server_address: The address (host, port) to listen on
+        :param registry: The metrics registry
+        """
+        HTTPServer.__init__(self, server_address, _MetricsRequestHandler)
+        self.registry = registry
+
+
+class MetricsHttpServer(object):
+    """
+    Lightweight HTTP server which serves the metrics of a registry in the Prometheus text
+    exposition format (on the ``/metrics`` path)
+    """
+
+    def __init__(self, registry, port, host="127.0.0.1"):
+        """
+        Constructor parameters:
+
+        :param registry: The metrics registry
+        :param port: The port to listen on (``0`` to select an available port)
+        :param host: The host (interface) to listen on
+        """
+        self._server = _MetricsHTTPServer((host, port), registry)
+        self._thread = None
+
+    @property
+    def port(self):
+        """
+        The port the server is listening on
+        """
+        return self._server.server_address[1]
+
+    def start(self):
+        """
+        Starts serving the metrics (on a separate thread)
+        """
+        self._thread = Thread(target=self._server.serve_forever, name="MetricsHttpServer")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops serving the metrics and closes the server socket
+        """
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
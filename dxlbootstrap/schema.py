@@ -0,0 +1,159 @@
+from __future__ import absolute_import
+import logging
+
+from ._compat import IntegerTypes, UnicodeString
+from ._exceptions import SchemaValidationError # pylint: disable=unused-import
+from .util import MessageUtils
+
+# Configure local logger
+logger = logging.getLogger(__name__)
+
+
+class PayloadSchema(object):
+    """
+    Declarative schema for message payloads which are JSON objects (dictionaries).
+
+    A schema is declared as a comma-delimited list of ``name:type`` fields, where ``type`` is
+    one of ``str``, ``int``, ``float``, ``bool``, ``list``, ``dict``, or ``any``. Fields are
+    required unless the type is followed by ``?`` (an optional field may also be ``null``).
+    For example::
+
+        host:str, port:int?, tags:list?
+
+    The schema is compiled once (when it is constructed) into a validation function, so that
+    validating a payload costs a single function call.
+    """
+
+    # Type name to the Python types accepted for the type (None for any type)
+    TYPES = {
+        "str": (UnicodeString, str),
+        "int": IntegerTypes,
+        "float": (float,) + IntegerTypes,
+        "bool": (bool,),
+        "list": (list,),
+        "dict": (dict,),
+        "any": None
+    }
+
+    # The types which must not accept booleans (bool is a subclass of int)
+    _NUMERIC_TYPES = ("int", "float")
+
+    def __init__(self, spec):
+        """
+        Constructor parameters:
+
+        :param spec: The schema (comma-delimited list of ``name:type`` fields)
+        """
+        self._spec = spec
+        self._fields = self._parse(spec)
+        self._validate = self._compile(self._fields)
+
+    @property
+    def spec(self):
+        """
+        The schema (comma-delimited list of ``name:type`` fields)
+        """
+        return self._spec
+
+    @property
+    def fields(self):
+        """
+        The fields of the schema (list of ``(name, type, required)`` tuples)
+        """
+        return list(self._fields)
+
+    @classmethod
+    def _parse(cls, spec):
+        """
+        Parses the specified schema
+
+        :param spec: The schema (comma-delimited list of ``name:type`` fields)
+        :return: The fields of the schema (list of ``(name, type, required)`` tuples)
+        """
+        fields = []
+        names = set()
+        for field in spec.split(","):
+            field = field.strip()
+            if not field:
+                continue
+            name, sep, type_name = field.partition(":")
+            name = name.strip()
+            type_name = type_name.strip()
+            required = not type_name.endswith("?")
+            type_name = type_name.rstrip("?").strip()
+            if not sep or not name:
+                raise Exception(
+                    "Invalid schema field (expected 'name:type'): {0}".format(field))
+            if type_name not in cls.TYPES:
+                raise Exception("Unknown type for schema field '{0}': {1}. Expected one of: "
+                                "{2}".format(name, type_name, ", ".join(sorted(cls.TYPES))))
+            if name in names:
+                raise Exception("Duplicate schema field: {0}".format(name))
+            names.add(name)
+            fields.append((name, type_name, required))
+        return fields
+
+    @classmethod
+    def _compile(cls, fields):
+        """
+        Compiles the specified fields into a validation function
+
+        :param fields: The fields of the schema (list of ``(name, type, required)`` tuples)
+        :return: The validation function
+        """
+        namespace = {"SchemaValidationError": SchemaValidationError}
+        lines = ["def validate(obj):",
+                 "    if not isinstance(obj, dict):",
+                 "        raise SchemaValidationError('Payload must be a JSON object')"]
+        for index, (name, type_name, required) in enumerate(fields):
+            indent = "    "
+            if required:
+                lines.append("    if {0!r} not in obj:".format(name))
+                lines.append("        raise SchemaValidationError("
+                             "'Missing required field: ' + {0!r})".format(name))
+                lines.append("    value = obj[{0!r}]".format(name))
+            else:
+                lines.append("    value = obj.get({0!r})".format(name))
+                if cls.TYPES[type_name] is not None:
+                    lines.append("    if value is not None:")
+                    indent += "    "
+            if cls.TYPES[type_name] is not None:
+                types_name = "TYPES_{0}".format(index)
+                namespace[types_name] = cls.TYPES[type_name]
+                condition = "not isinstance(value, {0})".format(types_name)
+                if type_name in cls._NUMERIC_TYPES:
+                    condition += " or isinstance(value, bool)"
+                lines.append("{0}if {1}:".format(indent, condition))
+                lines.append("{0}    raise SchemaValidationError("
+                             "'Field ' + {1!r} + ' must be of type ' + {2!r})".format(
+                                 indent, name, type_name))
+        lines.append("    return obj")
+        exec(compile("\n".join(lines), "<schema>", "exec"), namespace) # pylint: disable=exec-used
+        return namespace["validate"]
+
+    def validate(self, obj):
+        """
+        Validates the specified object against the schema. A
+        :class:`dxlbootstrap.schema.SchemaValidationError` is raised if the object does not
+        conform to the schema.
+
+        :param obj: The object (as decoded from a message payload)
+        :return: The object
+        """
+        return self._validate(obj)
+
+    def decode(self, message):
+        """
+        Decodes the specified message's payload (see
+        :func:`dxlbootstrap.util.MessageUtils.json_payload_to_dict`) and validates it against the
+        schema. A :class:`dxlbootstrap.schema.SchemaValidationError` is raised if the payload
+        cannot be decoded or does not conform to the schema.
+
+        :param message: The DXL message
+        :return: The decoded payload
+        """
+        try:
+            obj = MessageUtils.json_payload_to_dict(message)
+        except Exception as ex: # pylint: disable=broad-except
+            raise SchemaValidationError("Payload could not be decoded: {0}".format(ex))
+        return self._validate(obj)
@@ -1,7 +1,14 @@
 from __future__ import absolute_import
+import codecs
 import json
 import logging
 from ._compat import UnicodeString
+from ._compression import COMPRESSION_ALGORITHMS, get_available_compression_algorithms, \
+    get_compressor
+from ._json_codec import JSON_CODEC_NAMES, get_json_codec
+from ._json_stream import JsonStreamDecoder
+from ._payload_format import JSON_CONTENT_TYPE, JSON_FORMAT, PAYLOAD_FORMATS, \
+    PAYLOAD_FORMAT_BY_CONTENT_TYPE, get_payload_format
 
 # Configure local logger
 logger = logging.getLogger(__name__)
@@ -10,8 +17,117 @@ logger = logging.getLogger(__name__)
 class MessageUtils(object):
     """
     Messaging related utility methods
+
+    Conversions between Python objects and UTF-8 encoded JSON (and parsing of JSON strings)
+    are performed by a JSON codec. By default, the fastest available codec is used:
+    ``orjson``, ``ujson``, or ``simplejson`` when installed, otherwise the Python standard
+    library ``json`` module. A specific codec can be selected via :func:`set_json_codec`.
+    JSON strings (and payloads in encodings other than UTF-8) are always produced by the
+    standard library.
+
+    Payloads can be compressed via :func:`compress_payload` (or the ``compression`` parameter
+    of :func:`encode_payload` and :func:`dict_to_json_payload`). The compression algorithm is
+    indicated by the ``Content-Encoding`` field of the message (see ``other_fields``), and
+    compressed payloads are decompressed automatically by :func:`decode_payload` and
+    :func:`json_payload_to_dict` (up to a maximum size, see
+    :func:`set_max_decompressed_size`).
+
+    Python objects can also be placed in payloads in a binary format such as MessagePack via
+    the ``fmt`` parameter of :func:`encode_payload`. The format is indicated by the
+    ``Content-Type`` field of the message, and payloads in a binary format are decoded
+    automatically by :func:`decode_payload` and :func:`json_payload_to_dict`.
     """
 
+    # The names of the supported JSON codecs (in order of preference)
+    JSON_CODECS = JSON_CODEC_NAMES
+
+    # The names of the supported compression algorithms (in order of preference)
+    COMPRESSION_ALGORITHMS = COMPRESSION_ALGORITHMS
+    # The default compression algorithm (always available)
+    DEFAULT_COMPRESSION_ALGORITHM = "zlib"
+    # The default minimum payload size (in bytes) for compression
+    DEFAULT_COMPRESSION_THRESHOLD = 1024
+    # The message field containing the compression algorithm of the payload
+    CONTENT_ENCODING_FIELD = "Content-Encoding"
+    # The message field containing the (comma-delimited) compression algorithms accepted for
+    # the payload of the response to a request
+    ACCEPT_ENCODING_FIELD = "Accept-Encoding"
+    # The default maximum size (in bytes) of a decompressed payload
+    DEFAULT_MAX_DECOMPRESSED_SIZE = 64 * 1024 * 1024
+
+    # The default number of payload bytes decoded per chunk when iterating a JSON payload
+    DEFAULT_JSON_STREAM_CHUNK_SIZE = 64 * 1024
+
+    # The names of the supported payload formats ("json", "msgpack", and "cbor")
+    PAYLOAD_FORMATS = PAYLOAD_FORMATS
+    # The message field containing the content type of the payload
+    CONTENT_TYPE_FIELD = "Content-Type"
+
+    # The JSON codec (selected on first use)
+    _json_codec = None
+    # The maximum size (in bytes) of a decompressed payload
+    _max_decompressed_size = DEFAULT_MAX_DECOMPRESSED_SIZE
+
+    @staticmethod
+    def set_json_codec(name=None):
+        """
+        Selects the JSON codec used to convert between Python objects and JSON (for all of
+        the applications and clients in the process)
+
+        :param name: The name of the codec (see ``JSON_CODECS``), or ``None`` to select the
+            fastest available codec. An exception is thrown if the module of the codec is not
+            installed.
+        """
+        codec = get_json_codec(name)
+        MessageUtils._json_codec = codec
+        logger.debug("JSON codec: %s", codec.NAME)
+
+    @staticmethod
+    def get_json_codec():
+        """
+        Returns the name of the JSON codec used to convert between Python objects and JSON
+
+        :return: The name of the JSON codec
+        """
+        return MessageUtils._get_json_codec().NAME
+
+    @staticmethod
+    def _get_json_codec():
+        """
+        Returns the JSON codec (selecting the fastest available codec if a codec has not
+        been selected)
+
+        :return: The JSON codec
+        """
+        codec = MessageUtils._json_codec
+        if codec is None:
+            codec = get_json_codec()
+            MessageUtils._json_codec = codec
+        return codec
+
+    @staticmethod
+    def set_max_decompressed_size(size):
+        """
+        Sets the maximum size of a decompressed payload (for all of the applications and
+        clients in the process). Decompressing a payload which exceeds it raises a
+        ``ValueError``, which protects against payloads that inflate to an excessive size
+        (decompression bombs).
+
+        :param size: The maximum size (in bytes) of a decompressed payload
+        """
+        if size < 1:
+            raise Exception("Maximum decompressed size must be greater than or equal to 1")
+        MessageUtils._max_decompressed_size = size
+
+    @staticmethod
+    def get_max_decompressed_size():
+        """
+        Returns the maximum size of a decompressed payload
+
+        :return: The maximum size (in bytes) of a decompressed payload
+        """
+        return MessageUtils._max_decompressed_size
+
     @staticmethod
     def dict_to_json(dict, pretty_print=False): # pylint: disable=redefined-builtin
         """
@@ -35,10 +151,62 @@ class MessageUtils(object):
         :param json_string: The JSON string
         :return: The Python dictionary (``dict``)
         """
-        return json.loads(json_string.rstrip("\0"))
+        return MessageUtils._get_json_codec().loads(json_string.rstrip("\0"))
+
+    @staticmethod
+    def dict_to_json_bytes(dict): # pylint: disable=redefined-builtin
+        """
+        Converts the specified Python dictionary (``dict``) to UTF-8 encoded JSON and
+        returns it (without an intermediate JSON string).
+
+        :param dict: The Python dictionary (``dict``)
+        :return: The UTF-8 encoded JSON (``bytes``)
+        """
+        return MessageUtils._get_json_codec().dumps_bytes(dict)
+
+    @staticmethod
+    def json_bytes_to_dict(data):
+        """
+        Converts the specified UTF-8 encoded JSON to a Python dictionary (``dict``) and
+        returns it. The JSON is parsed directly from the specified data (without an
+        intermediate JSON string), and trailing null characters are ignored without copying
+        the data.
+
+        :param data: The UTF-8 encoded JSON (``bytes``, ``bytearray``, or ``memoryview``)
+        :return: The Python dictionary (``dict``)
+        """
+        return MessageUtils._get_json_codec().loads_bytes(MessageUtils._trim_nulls(data))
 
     @staticmethod
-    def dict_to_json_payload(message, dict, enc="utf-8"): # pylint: disable=redefined-builtin
+    def _trim_nulls(data):
+        """
+        Returns the specified data without trailing null characters. If the data contains
+        trailing null characters, a ``memoryview`` of the remaining data is returned (the
+        data is not copied).
+
+        :param data: The data (``bytes``, ``bytearray``, or ``memoryview``)
+        :return: The data without trailing null characters
+        """
+        end = len(data)
+        while end and data[end - 1:end] == b"\0":
+            end -= 1
+        if end == len(data):
+            return data
+        return memoryview(data)[:end]
+
+    @staticmethod
+    def _is_utf_8(enc):
+        """
+        Returns whether the specified encoding is UTF-8
+
+        :param enc: The encoding
+        :return: Whether the specified encoding is UTF-8
+        """
+        return codecs.lookup(enc).name == "utf-8"
+
+    @staticmethod
+    def dict_to_json_payload(message, dict, enc="utf-8", # pylint: disable=redefined-builtin
+                             compression=None):
         """
         Converts the specified Python dictionary (``dict``) to a JSON string and places
         it in the DXL message's payload.
@@ -46,8 +214,19 @@ class MessageUtils(object):
         :param message: The DXL message
         :param dict: The Python dictionary (``dict``)
         :param enc: The encoding to use for the payload
+        :param compression: The compression algorithm to use for the payload if it is larger
+            than the default threshold (see :func:`compress_payload`), or ``None`` to not
+            compress the payload
         """
-        MessageUtils.encode_payload(message, MessageUtils.dict_to_json(dict), enc)
+        if MessageUtils._is_utf_8(enc):
+            message.payload = MessageUtils.dict_to_json_bytes(dict)
+            # The payload replaces any previously compressed payload
+            message.other_fields.pop(MessageUtils.CONTENT_ENCODING_FIELD, None)
+            if compression is not None:
+                MessageUtils.compress_payload(message, compression)
+        else:
+            MessageUtils.encode_payload(message, MessageUtils.dict_to_json(dict), enc,
+                                        compression)
 
     @staticmethod
     def json_payload_to_dict(message, enc="utf-8"):
@@ -59,29 +238,191 @@ class MessageUtils(object):
         :param enc: The encoding of the payload
         :return: The Python dictionary (``dict``)
         """
-        return MessageUtils.json_to_dict(MessageUtils.decode_payload(message, enc))
+        payload = MessageUtils.decompress_payload(message)
+        fmt = MessageUtils.get_payload_format(message)
+        if fmt is not None and fmt != JSON_FORMAT:
+            return get_payload_format(fmt).loads(payload)
+        if MessageUtils._is_utf_8(enc) and isinstance(payload, (bytes, bytearray, memoryview)):
+            return MessageUtils.json_bytes_to_dict(payload)
+        return MessageUtils.json_to_dict(MessageUtils.decode(payload, enc=enc))
+
+    @staticmethod
+    def iter_json_payload(message, chunk_size=DEFAULT_JSON_STREAM_CHUNK_SIZE):
+        """
+        Returns an iterator over the elements of the array (or the members of the object)
+        contained in the specified message's JSON payload.
+
+        The payload is decoded incrementally as the iterator advances: only the element
+        currently being decoded is held as Python objects (rather than the whole document),
+        and an error in the payload is raised (as a ``ValueError``) when it is reached.
+        Payloads in a binary format (see :func:`encode_payload`) are decoded in full.
+
+        :param message: The DXL message
+        :param chunk_size: The number of payload bytes decoded per chunk
+        :return: An iterator over the elements of the array, or the ``(key, value)`` members
+            of the object
+        """
+        payload = MessageUtils.decompress_payload(message)
+        fmt = MessageUtils.get_payload_format(message)
+        if fmt is not None and fmt != JSON_FORMAT:
+            value = get_payload_format(fmt).loads(payload)
+            return iter(value.items() if isinstance(value, dict) else value)
+        return iter(JsonStreamDecoder(payload, chunk_size))
 
     @staticmethod
-    def encode_payload(message, value, enc="utf-8"):
+    def encode_payload(message, value, enc="utf-8", compression=None, fmt=None):
         """
         Encodes the specified value and places it in the DXL message's payload
 
         :param message: The DXL message
         :param value: The value
-        :param enc: The encoding to use
+        :param enc: The encoding to use (not used if ``fmt`` is specified)
+        :param compression: The compression algorithm to use for the payload if it is larger
+            than the default threshold (see :func:`compress_payload`), or ``None`` to not
+            compress the payload
+        :param fmt: The format used to encode the value (see ``PAYLOAD_FORMATS``), or ``None``
+            to encode the value as described in :func:`encode`. If specified, the content type
+            of the format is stored in the ``Content-Type`` field of the message.
         """
-        message.payload = MessageUtils.encode(value, enc=enc)
+        # The payload replaces any previously compressed payload
+        message.other_fields.pop(MessageUtils.CONTENT_ENCODING_FIELD, None)
+        if fmt is None:
+            message.payload = MessageUtils.encode(value, enc=enc)
+        elif fmt == JSON_FORMAT:
+            message.payload = MessageUtils.dict_to_json_bytes(value)
+            message.other_fields[MessageUtils.CONTENT_TYPE_FIELD] = JSON_CONTENT_TYPE
+        else:
+            payload_format = get_payload_format(fmt)
+            message.payload = payload_format.dumps(value)
+            message.other_fields[MessageUtils.CONTENT_TYPE_FIELD] = payload_format.CONTENT_TYPE
+        if compression is not None:
+            MessageUtils.compress_payload(message, compression)
 
     @staticmethod
-    def decode_payload(message, enc="utf-8"):
+    def decode_payload(message, enc="utf-8", fmt=None):
         """
-        Decodes the specified message's payload and returns it.
+        Decodes the specified message's payload and returns it. The payload is decompressed
+        first if it was compressed (see :func:`compress_payload`).
 
         :param message: The DXL message
-        :param enc: The encoding of the payload
+        :param enc: The encoding of the payload (not used if the payload has a binary format)
+        :param fmt: The format of the payload (see ``PAYLOAD_FORMATS``). If ``None``, the
+            binary format indicated by the ``Content-Type`` field of the message is used, or,
+            if the message does not indicate a binary format, the payload is decoded to a
+            string (JSON payloads are only converted to Python objects if ``fmt`` is
+            ``"json"``).
         :return: The decoded value
         """
-        return MessageUtils.decode(message.payload, enc=enc)
+        payload = MessageUtils.decompress_payload(message)
+        if fmt is None:
+            fmt = MessageUtils.get_payload_format(message)
+            if fmt == JSON_FORMAT:
+                fmt = None
+        if fmt is None:
+            return MessageUtils.decode(payload, enc=enc)
+        if fmt == JSON_FORMAT:
+            return MessageUtils.json_bytes_to_dict(payload)
+        return get_payload_format(fmt).loads(payload)
+
+    @staticmethod
+    def get_payload_format(message):
+        """
+        Returns the format of the specified DXL message's payload (as indicated by the
+        ``Content-Type`` field of the message)
+
+        :param message: The DXL message
+        :return: The format of the payload (see ``PAYLOAD_FORMATS``), or ``None`` if the
+            message does not indicate a supported format
+        """
+        other_fields = message.other_fields
+        if not other_fields or MessageUtils.CONTENT_TYPE_FIELD not in other_fields:
+            return None
+        content_type = other_fields[MessageUtils.CONTENT_TYPE_FIELD].split(";", 1)[0]
+        return PAYLOAD_FORMAT_BY_CONTENT_TYPE.get(content_type.strip().lower())
+
+    @staticmethod
+    def compress_payload(message, algorithm=DEFAULT_COMPRESSION_ALGORITHM,
+                         threshold=DEFAULT_COMPRESSION_THRESHOLD, request=None):
+        """
+        Compresses the DXL message's payload (in place) if it is at least ``threshold`` bytes
+        in size. The compression algorithm is stored in the ``Content-Encoding`` field of the
+        message. The payload is left uncompressed if compressing it does not reduce its size.
+
+        :param message: The DXL message
+        :param algorithm: The compression algorithm (see ``COMPRESSION_ALGORITHMS``). If
+            ``request`` is specified and does not accept this algorithm, or if ``None``, the
+            preferred algorithm accepted by the request is used.
+        :param threshold: The minimum payload size (in bytes) for compression
+        :param request: The request the message is a response to (optional). If specified,
+            the payload is only compressed with an algorithm the request accepts (see
+            :func:`set_accept_encoding`).
+        :return: The compression algorithm used (``None`` if the payload was not compressed)
+        """
+        if request is not None:
+            accepted = MessageUtils.get_accept_encoding(request)
+            available = get_available_compression_algorithms()
+            candidates = [candidate for candidate in accepted if candidate in available]
+            if algorithm not in candidates:
+                algorithm = candidates[0] if candidates else None
+        elif algorithm is None:
+            algorithm = MessageUtils.DEFAULT_COMPRESSION_ALGORITHM
+
+        payload = message.payload
+        if algorithm is None or payload is None or len(payload) < threshold or \
+                MessageUtils.CONTENT_ENCODING_FIELD in message.other_fields:
+            return None
+        compressed = get_compressor(algorithm).compress(payload)
+        if len(compressed) >= len(payload):
+            return None
+        message.payload = compressed
+        message.other_fields[MessageUtils.CONTENT_ENCODING_FIELD] = algorithm
+        return algorithm
+
+    @staticmethod
+    def decompress_payload(message):
+        """
+        Returns the DXL message's payload, decompressed if it was compressed (see
+        :func:`compress_payload`). The message is not modified (it may be shared between
+        threads, for example a cached response).
+
+        A ``ValueError`` is raised if the decompressed payload exceeds the maximum size (see
+        :func:`set_max_decompressed_size`).
+
+        :param message: The DXL message
+        :return: The payload (decompressed if it was compressed)
+        """
+        other_fields = message.other_fields
+        if other_fields and MessageUtils.CONTENT_ENCODING_FIELD in other_fields:
+            algorithm = other_fields[MessageUtils.CONTENT_ENCODING_FIELD]
+            return get_compressor(algorithm).decompress(
+                message.payload, MessageUtils._max_decompressed_size)
+        return message.payload
+
+    @staticmethod
+    def set_accept_encoding(request, algorithms=None):
+        """
+        Sets the compression algorithms accepted for the payload of the response to the
+        specified DXL request (in the ``Accept-Encoding`` field of the request)
+
+        :param request: The DXL request
+        :param algorithms: The accepted compression algorithms (in order of preference), or
+            ``None`` for all of the available algorithms
+        """
+        if algorithms is None:
+            algorithms = get_available_compression_algorithms()
+        request.other_fields[MessageUtils.ACCEPT_ENCODING_FIELD] = ",".join(algorithms)
+
+    @staticmethod
+    def get_accept_encoding(request):
+        """
+        Returns the compression algorithms accepted for the payload of the response to the
+        specified DXL request (see :func:`set_accept_encoding`)
+
+        :param request: The DXL request
+        :return: The accepted compression algorithms (in order of preference)
+        """
+        value = request.other_fields.get(MessageUtils.ACCEPT_ENCODING_FIELD, "")
+        return [algorithm.strip() for algorithm in value.split(",") if algorithm.strip()]
 
     @staticmethod
     def encode(value, enc="utf-8"):
@@ -97,7 +438,10 @@ class MessageUtils(object):
         elif isinstance(value, (bytes, bytearray)):
             encoded_value = value
         elif isinstance(value, dict):
-            encoded_value = MessageUtils.dict_to_json(value).encode(enc)
+            if MessageUtils._is_utf_8(enc):
+                encoded_value = MessageUtils.dict_to_json_bytes(value)
+            else:
+                encoded_value = MessageUtils.dict_to_json(value).encode(enc)
         elif isinstance(value, (int, float)):
             encoded_value = str(value).encode('ascii')
         elif value is None:
@@ -62,7 +62,8 @@ setup(
 
     # Requirements
     install_requires=[
-        "dxlclient>=4.1.0.184"
+        "dxlclient>=4.1.0.184",
+        "futures; python_version == '2.7'"
     ],
 
     tests_require=TEST_REQUIREMENTS,
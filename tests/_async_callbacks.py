@@ -0,0 +1,45 @@
+""" Coroutine message callbacks used by the tests (requires Python 3.5 or later). """
+
+# pylint: disable=invalid-overridden-method
+import asyncio
+
+from dxlclient.callbacks import EventCallback, RequestCallback
+from dxlclient.message import Response
+
+
+class AsyncEventCallback(EventCallback):
+    """
+    Coroutine event callback which records the events it receives
+    """
+    def __init__(self, delay=0):
+        super(AsyncEventCallback, self).__init__()
+        self.delay = delay
+        self.events = []
+        self.active_count = 0
+        self.max_active_count = 0
+
+    async def on_event(self, event):
+        self.active_count += 1
+        self.max_active_count = max(self.max_active_count, self.active_count)
+        try:
+            await asyncio.sleep(self.delay)
+            if event.payload == b"error":
+                raise Exception("error")
+            self.events.append(event)
+        finally:
+            self.active_count -= 1
+
+
+class AsyncRequestCallback(RequestCallback):
+    """
+    Coroutine request callback which responds with the request payload
+    """
+    def __init__(self, dxl_client):
+        super(AsyncRequestCallback, self).__init__()
+        self.dxl_client = dxl_client
+
+    async def on_request(self, request):
+        await asyncio.sleep(0)
+        response = Response(request)
+        response.payload = request.payload
+        self.dxl_client.send_response(response)
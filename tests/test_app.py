@@ -0,0 +1,595 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+# pylint: disable=wrong-import-position
+from mock import MagicMock, patch
+from dxlclient.exceptions import DxlException
+from dxlclient.message import ErrorResponse, Event, Request, Response
+from dxlbootstrap.app import Application
+from dxlbootstrap._callback_wrappers import CallbackMetrics, ThreadedRequestCallback
+from dxlbootstrap.callbacks import BatchEventCallback
+from dxlbootstrap._compat import asyncio
+from dxlbootstrap._coroutine_loop import CoroutineLoop
+from dxlbootstrap._thread_pool import CallbacksPool
+from dxlbootstrap.util import MessageUtils
+
+if asyncio is not None:
+    from ._async_callbacks import AsyncEventCallback, AsyncRequestCallback
+else:
+    AsyncEventCallback = AsyncRequestCallback = None # pylint: disable=invalid-name
+
+APP_CONFIG_FILE = """
+[MessageCallbackPool]
+threadCount=3
+
+[MessageCallbackPool:bulk]
+queueSize=5
+overflowPolicy=dropNewest
+topics=/mycompany/event/bulk, /mycompany/event/bulk2
+services=/mycompany/service/bulk
+"""
+
+
+def _process_request_handler(payload):
+    """
+    Request handler function invoked in a worker process
+    """
+    if payload == b"error":
+        raise ValueError("invalid payload")
+    return {"length": len(payload)}
+
+
+def _process_unpicklable_result_handler(payload):
+    """
+    Request handler function invoked in a worker process which returns an unpicklable value
+    """
+    return lambda: payload
+
+
+def _process_unencodable_result_handler(payload):
+    """
+    Request handler function invoked in a worker process which returns a value that cannot be
+    encoded as a response payload
+    """
+    return set([payload])
+
+
+def _wait_until(predicate, timeout=2):
+    """
+    Waits until the specified predicate is true (or the timeout elapses)
+    """
+    end_time = time.time() + timeout
+    while not predicate() and time.time() < end_time:
+        time.sleep(0.01)
+    return predicate()
+
+
+class ApplicationTest(unittest.TestCase): # pylint: disable=too-many-public-methods
+    def setUp(self):
+        self.config_dir = tempfile.mkdtemp(prefix="app_")
+        with open(os.path.join(self.config_dir,
+                               Application.DXL_CLIENT_CONFIG_FILE), "w"):
+            pass
+        with open(os.path.join(self.config_dir, "app.config"), "w") as handle:
+            handle.write(APP_CONFIG_FILE)
+        self.app = Application(self.config_dir, "app.config")
+        self.app._load_configuration() # pylint: disable=protected-access
+        self.app._dxl_client = MagicMock() # pylint: disable=protected-access
+        self.app._running = True # pylint: disable=protected-access
+
+    def tearDown(self):
+        self.app._dxl_client = None # pylint: disable=protected-access
+        self.app.destroy()
+        shutil.rmtree(self.config_dir)
+
+    def test_named_callbacks_pools(self):
+        # pylint: disable=protected-access
+        app = self.app
+        self.assertEqual({"bulk": (5, 3, "dropNewest")},
+                         app._named_callbacks_pool_settings)
+
+        app.add_event_callback("/mycompany/event/bulk2", MagicMock(), True)
+        self.assertIn("bulk", app._named_callbacks_pools)
+        self.assertIsNone(app._callbacks_pool)
+
+        service = MagicMock()
+        service.service_type = "/mycompany/service/bulk"
+        app.add_request_callback(service, "/mycompany/service/bulk/req",
+                                 MagicMock(), True)
+        self.assertEqual(1, len(app._named_callbacks_pools))
+
+        service.service_type = "/mycompany/service/other"
+        app.add_request_callback(service, "/mycompany/service/other/req",
+                                 MagicMock(), True)
+        self.assertIsNotNone(app._callbacks_pool)
+
+        app.add_event_callback("/mycompany/event/other", MagicMock(), True,
+                               pool_name="other")
+        self.assertIn("other", app._named_callbacks_pools)
+
+    def test_remove_callbacks(self):
+        # pylint: disable=protected-access
+        app = self.app
+        dxl_client = app._dxl_client
+        callback = MagicMock()
+        app.add_event_callback("/mycompany/event", callback, False)
+        wrapper = dxl_client.add_event_callback.call_args[0][1]
+        self.assertIsNot(callback, wrapper)
+        app.remove_event_callback("/mycompany/event", callback)
+        dxl_client.remove_event_callback.assert_called_once_with("/mycompany/event", wrapper)
+
+        service = MagicMock()
+        service.service_type = "/mycompany/service"
+        app.add_request_callback(service, "/mycompany/service/req", callback, True)
+        wrapper = service.add_topic.call_args[0][1]
+        app.remove_request_callback("/mycompany/service/req", callback)
+        dxl_client.remove_request_callback.assert_called_once_with(
+            "/mycompany/service/req", wrapper)
+        self.assertEqual({}, app._callback_wrappers)
+
+        batch_callback = BatchEventCallback()
+        app.add_event_callback("/mycompany/event/batch", batch_callback, False)
+        app.remove_event_callback("/mycompany/event/batch", batch_callback)
+        self.assertEqual([], app._batching_callbacks)
+
+    def test_callbacks_pool_overflow_policies(self):
+        pool = CallbacksPool(1, 0, "test", CallbacksPool.OVERFLOW_POLICY_DROP_OLDEST)
+        self.assertTrue(pool.add_task(len, "a"))
+        self.assertTrue(pool.add_task(len, "b"))
+        self.assertEqual(1, pool.shed_counts["droppedOldest"])
+        pool.shutdown(False)
+
+        # A queue size of 0 (or less) is unbounded
+        for queue_size in (0, -1):
+            pool = CallbacksPool(queue_size, 0, "test")
+            for _ in range(3):
+                self.assertTrue(pool.add_task(len, "a"))
+            self.assertEqual(3, pool.queue_depth)
+            pool.shutdown(False)
+
+        pool = CallbacksPool(1, 0, "test", CallbacksPool.OVERFLOW_POLICY_REJECT)
+        dxl_client = MagicMock()
+        callback = ThreadedRequestCallback(
+            pool, MagicMock(), dxl_client,
+            CallbackMetrics(self.app.metrics, "/mycompany/service/req"))
+        callback.on_request(Request("/mycompany/service/req"))
+        dxl_client.send_response.assert_not_called()
+        callback.on_request(Request("/mycompany/service/req"))
+        response = dxl_client.send_response.call_args[0][0]
+        self.assertIsInstance(response, ErrorResponse)
+        self.assertEqual(Application.OVERLOADED_ERROR_CODE, response.error_code)
+        self.assertEqual(1, pool.shed_counts["rejected"])
+        pool.shutdown(False)
+
+        # Requests discarded by the drop policies are also sent an error response
+        for policy, shed_index in ((CallbacksPool.OVERFLOW_POLICY_DROP_OLDEST, 0),
+                                   (CallbacksPool.OVERFLOW_POLICY_DROP_NEWEST, 1)):
+            pool = CallbacksPool(1, 0, "test", policy)
+            dxl_client = MagicMock()
+            callback = ThreadedRequestCallback(
+                pool, MagicMock(), dxl_client,
+                CallbackMetrics(self.app.metrics, "/mycompany/service/req"))
+            requests = [Request("/mycompany/service/req") for _ in range(2)]
+            for request in requests:
+                callback.on_request(request)
+            self.assertEqual(1, dxl_client.send_response.call_count)
+            response = dxl_client.send_response.call_args[0][0]
+            self.assertIsInstance(response, ErrorResponse)
+            self.assertEqual(Application.OVERLOADED_ERROR_CODE, response.error_code)
+            self.assertEqual(requests[shed_index].message_id, response.request_message_id)
+            self.assertEqual(1, pool.queue_depth)
+            pool.shutdown(False)
+
+    def test_callbacks_pool_close_blocked_producer(self):
+        pool = CallbacksPool(1, 0, "test")
+        self.assertTrue(pool.add_task(len, "a"))
+        dxl_client = MagicMock()
+        callback = ThreadedRequestCallback(
+            pool, MagicMock(), dxl_client,
+            CallbackMetrics(self.app.metrics, "/mycompany/service/req"))
+        # The producer is blocked as the queue is full
+        producer = threading.Thread(target=callback.on_request,
+                                    args=(Request("/mycompany/service/req"),))
+        producer.start()
+        time.sleep(0.1)
+        self.assertTrue(producer.is_alive())
+
+        pool.close()
+        producer.join(2)
+        self.assertFalse(producer.is_alive())
+        self.assertEqual(1, pool.queue_depth)
+        response = dxl_client.send_response.call_args[0][0]
+        self.assertIsInstance(response, ErrorResponse)
+        self.assertEqual(Application.UNAVAILABLE_ERROR_CODE, response.error_code)
+        pool.shutdown(False)
+
+    def test_batch_event_callback(self):
+        batches = []
+
+        class _Callback(BatchEventCallback):
+            def on_events(self, events):
+                batches.append([event.destination_topic for event in events])
+
+        app = self.app
+        app.add_event_callback("/mycompany/event/#", _Callback(3, 0.05), False)
+        callback = app._dxl_client.add_event_callback.call_args[0][1] # pylint: disable=protected-access
+        for topic in ("/mycompany/event/a", "/mycompany/event/b",
+                      "/mycompany/event/a", "/mycompany/event/a"):
+            callback.on_event(Event(topic))
+        self.assertEqual([["/mycompany/event/a"] * 3], batches)
+        time.sleep(0.2)
+        self.assertEqual([["/mycompany/event/a"] * 3, ["/mycompany/event/b"]], batches)
+
+    def test_metrics(self):
+        app = self.app
+        callback = MagicMock()
+        callback.on_event.side_effect = [None, Exception("error")]
+        app.add_event_callback("/mycompany/event/metrics", callback, False)
+        wrapper = app._dxl_client.add_event_callback.call_args[0][1] # pylint: disable=protected-access
+        wrapper.on_event(Event("/mycompany/event/metrics"))
+        self.assertRaises(Exception, wrapper.on_event, Event("/mycompany/event/metrics"))
+
+        snapshot = app.metrics.snapshot()
+        labels = {"topic": "/mycompany/event/metrics"}
+        self.assertEqual([{"labels": labels, "value": 2}],
+                         snapshot[Application.MESSAGES_RECEIVED_METRIC])
+        self.assertEqual([{"labels": labels, "value": 1}],
+                         snapshot[Application.CALLBACK_ERRORS_METRIC])
+        self.assertEqual(2, snapshot[Application.CALLBACK_EXECUTION_METRIC][0]["value"]["count"])
+
+    def test_concurrent_service_registration(self):
+        class _Application(Application):
+            def on_register_services(self):
+                for index in range(5):
+                    service = MagicMock()
+                    service.service_type = "/mycompany/service/{0}".format(index)
+                    self.register_service(service)
+
+        def _register_service_async(service):
+            # The registration completes after a delay
+            registered = threading.Event()
+            threading.Timer(0.2, registered.set).start()
+            service._wait_for_registration.side_effect = registered.wait # pylint: disable=protected-access
+
+        app = _Application(self.config_dir, "app.config")
+        with patch("dxlbootstrap.app.DxlClient") as dxl_client_class, \
+                patch("dxlbootstrap.app.DxlClientConfig"):
+            dxl_client = dxl_client_class.return_value
+            dxl_client.register_service_async.side_effect = _register_service_async
+            start_time = time.time()
+            app._dxl_connect() # pylint: disable=protected-access
+            self.assertLess(time.time() - start_time, 0.6)
+            self.assertEqual(5, len(app._services)) # pylint: disable=protected-access
+            app._running = True # pylint: disable=protected-access
+            app.destroy()
+            self.assertEqual(5, dxl_client.unregister_service_async.call_count)
+
+    def test_service_registration_timeout(self):
+        def _wait_for_registration(timeout):
+            time.sleep(timeout)
+            raise DxlException("Timeout waiting for service related notification")
+
+        services = []
+        for index in range(3):
+            service = MagicMock()
+            service.service_type = "/mycompany/service/{0}".format(index)
+            service._wait_for_registration.side_effect = _wait_for_registration # pylint: disable=protected-access
+            services.append(service)
+        with patch.object(Application, "DXL_SERVICE_REGISTRATION_TIMEOUT", 0.2):
+            start_time = time.time()
+            self.assertRaises(DxlException,
+                              self.app._register_services, services) # pylint: disable=protected-access
+            # The services are waited for against a single deadline
+            self.assertLess(time.time() - start_time, 0.5)
+        self.assertEqual(3, self.app._dxl_client.register_service_async.call_count) # pylint: disable=protected-access
+        self.assertEqual([], self.app._services) # pylint: disable=protected-access
+
+    def test_destroy_drains_callbacks(self):
+        app = self.app
+        completed = []
+        callback = MagicMock()
+        callback.on_event.side_effect = lambda event: (time.sleep(0.2),
+                                                       completed.append(event))
+        app.add_event_callback("/mycompany/event/drain", callback, True)
+        wrapper = app._dxl_client.add_event_callback.call_args[0][1] # pylint: disable=protected-access
+        for _ in range(3):
+            wrapper.on_event(Event("/mycompany/event/drain"))
+        dxl_client = app._dxl_client # pylint: disable=protected-access
+        app.destroy()
+        self.assertEqual(3, len(completed))
+        dxl_client.destroy.assert_called_once_with()
+
+        # Events received once the pool has been closed are not counted as shed
+        wrapper.on_event(Event("/mycompany/event/drain"))
+        self.assertEqual(3, len(completed))
+        self.assertEqual(0, app.get_callbacks_pool_shed_counts()[None]["rejected"])
+
+    @unittest.skipIf(asyncio is None, "Requires asyncio")
+    def test_destroy_rejects_coroutine_and_process_requests(self):
+        app = self.app
+        service = MagicMock()
+        service.service_type = "/mycompany/service/drain"
+        app.add_request_callback(service, "/mycompany/service/drain/async",
+                                 AsyncRequestCallback(app._dxl_client), False) # pylint: disable=protected-access
+        app.add_request_callback(service, "/mycompany/service/drain/process",
+                                 _process_request_handler, False, separate_process=True)
+        wrappers = [call[0][1] for call in service.add_topic.call_args_list]
+        dxl_client = app._dxl_client # pylint: disable=protected-access
+        app.destroy()
+
+        for wrapper in wrappers:
+            dxl_client.send_response.reset_mock()
+            wrapper.on_request(Request("/mycompany/service/drain"))
+            response = dxl_client.send_response.call_args[0][0]
+            self.assertIsInstance(response, ErrorResponse)
+            self.assertEqual(Application.UNAVAILABLE_ERROR_CODE, response.error_code)
+
+    @unittest.skipIf(asyncio is None, "Requires asyncio")
+    def test_coroutine_event_callback(self):
+        app = self.app
+        callback = AsyncEventCallback()
+        app.add_event_callback("/mycompany/event/async", callback, True)
+        wrapper = app._dxl_client.add_event_callback.call_args[0][1] # pylint: disable=protected-access
+        for payload in (b"a", b"error", b"b"):
+            event = Event("/mycompany/event/async")
+            event.payload = payload
+            wrapper.on_event(event)
+        self.assertTrue(app._coroutine_loop.wait_idle(2)) # pylint: disable=protected-access
+        self.assertEqual([b"a", b"b"], sorted(event.payload for event in callback.events))
+
+        labels = {"topic": "/mycompany/event/async"}
+        self.assertTrue(_wait_until(lambda: app.metrics.snapshot().get(
+            Application.CALLBACK_ERRORS_METRIC) == [{"labels": labels, "value": 1}]))
+        snapshot = app.metrics.snapshot()
+        self.assertEqual([{"labels": labels, "value": 3}],
+                         snapshot[Application.MESSAGES_RECEIVED_METRIC])
+        self.assertEqual(3, snapshot[Application.CALLBACK_EXECUTION_METRIC][0]["value"]["count"])
+
+    @unittest.skipIf(asyncio is None, "Requires asyncio")
+    def test_coroutine_request_callback(self):
+        app = self.app
+        service = MagicMock()
+        service.service_type = "/mycompany/service/async"
+        app.add_request_callback(service, "/mycompany/service/async/req",
+                                 AsyncRequestCallback(app._dxl_client), True) # pylint: disable=protected-access
+        wrapper = service.add_topic.call_args[0][1]
+        request = Request("/mycompany/service/async/req")
+        request.payload = b"ping"
+        wrapper.on_request(request)
+        self.assertTrue(_wait_until(lambda: app._dxl_client.send_response.called)) # pylint: disable=protected-access
+        response = app._dxl_client.send_response.call_args[0][0] # pylint: disable=protected-access
+        self.assertIsInstance(response, Response)
+        self.assertNotIsInstance(response, ErrorResponse)
+        self.assertEqual(b"ping", response.payload)
+
+    @unittest.skipIf(asyncio is None, "Requires asyncio")
+    def test_coroutine_concurrency_limit(self):
+        app = self.app
+        app._coroutine_concurrency = 2 # pylint: disable=protected-access
+        callback = AsyncEventCallback(0.05)
+        app.add_event_callback("/mycompany/event/async", callback, False)
+        wrapper = app._dxl_client.add_event_callback.call_args[0][1] # pylint: disable=protected-access
+        for _ in range(6):
+            wrapper.on_event(Event("/mycompany/event/async"))
+            self.assertLessEqual(app._coroutine_loop.pending_count, 2) # pylint: disable=protected-access
+        self.assertTrue(app._coroutine_loop.wait_idle(2)) # pylint: disable=protected-access
+        self.assertEqual(6, len(callback.events))
+        self.assertEqual(2, callback.max_active_count)
+
+    @unittest.skipIf(asyncio is None, "Requires asyncio")
+    def test_coroutine_loop_shutdown(self):
+        loop = CoroutineLoop(2, "test")
+        callback = AsyncEventCallback(0.1)
+        future = loop.submit(callback.on_event, Event("/mycompany/event/async"))
+        loop.shutdown()
+        self.assertTrue(future.done())
+        self.assertEqual(1, len(callback.events))
+        self.assertEqual(0, loop.pending_count)
+        self.assertTrue(loop.closed)
+        self.assertTrue(loop.loop.is_closed())
+        self.assertIsNone(loop.submit(callback.on_event, Event("/mycompany/event/async")))
+
+        loop = CoroutineLoop(2, "test")
+        future = loop.submit(callback.on_event, Event("/mycompany/event/async"))
+        loop.close()
+        self.assertIsNone(loop.submit(callback.on_event, Event("/mycompany/event/async")))
+        self.assertTrue(loop.wait_idle(2))
+        self.assertEqual(2, len(callback.events))
+        loop.shutdown(False)
+
+    def _send_process_request(self, handler, payload):
+        """
+        Sends a request with the specified payload to a ``separate_process`` request callback
+        which invokes the specified handler function, and returns the response
+        """
+        app = self.app
+        app._process_pool_process_count = 1 # pylint: disable=protected-access
+        dxl_client = app._dxl_client # pylint: disable=protected-access
+        dxl_client.send_response.reset_mock()
+        service = MagicMock()
+        service.service_type = "/mycompany/service/process"
+        app.add_request_callback(service, "/mycompany/service/process/req", handler, False,
+                                 separate_process=True)
+        wrapper = service.add_topic.call_args[0][1]
+        request = Request("/mycompany/service/process/req")
+        request.payload = payload
+        wrapper.on_request(request)
+        self.assertTrue(_wait_until(lambda: dxl_client.send_response.called, 10))
+        response = dxl_client.send_response.call_args[0][0]
+        self.assertEqual(request.message_id, response.request_message_id)
+        return response
+
+    def test_process_request_callback(self):
+        response = self._send_process_request(_process_request_handler, b"abcd")
+        self.assertNotIsInstance(response, ErrorResponse)
+        self.assertEqual({"length": 4}, MessageUtils.json_payload_to_dict(response))
+
+        snapshot = self.app.metrics.snapshot()
+        self.assertEqual(1, snapshot[Application.MESSAGES_RECEIVED_METRIC][0]["value"])
+        self.assertEqual(0, snapshot[Application.CALLBACK_ERRORS_METRIC][0]["value"])
+
+    def test_process_request_callback_error(self):
+        response = self._send_process_request(_process_request_handler, b"error")
+        self.assertIsInstance(response, ErrorResponse)
+        self.assertIn("invalid payload", MessageUtils.decode(response.error_message))
+        self.assertEqual(
+            1, self.app.metrics.snapshot()[Application.CALLBACK_ERRORS_METRIC][0]["value"])
+
+    def test_process_request_callback_pickling_errors(self):
+        # The handler function cannot be pickled (sent to the worker process)
+        response = self._send_process_request(lambda payload: payload, b"abcd")
+        self.assertIsInstance(response, ErrorResponse)
+
+        # The value returned by the handler function cannot be pickled (sent back)
+        response = self._send_process_request(_process_unpicklable_result_handler, b"abcd")
+        self.assertIsInstance(response, ErrorResponse)
+
+        # The value returned by the handler function cannot be encoded
+        response = self._send_process_request(_process_unencodable_result_handler, b"abcd")
+        self.assertIsInstance(response, ErrorResponse)
+        self.assertEqual(
+            3, self.app.metrics.snapshot()[Application.CALLBACK_ERRORS_METRIC][0]["value"])
+
+        # The pool remains usable
+        response = self._send_process_request(_process_request_handler, b"abc")
+        self.assertEqual({"length": 3}, MessageUtils.json_payload_to_dict(response))
+
+    def test_reload_configuration(self):
+        # pylint: disable=protected-access
+        app = self.app
+        app.add_event_callback("/mycompany/event/other", MagicMock(), True)
+        app.add_event_callback("/mycompany/event/bulk", MagicMock(), True)
+        pool = app._callbacks_pool
+        bulk_pool = app._named_callbacks_pools["bulk"]
+        self.assertEqual(3, pool.thread_count)
+        self.assertFalse(app.reload_configuration_if_modified())
+
+        config_path = os.path.join(self.config_dir, "app.config")
+        with open(config_path, "w") as handle:
+            handle.write(APP_CONFIG_FILE.replace("threadCount=3", "threadCount=5")
+                         .replace("queueSize=5", "queueSize=7\nthreadCount=1")
+                         .replace("dropNewest", "reject"))
+        mtime = os.path.getmtime(config_path) + 10
+        os.utime(config_path, (mtime, mtime))
+        app.on_reload_configuration = MagicMock()
+        self.assertTrue(app.reload_configuration_if_modified())
+        app.on_reload_configuration.assert_called_once_with(app._config)
+
+        self.assertIs(pool, app._callbacks_pool)
+        self.assertEqual(5, pool.thread_count)
+        self.assertEqual(7, bulk_pool.queue_size)
+        self.assertEqual(CallbacksPool.OVERFLOW_POLICY_REJECT, bulk_pool.overflow_policy)
+        self.assertEqual(1, bulk_pool.thread_count)
+        for _ in range(50):
+            if len(bulk_pool._threads) == 1:
+                break
+            time.sleep(0.05)
+        self.assertEqual(1, len(bulk_pool._threads))
+        self.assertFalse(app.reload_configuration_if_modified())
+
+    def test_reload_invalid_configuration(self):
+        # pylint: disable=protected-access
+        app = self.app
+        app.add_event_callback("/mycompany/event/other", MagicMock(), True)
+        app.add_event_callback("/mycompany/event/bulk", MagicMock(), True)
+        pool = app._callbacks_pool
+        bulk_pool = app._named_callbacks_pools["bulk"]
+        config = app._config
+        json_codec = MessageUtils.get_json_codec()
+
+        config_path = os.path.join(self.config_dir, "app.config")
+        for invalid_config in (APP_CONFIG_FILE.replace("dropNewest", "unknown"),
+                               APP_CONFIG_FILE + "\n[MessagePayload]\njsonCodec=unknown\n"):
+            with open(config_path, "w") as handle:
+                handle.write(invalid_config.replace("threadCount=3", "threadCount=5")
+                             .replace("queueSize=5", "queueSize=7"))
+            app.on_reload_configuration = MagicMock()
+            self.assertRaises(Exception, app.reload_configuration)
+            app.on_reload_configuration.assert_not_called()
+
+            # The current configuration is retained
+            self.assertIs(config, app._config)
+            self.assertEqual(3, app._callbacks_thread_count)
+            self.assertEqual({"bulk": (5, 3, "dropNewest")},
+                             app._named_callbacks_pool_settings)
+            self.assertEqual(3, pool.thread_count)
+            self.assertEqual(5, bulk_pool.queue_size)
+            self.assertEqual(CallbacksPool.OVERFLOW_POLICY_DROP_NEWEST, bulk_pool.overflow_policy)
+            self.assertEqual(json_codec, MessageUtils.get_json_codec())
+            # The invalid configuration file is not reloaded until it is modified
+            self.assertFalse(app.reload_configuration_if_modified())
+
+    def test_callbacks_pool_resize(self):
+        pool = CallbacksPool(10, 2, "test")
+        pool.resize(10, 1)
+        pool.resize(10, 3)
+        self.assertEqual(3, pool.thread_count)
+        completed = []
+        for index in range(6):
+            pool.add_task(completed.append, index)
+        self.assertTrue(pool.wait_idle(5))
+        self.assertEqual(6, len(completed))
+        self.assertRaises(Exception, pool.resize, 10, 1, "unknown")
+        pool.shutdown()
+
+    def test_request_payload_schema(self):
+        app = self.app
+        service = MagicMock()
+        service.service_type = "/mycompany/service/schema"
+        received = []
+        callback = MagicMock()
+        callback.on_request.side_effect = lambda request: received.append(
+            request.validated_payload)
+        app.add_request_callback(service, "/mycompany/service/schema/req", callback, False,
+                                 schema="host:str, port:int?")
+        wrapper = service.add_topic.call_args[0][1]
+
+        dxl_client = app._dxl_client # pylint: disable=protected-access
+        for payload in ({"host": "a", "port": 1}, {"host": "a", "port": None}):
+            request = Request("/mycompany/service/schema/req")
+            MessageUtils.dict_to_json_payload(request, payload)
+            wrapper.on_request(request)
+        self.assertEqual([{"host": "a", "port": 1}, {"host": "a", "port": None}], received)
+        dxl_client.send_response.assert_not_called()
+
+        for payload in ('{"port": 1}', '{"host": "a", "port": "1"}', "[]", "{"):
+            request = Request("/mycompany/service/schema/req")
+            MessageUtils.encode_payload(request, payload)
+            wrapper.on_request(request)
+            response = dxl_client.send_response.call_args[0][0]
+            self.assertIsInstance(response, ErrorResponse)
+            self.assertEqual(Application.INVALID_REQUEST_ERROR_CODE, response.error_code)
+        self.assertEqual(2, len(received))
+        self.assertRaises(Exception, app.add_request_callback, service,
+                          "/mycompany/service/schema/req2", callback, False,
+                          schema="host:unknown")
+
+    def test_request_payload_schema_separate_thread(self):
+        app = self.app
+        service = MagicMock()
+        service.service_type = "/mycompany/service/schema"
+        threads = []
+        callback = MagicMock()
+        callback.on_request.side_effect = lambda request: threads.append(
+            (threading.current_thread().name, request.validated_payload))
+        app.add_request_callback(service, "/mycompany/service/schema/req", callback, True,
+                                 schema="host:str")
+        wrapper = service.add_topic.call_args[0][1]
+        self.assertIsInstance(wrapper, ThreadedRequestCallback)
+
+        dxl_client = app._dxl_client # pylint: disable=protected-access
+        request = Request("/mycompany/service/schema/req")
+        MessageUtils.dict_to_json_payload(request, {"host": "a"})
+        wrapper.on_request(request)
+        request = Request("/mycompany/service/schema/req")
+        MessageUtils.encode_payload(request, "{")
+        wrapper.on_request(request)
+        self.assertTrue(_wait_until(lambda: threads and dxl_client.send_response.called))
+        self.assertEqual({"host": "a"}, threads[0][1])
+        self.assertTrue(threads[0][0].startswith(Application.CALLBACKS_POOL_THREAD_PREFIX))
+        response = dxl_client.send_response.call_args[0][0]
+        self.assertEqual(Application.INVALID_REQUEST_ERROR_CODE, response.error_code)
@@ -0,0 +1,458 @@
+import threading
+import time
+import unittest
+
+from mock import MagicMock
+from dxlclient.exceptions import DxlException, WaitTimeoutException
+from dxlclient.message import ErrorResponse, Request, Response
+from dxlbootstrap._circuit_breaker import CircuitBreaker
+from dxlbootstrap._compat import asyncio
+from dxlbootstrap.client import CircuitOpenError, Client, RequestError, RequestTimeoutError, \
+    ServiceError, ServiceNotFoundError
+
+
+class ClientTest(unittest.TestCase):
+    def setUp(self):
+        self.dxl_client = MagicMock()
+        # pylint: disable=protected-access
+        self.dxl_client._message_pool_prefix = "DxlMessagePool-test"
+        self.client = Client(self.dxl_client)
+
+    def _respond_async(self, respond):
+        """
+        Causes asynchronous requests to be answered via the specified function, which is invoked
+        with the request and returns the response (or ``None`` to not respond)
+        """
+        def _async_request(request, callback):
+            response = respond(request)
+            if response is not None:
+                callback.on_response(response)
+        self.dxl_client.async_request.side_effect = _async_request
+
+    def test_async_request(self):
+        self._respond_async(lambda request: Response(request) if request.payload == b"ok"
+                            else ErrorResponse(request, error_code=5, error_message="failed"))
+        request = Request("/mycompany/service")
+        request.payload = b"ok"
+        future = self.client._dxl_async_request(request) # pylint: disable=protected-access
+        self.assertEqual(request.message_id, future.result(1).request_message_id)
+
+        future = self.client._dxl_async_request( # pylint: disable=protected-access
+            Request("/mycompany/service"))
+        self.assertRaises(Exception, future.result, 1)
+        self.assertEqual("Error: failed (5)", str(future.exception()))
+
+        self._respond_async(lambda request: None)
+        start_time = time.time()
+        future = self.client._dxl_async_request( # pylint: disable=protected-access
+            Request("/mycompany/service"), timeout=0.1)
+        self.assertIsInstance(future.exception(5), WaitTimeoutException)
+        self.assertLess(time.time() - start_time, 1)
+
+    @unittest.skipIf(asyncio is None, "Requires asyncio")
+    def test_async_request_awaitable(self):
+        self._respond_async(Response)
+        request = Request("/mycompany/service")
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            response = loop.run_until_complete(asyncio.wait_for(
+                self.client._dxl_async_request_awaitable(request), 1)) # pylint: disable=protected-access
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+        self.assertEqual(request.message_id, response.request_message_id)
+
+    def test_batch_request(self):
+        in_flight = []
+        max_in_flight = []
+        callbacks = []
+
+        def _async_request(request, callback):
+            in_flight.append(request)
+            max_in_flight.append(len(in_flight))
+            callbacks.append((request, callback))
+            if len(in_flight) == 3 or request.payload == b"9":
+                # Respond to the requests in flight (in reverse order)
+                while callbacks:
+                    pending_request, pending_callback = callbacks.pop()
+                    in_flight.remove(pending_request)
+                    if pending_request.payload == b"4":
+                        pending_callback.on_response(ErrorResponse(
+                            pending_request, error_code=1, error_message="failed"))
+                    else:
+                        response = Response(pending_request)
+                        response.payload = pending_request.payload
+                        pending_callback.on_response(response)
+        self.dxl_client.async_request.side_effect = _async_request
+
+        requests = []
+        for index in range(10):
+            request = Request("/mycompany/service")
+            request.payload = str(index).encode()
+            requests.append(request)
+        results = self.client._dxl_batch_request( # pylint: disable=protected-access
+            requests, max_in_flight=3)
+        self.assertEqual(3, max(max_in_flight))
+        self.assertEqual([str(index).encode() for index in range(10) if index != 4],
+                         [response.payload for response, error in results if error is None])
+        self.assertIsNone(results[4][0])
+        self.assertEqual("Error: failed (1)", str(results[4][1]))
+
+    def test_response_cache(self):
+        self.dxl_client.sync_request.side_effect = \
+            lambda request, timeout: Response(request) if request.payload != b"error" \
+            else ErrorResponse(request, error_code=5, error_message="failed")
+
+        def _request(payload, topic="/mycompany/cached"):
+            request = Request(topic)
+            request.payload = payload
+            return self.client._dxl_sync_request(request) # pylint: disable=protected-access
+
+        self.assertIsNone(self.client.get_response_cache_stats("/mycompany/cached"))
+        self.client.enable_response_cache("/mycompany/cached", ttl=60, max_entries=2)
+        first = _request(b"1")
+        self.assertIs(first, _request(b"1"))
+        self.assertIsNot(first, _request(b"2"))
+        self.assertIsNot(_request(b"3", "/mycompany/other"), _request(b"3", "/mycompany/other"))
+        self.assertRaises(Exception, _request, b"error")
+        self.assertRaises(Exception, _request, b"error")
+        # Evicts the least recently used response (for payload "1")
+        _request(b"4")
+        self.assertIsNot(first, _request(b"1"))
+        self.assertEqual(8, self.dxl_client.sync_request.call_count)
+        stats = self.client.get_response_cache_stats("/mycompany/cached")
+        self.assertEqual(1, stats["hits"])
+        self.assertEqual(6, stats["misses"])
+        self.assertEqual(2, stats["evictions"])
+        self.assertEqual(2, stats["entries"])
+
+        self.client.enable_response_cache("/mycompany/cached", ttl=0.05)
+        first = _request(b"1")
+        self.assertIs(first, _request(b"1"))
+        time.sleep(0.1)
+        self.assertIsNot(first, _request(b"1"))
+        self.assertEqual(1, self.client.get_response_cache_stats(
+            "/mycompany/cached")["expirations"])
+
+        self.client.disable_response_cache("/mycompany/cached")
+        self.assertIsNot(_request(b"1"), _request(b"1"))
+
+    def test_coalesce_requests(self):
+        release = threading.Event()
+
+        def _sync_request(request, timeout): # pylint: disable=unused-argument
+            release.wait(5)
+            return Response(request)
+        self.dxl_client.sync_request.side_effect = _sync_request
+        self.client.coalesce_requests = True
+
+        responses = []
+
+        def _request(payload):
+            request = Request("/mycompany/service")
+            request.payload = payload
+            responses.append(
+                self.client._dxl_sync_request(request)) # pylint: disable=protected-access
+        threads = [threading.Thread(target=_request, args=(payload,))
+                   for payload in (b"1", b"1", b"1", b"2")]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.2)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(4, len(responses))
+        self.assertEqual(2, self.dxl_client.sync_request.call_count)
+        self.assertEqual(2, len(set(id(response) for response in responses)))
+
+    def test_coalesce_requests_timeout(self):
+        release = threading.Event()
+
+        def _sync_request(request, timeout):
+            release.wait(timeout)
+            return Response(request)
+        self.dxl_client.sync_request.side_effect = _sync_request
+        self.client.coalesce_requests = True
+
+        thread = threading.Thread(
+            target=self.client._dxl_sync_request, # pylint: disable=protected-access
+            args=(Request("/mycompany/service"), 5))
+        thread.start()
+        time.sleep(0.1)
+        # The identical request in flight is awaited for the timeout of the request
+        start_time = time.time()
+        self.assertRaises(RequestTimeoutError,
+                          self.client._dxl_sync_request, # pylint: disable=protected-access
+                          Request("/mycompany/service"), 0.2)
+        self.assertLess(time.time() - start_time, 1)
+        release.set()
+        thread.join(5)
+        self.assertEqual(1, self.dxl_client.sync_request.call_count)
+
+    def test_coalesce_requests_interrupted(self):
+        def _sync_request(request, timeout): # pylint: disable=unused-argument
+            raise KeyboardInterrupt()
+        self.dxl_client.sync_request.side_effect = _sync_request
+        self.client.coalesce_requests = True
+
+        self.assertRaises(KeyboardInterrupt,
+                          self.client._dxl_sync_request, # pylint: disable=protected-access
+                          Request("/mycompany/service"), 0.2)
+        # The interrupted request is no longer in flight, the identical request is sent
+        self.dxl_client.sync_request.side_effect = None
+        self.dxl_client.sync_request.return_value = Response(Request("/mycompany/service"))
+        self.client._dxl_sync_request( # pylint: disable=protected-access
+            Request("/mycompany/service"), 0.2)
+        self.assertEqual(2, self.dxl_client.sync_request.call_count)
+
+    def test_hedge_requests(self):
+        self.client.hedge_requests = True
+        self._respond_async(Response)
+        for _ in range(20):
+            self.client._dxl_sync_request( # pylint: disable=protected-access
+                Request("/mycompany/service"))
+        self.assertIsNotNone(self.client.get_latency_percentile("/mycompany/service", 95))
+        self.assertEqual(20, self.dxl_client.async_request.call_count)
+
+        # The first request is not responded to, the hedged request is
+        sent = []
+        callbacks = []
+
+        def _async_request(request, callback):
+            sent.append(request)
+            callbacks.append(callback)
+            if len(sent) > 1:
+                callback.on_response(Response(request))
+        self.dxl_client.async_request.side_effect = _async_request
+        request = Request("/mycompany/service")
+        request.payload = b"payload"
+        start_time = time.time()
+        response = self.client._dxl_sync_request( # pylint: disable=protected-access
+            request, timeout=5)
+        self.assertLess(time.time() - start_time, 1)
+        self.assertEqual(2, len(sent))
+        self.assertEqual(b"payload", sent[1].payload)
+        self.assertNotEqual(request.message_id, sent[1].message_id)
+        self.assertEqual(sent[1].message_id, response.request_message_id)
+        # The losing request is no longer awaited (and its response timeout is cancelled)
+        self.assertTrue(callbacks[0]._done) # pylint: disable=protected-access
+        request_manager = self.dxl_client._request_manager # pylint: disable=protected-access
+        request_manager.unregister_async_callback.assert_called_with(request.message_id)
+
+        self.assertIsInstance(self._sync_request_on_incoming_message_thread(), DxlException)
+
+    def test_sync_request_timeout(self):
+        self.dxl_client.sync_request.side_effect = \
+            lambda request, timeout: Response(request)
+        self.client._dxl_sync_request( # pylint: disable=protected-access
+            Request("/mycompany/service"), timeout=2)
+        self.assertEqual(2, self.dxl_client.sync_request.call_args[1]["timeout"])
+        self.client._dxl_sync_request( # pylint: disable=protected-access
+            Request("/mycompany/service"))
+        self.assertEqual(30, self.dxl_client.sync_request.call_args[1]["timeout"])
+
+    def test_circuit_breaker(self):
+        failing = [True]
+
+        def _sync_request(request, timeout): # pylint: disable=unused-argument
+            if failing[0]:
+                raise WaitTimeoutException("timeout")
+            return Response(request)
+        self.dxl_client.sync_request.side_effect = _sync_request
+        self.client.enable_circuit_breaker("/mycompany/service", timeout_threshold=2,
+                                           cool_down=0.1)
+
+        def _request():
+            return self.client._dxl_sync_request( # pylint: disable=protected-access
+                Request("/mycompany/service"))
+        self.assertEqual("closed", self.client.get_circuit_breaker_state("/mycompany/service"))
+        self.assertRaises(WaitTimeoutException, _request)
+        self.assertRaises(WaitTimeoutException, _request)
+        self.assertEqual("open", self.client.get_circuit_breaker_state("/mycompany/service"))
+        self.assertRaises(CircuitOpenError, _request)
+        self.assertEqual(2, self.dxl_client.sync_request.call_count)
+
+        # The trial request fails, re-opening the circuit
+        time.sleep(0.15)
+        self.assertEqual("half-open",
+                         self.client.get_circuit_breaker_state("/mycompany/service"))
+        self.assertRaises(WaitTimeoutException, _request)
+        self.assertRaises(CircuitOpenError, _request)
+
+        # The trial request succeeds, closing the circuit
+        time.sleep(0.15)
+        failing[0] = False
+        _request()
+        self.assertEqual("closed", self.client.get_circuit_breaker_state("/mycompany/service"))
+
+        # Error rate threshold
+        self.dxl_client.sync_request.side_effect = \
+            lambda request, timeout: ErrorResponse(request, error_code=1, error_message="failed")
+        for _ in range(10):
+            self.assertRaises(Exception, _request)
+        self.assertRaises(CircuitOpenError, _request)
+
+        # The trial request is interrupted, another trial request is allowed
+        time.sleep(0.15)
+        self.dxl_client.sync_request.side_effect = KeyboardInterrupt
+        self.assertRaises(KeyboardInterrupt, _request)
+        self.dxl_client.sync_request.side_effect = _sync_request
+        _request()
+        self.assertEqual("closed", self.client.get_circuit_breaker_state("/mycompany/service"))
+
+    def test_circuit_breaker_stale_outcomes(self):
+        breaker = CircuitBreaker("/mycompany/service", 0.5, 1, 1, 10, 0.1)
+        self.assertIsNone(breaker.before_request())
+        self.assertIsNone(breaker.before_request())
+        breaker.record_failure(timeout=True)
+        self.assertEqual(CircuitBreaker.OPEN, breaker.state)
+
+        # The outcomes of requests sent before the circuit opened are ignored
+        breaker.record_success()
+        self.assertEqual(CircuitBreaker.OPEN, breaker.state)
+        time.sleep(0.06)
+        # The cool-down period is not restarted
+        breaker.record_failure()
+        time.sleep(0.06)
+        self.assertEqual(CircuitBreaker.HALF_OPEN, breaker.state)
+        trial = breaker.before_request()
+        self.assertIsNotNone(trial)
+        breaker.record_failure()
+        self.assertEqual(CircuitBreaker.HALF_OPEN, breaker.state)
+        self.assertRaises(CircuitOpenError, breaker.before_request)
+
+        # The outcome of the trial request closes the circuit
+        breaker.record_success(trial=trial)
+        self.assertEqual(CircuitBreaker.CLOSED, breaker.state)
+
+    def test_typed_errors(self):
+        def _request():
+            return self.client._dxl_sync_request( # pylint: disable=protected-access
+                Request("/mycompany/service"))
+        self.dxl_client.sync_request.side_effect = \
+            lambda request, timeout: ErrorResponse(request, error_code=0x80000001,
+                                                   error_message="unable to locate service")
+        with self.assertRaises(ServiceNotFoundError) as context:
+            _request()
+        self.assertEqual(0x80000001, context.exception.error_code)
+        self.assertEqual("Error: unable to locate service (2147483649)",
+                         str(context.exception))
+
+        self.dxl_client.sync_request.side_effect = \
+            lambda request, timeout: ErrorResponse(request, error_code=5, error_message="failed")
+        with self.assertRaises(ServiceError) as context:
+            _request()
+        self.assertNotIsInstance(context.exception, ServiceNotFoundError)
+        self.assertEqual("failed", context.exception.error_message)
+
+        self.dxl_client.sync_request.side_effect = WaitTimeoutException("timeout")
+        self.assertRaises(RequestTimeoutError, _request)
+
+    def test_retry(self):
+        attempts = []
+
+        def _sync_request(request, timeout): # pylint: disable=unused-argument
+            attempts.append(request)
+            if len(attempts) == 1:
+                raise WaitTimeoutException("timeout")
+            if len(attempts) == 2:
+                return ErrorResponse(request, error_code=0x80000002, error_message="overloaded")
+            return Response(request)
+        self.dxl_client.sync_request.side_effect = _sync_request
+        request = Request("/mycompany/service")
+        request.payload = b"payload"
+        response = self.client._dxl_sync_request_with_retry( # pylint: disable=protected-access
+            request, base_delay=0.01)
+        self.assertEqual(3, len(attempts))
+        self.assertEqual(3, len(set(attempt.message_id for attempt in attempts)))
+        self.assertEqual(b"payload", attempts[2].payload)
+        self.assertEqual(attempts[2].message_id, response.request_message_id)
+
+        # Non-transient errors are not retried, transient errors are retried up to the
+        # maximum attempts
+        del attempts[:]
+        self.dxl_client.sync_request.side_effect = \
+            lambda request, timeout: attempts.append(request) or \
+            ErrorResponse(request, error_code=5, error_message="failed")
+        self.assertRaises(ServiceError,
+                          self.client._dxl_sync_request_with_retry, # pylint: disable=protected-access
+                          request, base_delay=0.01)
+        self.assertEqual(1, len(attempts))
+        self.assertRaises(ServiceError,
+                          self.client._dxl_sync_request_with_retry, # pylint: disable=protected-access
+                          request, base_delay=0.01, max_attempts=2, retry_on=(ServiceError,))
+        self.assertEqual(3, len(attempts))
+
+    def test_pipeline_requests(self):
+        self.client.pipeline_requests = True
+        self.assertTrue(self.client.pipeline_requests)
+        self.assertEqual(1, self.dxl_client.add_response_callback.call_count)
+        topic, shared_callback = self.dxl_client.add_response_callback.call_args[0]
+        self.assertIsNone(topic)
+
+        pending = []
+
+        def _async_request(request, callback=None):
+            self.assertIsNone(callback)
+            pending.append(request)
+        self.dxl_client.async_request.side_effect = _async_request
+
+        futures = [self.client._dxl_async_request( # pylint: disable=protected-access
+            Request("/mycompany/service")) for _ in range(3)]
+        # Responses to requests not sent by the client wrapper are ignored
+        shared_callback.on_response(Response(Request("/mycompany/other")))
+        shared_callback.on_response(ErrorResponse(pending[1], error_code=5,
+                                                  error_message="failed"))
+        shared_callback.on_response(Response(pending[2]))
+        shared_callback.on_response(Response(pending[0]))
+        self.assertEqual(pending[0].message_id, futures[0].result(1).request_message_id)
+        self.assertIsInstance(futures[1].exception(1), ServiceError)
+        self.assertEqual(pending[2].message_id, futures[2].result(1).request_message_id)
+
+        # Synchronous requests are sent asynchronously
+        self.dxl_client.async_request.side_effect = \
+            lambda request, callback=None: shared_callback.on_response(Response(request))
+        request = Request("/mycompany/service")
+        response = self.client._dxl_sync_request(request) # pylint: disable=protected-access
+        self.assertEqual(request.message_id, response.request_message_id)
+        self.assertEqual(0, self.dxl_client.sync_request.call_count)
+
+        self.dxl_client.async_request.side_effect = _async_request
+        future = self.client._dxl_async_request( # pylint: disable=protected-access
+            Request("/mycompany/service"), timeout=0.05)
+        self.assertIsInstance(future.exception(1), RequestTimeoutError)
+
+        future = self.client._dxl_async_request( # pylint: disable=protected-access
+            Request("/mycompany/service"))
+        self.client.pipeline_requests = False
+        self.assertFalse(self.client.pipeline_requests)
+        self.dxl_client.remove_response_callback.assert_called_once_with(None, shared_callback)
+        self.assertIsInstance(future.exception(1), RequestError)
+
+    def _sync_request_on_incoming_message_thread(self):
+        """
+        Sends a synchronous request on a thread of the DXL client's incoming message pool, and
+        returns the exception raised
+        """
+        errors = []
+
+        def _request():
+            try:
+                self.client._dxl_sync_request( # pylint: disable=protected-access
+                    Request("/mycompany/service"), timeout=5)
+            except Exception as ex: # pylint: disable=broad-except
+                errors.append(ex)
+        thread = threading.Thread(target=_request, name="DxlMessagePool-test-1")
+        start_time = time.time()
+        thread.start()
+        thread.join(10)
+        self.assertLess(time.time() - start_time, 1)
+        self.assertEqual(1, len(errors))
+        return errors[0]
+
+    def test_pipeline_requests_incoming_message_thread(self):
+        self.client.pipeline_requests = True
+        self.dxl_client.async_request.side_effect = lambda request, callback=None: None
+        self.assertIsInstance(self._sync_request_on_incoming_message_thread(), DxlException)
+        self.dxl_client.async_request.assert_not_called()
@@ -13,6 +13,7 @@ else:
 # pylint: disable=wrong-import-position
 from mock import patch
 from dxlbootstrap.generate.app import DxlBootstrap
+from dxlbootstrap.generate.core.template import CompiledTemplate
 
 class _TempDir(object):
     def __init__(self, prefix, delete_on_exit=True):
@@ -48,6 +49,7 @@ requestHandlers=geolocation_service_hostlookup
 [geolocation_service_hostlookup]
 topic=/mycompany/service/geolocation/host_lookup
 className=GeolocationHostLookupRequestCallback
+schema=host:str, port:int?
 """
 
 CLIENT_CONFIG_FILE = """
@@ -70,8 +72,12 @@ class DxlBootstrapTest(unittest.TestCase):
                                config_file,
                                app_dir)
             mock_print.assert_called_with("Generation succeeded.")
-            self.assertTrue(os.path.exists(
-                os.path.join(app_dir, "geolocationservice", "app.py")))
+            app_file = os.path.join(app_dir, "geolocationservice", "app.py")
+            self.assertTrue(os.path.exists(app_file))
+            with open(app_file) as handle:
+                app_code = handle.read()
+            compile(app_code, app_file, "exec")
+            self.assertIn('schema="host:str, port:int?"', app_code)
 
     def test_generate_client_command(self):
         with _TempDir("genclient") as temp_dir, \
@@ -85,3 +91,17 @@ class DxlBootstrapTest(unittest.TestCase):
             mock_print.assert_called_with("Generation succeeded.")
             self.assertTrue(os.path.exists(
                 os.path.join(client_dir, "geolocationclient", "client.py")))
+
+    def test_compiled_template(self):
+        calls = []
+
+        def _value():
+            calls.append(1)
+            return "called"
+        template = CompiledTemplate(u"plain\n${a}-${b}-${a}\n${c} ${missing}\n\\${a}")
+        replace_dict = {"a": "x\\1", "b": 2, "c": _value}
+        self.assertEqual(["plain", "x\\1-2-x\\1", "called ${missing}", "\\x\\1"],
+                         template.render(replace_dict))
+        self.assertEqual(1, len(calls))
+        self.assertEqual(["plain", "${a}-${b}-${a}", "${c} ${missing}", "\\${a}"],
+                         template.render({}))
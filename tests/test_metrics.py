@@ -0,0 +1,74 @@
+import unittest
+
+# pylint: disable=wrong-import-position
+try:
+    from urllib.error import HTTPError
+    from urllib.request import urlopen
+except ImportError:
+    from urllib2 import HTTPError, urlopen
+from dxlbootstrap.metrics import Histogram, MetricsHttpServer, MetricsRegistry, format_text
+
+
+class MetricsTest(unittest.TestCase):
+    def test_histogram(self):
+        histogram = Histogram(buckets=(1, 2, 4))
+        self.assertIsNone(histogram.percentile(50))
+        for value in (0.5, 1.5, 1.5, 3, 10):
+            histogram.observe(value)
+        snapshot = histogram.snapshot()
+        self.assertEqual(5, snapshot["count"])
+        self.assertEqual(16.5, snapshot["sum"])
+        self.assertEqual([(1, 1), (2, 3), (4, 4), (float("inf"), 5)],
+                         snapshot["buckets"])
+        self.assertEqual(2, histogram.percentile(50))
+        self.assertEqual(float("inf"), histogram.percentile(99))
+
+    def test_registry(self):
+        registry = MetricsRegistry()
+        registry.counter("requests", {"topic": "/a"}).inc()
+        registry.counter("requests", {"topic": "/a"}).inc(2)
+        registry.counter("requests", {"topic": "/b"}).inc()
+        registry.gauge("depth", func=lambda: 7)
+        self.assertRaises(Exception, registry.histogram, "requests")
+        self.assertEqual(
+            {"requests": [{"labels": {"topic": "/a"}, "value": 3},
+                          {"labels": {"topic": "/b"}, "value": 1}],
+             "depth": [{"labels": {}, "value": 7}]},
+            registry.snapshot())
+
+    def test_format_text(self):
+        registry = MetricsRegistry()
+        registry.counter("requests_total", {"topic": '/a"b'}).inc()
+        registry.counter("dropped_total", func=lambda: 4)
+        registry.histogram("latency_seconds", buckets=(0.5,)).observe(0.25)
+        self.assertEqual(
+            "# TYPE dropped_total counter\n"
+            "dropped_total 4\n"
+            "# TYPE latency_seconds histogram\n"
+            'latency_seconds_bucket{le="0.5"} 1\n'
+            'latency_seconds_bucket{le="+Inf"} 1\n'
+            "latency_seconds_sum 0.25\n"
+            "latency_seconds_count 1\n"
+            "# TYPE requests_total counter\n"
+            'requests_total{topic="/a\\"b"} 1\n',
+            format_text(registry))
+
+    def test_http_server(self):
+        registry = MetricsRegistry()
+        registry.counter("requests_total").inc()
+        server = MetricsHttpServer(registry, 0)
+        server.start()
+        try:
+            url = "http://127.0.0.1:{0}".format(server.port)
+            response = urlopen(url + "/metrics", timeout=5)
+            try:
+                self.assertEqual(200, response.getcode())
+                self.assertEqual(format_text(registry), response.read().decode("utf-8"))
+            finally:
+                response.close()
+            with self.assertRaises(HTTPError) as context:
+                urlopen(url + "/other", timeout=5)
+            self.assertEqual(404, context.exception.code)
+            context.exception.close()
+        finally:
+            server.stop()
@@ -0,0 +1,198 @@
+import datetime
+import json
+import unittest
+import uuid
+
+from dxlclient.message import Event, Request, Response
+from dxlbootstrap.util import MessageUtils
+
+
+class MessageUtilsTest(unittest.TestCase):
+    def tearDown(self):
+        MessageUtils.set_json_codec()
+
+    def test_json_codecs(self):
+        value = {"a": [1, 2.5, None, True], "b": u"café", "c": {"d": "/e"},
+                 "big": 2 ** 70}
+        for name in MessageUtils.JSON_CODECS:
+            try:
+                MessageUtils.set_json_codec(name)
+            except Exception: # pylint: disable=broad-except
+                continue
+            self.assertEqual(name, MessageUtils.get_json_codec())
+            json_string = MessageUtils.dict_to_json(value)
+            self.assertEqual(value, MessageUtils.json_to_dict(json_string + "\0"))
+            self.assertEqual({"1": 2}, MessageUtils.json_to_dict(
+                MessageUtils.dict_to_json({1: 2})))
+
+        MessageUtils.set_json_codec("json")
+        self.assertEqual('{"a": 1}', MessageUtils.dict_to_json({"a": 1}))
+        self.assertRaises(Exception, MessageUtils.set_json_codec, "unknown")
+        self.assertEqual("json", MessageUtils.get_json_codec())
+
+    def test_json_codecs_match_stdlib(self):
+        values = [{"a": float("nan")}, [float("inf"), None], {"a": -float("inf")},
+                  {1: "a", "b": None}, {"u": u"\u00e9\u20ac", "n": None},
+                  {"id": "12345678-1234-1234-1234-123456789abc"}]
+        unsupported = [{"d": datetime.datetime(2020, 1, 2)}, [uuid.UUID(int=1)],
+                       {"n": None, "d": datetime.date(2020, 1, 2)}, {"b": b"x"}]
+        for name in MessageUtils.JSON_CODECS:
+            try:
+                MessageUtils.set_json_codec(name)
+            except Exception: # pylint: disable=broad-except
+                continue
+            for value in values:
+                expected = json.dumps(value)
+                data = MessageUtils.dict_to_json_bytes(value)
+                # Compared as re-encoded by the standard library (NaN is not equal to itself)
+                self.assertEqual(expected, json.dumps(json.loads(data.decode("utf-8"))))
+                self.assertEqual(expected, MessageUtils.dict_to_json(value))
+            for value in unsupported:
+                self.assertRaises(TypeError, json.dumps, value)
+                self.assertRaises(TypeError, MessageUtils.dict_to_json_bytes, value)
+
+            # Payloads in encodings other than UTF-8
+            message = Event("/mycompany/event")
+            MessageUtils.dict_to_json_payload(message, {"b": u"\u00e9\u20ac"}, enc="ascii")
+            self.assertEqual(json.dumps({"b": u"\u00e9\u20ac"}).encode("ascii"),
+                             message.payload)
+            self.assertEqual({"b": u"\u00e9\u20ac"},
+                             MessageUtils.json_payload_to_dict(message, enc="ascii"))
+
+    def test_json_bytes(self):
+        message = Event("/mycompany/event")
+        value = {"a": u"café", "b": [1, 2]}
+        for name in MessageUtils.JSON_CODECS:
+            try:
+                MessageUtils.set_json_codec(name)
+            except Exception: # pylint: disable=broad-except
+                continue
+            data = MessageUtils.dict_to_json_bytes(value)
+            self.assertIsInstance(data, bytes)
+            self.assertEqual(value, MessageUtils.json_bytes_to_dict(data))
+            self.assertEqual(value, MessageUtils.json_bytes_to_dict(
+                memoryview(data + b"\0\0")))
+            self.assertEqual(value, MessageUtils.json_bytes_to_dict(bytearray(data + b"\0")))
+
+            MessageUtils.dict_to_json_payload(message, value)
+            self.assertEqual(data, message.payload)
+            message.payload = message.payload + b"\0"
+            self.assertEqual(value, MessageUtils.json_payload_to_dict(message))
+
+        MessageUtils.dict_to_json_payload(message, value, enc="utf-16")
+        self.assertEqual(value, MessageUtils.json_payload_to_dict(message, enc="utf-16"))
+
+    def test_payload_compression(self):
+        value = {"values": list(range(1000))}
+        message = Event("/mycompany/event")
+        MessageUtils.dict_to_json_payload(message, value, compression="zlib")
+        self.assertEqual("zlib", message.other_fields[MessageUtils.CONTENT_ENCODING_FIELD])
+        self.assertLess(len(message.payload), len(MessageUtils.dict_to_json_bytes(value)))
+        compressed = message.payload
+        self.assertEqual(value, MessageUtils.json_payload_to_dict(message))
+        self.assertEqual(value, MessageUtils.json_payload_to_dict(message))
+        # The message is not modified by decompression
+        self.assertEqual("zlib", message.other_fields[MessageUtils.CONTENT_ENCODING_FIELD])
+        self.assertEqual(compressed, message.payload)
+
+        MessageUtils.encode_payload(message, "small", compression="zlib")
+        self.assertEqual({}, message.other_fields)
+        self.assertEqual("small", MessageUtils.decode_payload(message))
+
+        request = Request("/mycompany/service")
+        response = Response(request)
+        MessageUtils.encode_payload(response, "x" * 2000)
+        self.assertIsNone(MessageUtils.compress_payload(response, request=request))
+        MessageUtils.set_accept_encoding(request, ["unknown", "zlib"])
+        self.assertEqual(["unknown", "zlib"], MessageUtils.get_accept_encoding(request))
+        self.assertEqual("zlib", MessageUtils.compress_payload(response, None,
+                                                               request=request))
+        self.assertEqual("x" * 2000, MessageUtils.decode_payload(response))
+
+    def test_payload_decompression_limit(self):
+        message = Event("/mycompany/event")
+        MessageUtils.encode_payload(message, b"\0" * 100000, compression="zlib")
+        self.assertEqual(100000, len(MessageUtils.decompress_payload(message)))
+
+        max_size = MessageUtils.get_max_decompressed_size()
+        MessageUtils.set_max_decompressed_size(99999)
+        try:
+            self.assertRaises(ValueError, MessageUtils.decompress_payload, message)
+            self.assertRaises(ValueError, MessageUtils.decode_payload, message)
+            MessageUtils.set_max_decompressed_size(100000)
+            self.assertEqual(100000, len(MessageUtils.decompress_payload(message)))
+        finally:
+            MessageUtils.set_max_decompressed_size(max_size)
+
+        message.payload = message.payload[:-1]
+        self.assertRaises(ValueError, MessageUtils.decompress_payload, message)
+
+    def test_payload_formats(self):
+        value = {"a": [1, 2.5, None, True], "b": u"café"}
+        message = Event("/mycompany/event")
+        for fmt in ("json", "msgpack"):
+            MessageUtils.encode_payload(message, value, fmt=fmt)
+            self.assertEqual(fmt, MessageUtils.get_payload_format(message))
+            self.assertEqual(value, MessageUtils.decode_payload(message, fmt=fmt))
+            self.assertEqual(value, MessageUtils.json_payload_to_dict(message))
+        self.assertEqual(value, MessageUtils.decode_payload(message))
+
+        # JSON payloads are decoded to a string unless the format is specified
+        MessageUtils.encode_payload(message, value, fmt="json")
+        self.assertEqual(value, json.loads(MessageUtils.decode_payload(message)))
+
+        MessageUtils.encode_payload(message, {1: "a", 2.5: "b"}, fmt="msgpack")
+        self.assertEqual({1: "a", 2.5: "b"}, MessageUtils.decode_payload(message))
+
+        MessageUtils.encode_payload(message, {"values": list(range(1000))},
+                                    compression="zlib", fmt="msgpack")
+        self.assertEqual({"values": list(range(1000))}, MessageUtils.decode_payload(message))
+
+        message = Event("/mycompany/event")
+        MessageUtils.encode_payload(message, '{"a": 1}')
+        self.assertIsNone(MessageUtils.get_payload_format(message))
+        self.assertEqual('{"a": 1}', MessageUtils.decode_payload(message))
+        self.assertEqual({"a": 1}, MessageUtils.decode_payload(message, fmt="json"))
+        self.assertRaises(Exception, MessageUtils.encode_payload, message, value,
+                          fmt="unknown")
+
+    def test_iter_json_payload(self):
+        message = Event("/mycompany/event")
+        records = [{"id": index, "name": u"récord {0}".format(index), "value": index * 1.5,
+                    "tags": ["a", None, True]} for index in range(500)] + [12345, -1e10]
+        MessageUtils.dict_to_json_payload(message, records)
+        message.payload = message.payload + b"\n\0"
+        for chunk_size in (1, 7, 4096):
+            self.assertEqual(records,
+                             list(MessageUtils.iter_json_payload(message, chunk_size)))
+
+        MessageUtils.encode_payload(message, ' { "a" : 1 , "b" : [2, 3] } ')
+        self.assertEqual([("a", 1), ("b", [2, 3])],
+                         list(MessageUtils.iter_json_payload(message, 3)))
+        MessageUtils.encode_payload(message, "[]")
+        self.assertEqual([], list(MessageUtils.iter_json_payload(message)))
+        MessageUtils.encode_payload(message, {"a": 1}, fmt="msgpack")
+        self.assertEqual([("a", 1)], list(MessageUtils.iter_json_payload(message)))
+
+        # Numbers, strings, literals and multi-byte UTF-8 characters split at every chunk
+        # boundary
+        values = [12.5, -1e5, 3, 1.25e-3, u"ab\u00e9\u20ac\U0001f600", u"\\\"", True, None]
+        for document in (json.dumps(values, ensure_ascii=False),
+                         json.dumps(dict(("k{0}".format(index), value) for index, value in
+                                         enumerate(values)), ensure_ascii=False)):
+            data = document.encode("utf-8")
+            expected = json.loads(document)
+            if isinstance(expected, dict):
+                expected = sorted(expected.items())
+            for chunk_size in range(1, len(data) + 1):
+                message = Event("/mycompany/event")
+                message.payload = data
+                decoded = list(MessageUtils.iter_json_payload(message, chunk_size))
+                if isinstance(decoded[0], tuple):
+                    decoded = sorted(decoded)
+                self.assertEqual(expected, decoded)
+
+        message = Event("/mycompany/event")
+        for payload in ("[1, 2", "[1 2]", "[1] x", '{"a" 1}', "1"):
+            MessageUtils.encode_payload(message, payload)
+            self.assertRaises(ValueError, list, MessageUtils.iter_json_payload(message, 2))